@@ -1,7 +1,10 @@
 # from typing import Generator
+from fastapi import HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import SessionLocalAsync
-from typing import AsyncGenerator
+from app.core.security.jwt import decode_token
+from app.db.session import SessionLocalAsync, SessionLocalRead
+from app.db.replicas import replica_router
+from typing import AsyncGenerator, Optional
 
 
 # def get_session() -> Generator:
@@ -15,4 +18,39 @@ from typing import AsyncGenerator
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocalAsync() as session:
         yield session
-    
\ No newline at end of file
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для запросов, которые только читают (в профиле production - пул read-only соединений)."""
+    async with SessionLocalRead() as session:
+        yield session
+
+
+if SessionLocalRead is SessionLocalAsync:
+    # один пул на все: чтение идет через ту же сессию запроса, что и авторизация,
+    # иначе запрос держал бы два соединения
+    get_read_session = get_session
+
+
+def _request_user_id(request: Request) -> Optional[int]:
+    """Пользователь из access-токена без обращения к БД (проверяет токен все равно get_current_user)."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(decode_token(token)["sub"])
+    except (HTTPException, KeyError, ValueError):
+        return None
+
+
+async def get_replica_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для списков и статистики: реплика, если она есть и доступна, иначе основная база.
+    Сразу после собственной записи пользователь читает с основной базы (read-your-writes).
+    """
+    async with await replica_router.open_session(_request_user_id(request)) as session:
+        yield session
+
+
+if not replica_router.engines:
+    get_replica_session = get_read_session
@@ -12,6 +12,8 @@ from app.api.v1.endpoints.statistics import statistics_router
 from app.api.v1.endpoints.notifications import notifications_router, ws_router
 from app.api.v1.endpoints.reports import reports_router
 from app.api.v1.endpoints.subscriptions import subscriptions_router
+from app.api.v1.endpoints.metrics import metrics_router
+from app.api.v1.endpoints.kitchen import kitchen_router
 
 
 def include_routers(app: FastAPI):
@@ -27,4 +29,6 @@ def include_routers(app: FastAPI):
     app.include_router(subscriptions_router)
     app.include_router(notifications_router)
     app.include_router(ws_router)
-    app.include_router(reports_router)
\ No newline at end of file
+    app.include_router(kitchen_router)
+    app.include_router(reports_router)
+    app.include_router(metrics_router)
@@ -1,16 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Annotated
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session, get_replica_session
 from app.crud.application import applications_manager
+from app.crud.planner import planner_manager
 
-from app.schemas.application import ApplicationDetailResponse, ApplicationRejectRequest, ApplicationResponse, CreateApplicationRequest
+from app.schemas.application import ApplicationDetailResponse, ApplicationRejectRequest, ApplicationResponse, CreateApplicationRequest, ProcurementPlanResponse
 from app.schemas.validation import ErrorResponse, ValidationError
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.core.enums import OrderStatus
+from app.core.serialization import json_response
 
 
 applications_router = APIRouter(prefix='/applications', tags=['Applications'])
@@ -27,10 +29,11 @@ async def get_applications(
                         params: Annotated[PaginationParams, Depends()],
                         status: Optional[OrderStatus] = None, 
                         user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK)),
-                        session: AsyncSession = Depends(get_session)
+                        session: AsyncSession = Depends(get_replica_session)
                     ):
     
-    return await applications_manager.get_all_paginated(session, params, status)
+    page = await applications_manager.get_all_paginated(session, params, status)
+    return json_response(page, PaginatedResponse[ApplicationResponse])
 
 
 @applications_router.post(
@@ -59,6 +62,46 @@ async def create_application(
         )
 
 
+@applications_router.get('/plan', summary='План закупки', 
+                        description='Потребность в ингредиентах на ближайшие дни по оплаченным заказам и абонементам, '
+                                    'с количеством к закупке и стоимостью. Доступно поварам и администраторам',
+                        response_model=ProcurementPlanResponse,
+                        responses={
+                            200: {'model': ProcurementPlanResponse, 'description': 'План закупки'},
+                            401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                            403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
+                            422: {'model': ValidationError, 'description': 'Ошибка валидации'}
+                        })
+async def get_procurement_plan(
+                        days: Annotated[int, Query(ge=1, le=60, description="Сколько дней, начиная с сегодняшнего, покрыть закупкой")] = 7,
+                        user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK)),
+                        session: AsyncSession = Depends(get_read_session)
+                    ):
+    
+    return await planner_manager.plan(session, days)
+
+
+@applications_router.post('/plan', summary='Создать заявку по плану', 
+                        description='Повар создает заявку на закупку, заполненную по плану на ближайшие дни. '
+                                    'Дальше заявка проходит обычное согласование администратором',
+                        response_model=ApplicationDetailResponse,
+                        status_code=status.HTTP_201_CREATED,
+                        responses={
+                            201: {'model': ApplicationDetailResponse, 'description': 'Заявка создана'},
+                            400: {'model': ErrorResponse, 'description': 'Закупать нечего'},
+                            401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                            403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
+                            422: {'model': ValidationError, 'description': 'Ошибка валидации'}
+                        })
+async def create_application_from_plan(
+                        days: Annotated[int, Query(ge=1, le=60, description="Сколько дней, начиная с сегодняшнего, покрыть закупкой")] = 7,
+                        user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK)),
+                        session: AsyncSession = Depends(get_session)
+                    ):
+    
+    return await planner_manager.create_application(session, user.id, days)
+
+
 @applications_router.get('/{application_id}', summary='Получить заявку', description='Доступно поварам и администраторам',
                         response_model=ApplicationDetailResponse,
                         responses={
@@ -70,7 +113,7 @@ async def create_application(
 async def get_application(
                         application_id: int, 
                         user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK)),
-                        session: AsyncSession = Depends(get_session)
+                        session: AsyncSession = Depends(get_read_session)
                     ):
     
     return await applications_manager.get_by_id(session, application_id)
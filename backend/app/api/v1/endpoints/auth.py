@@ -2,13 +2,13 @@ from fastapi import APIRouter, HTTPException, status, Depends, Body
 from datetime import datetime
 
 from app.core.security.jwt import create_access_token, create_refresh_token, decode_token
-from app.core.security.password import verify_password
+from app.core.security.password import verify_password_async, hash_password_async, needs_rehash
 
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
 from app.schemas.validation import ErrorResponse, ValidationError
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.user import users_manager
 from app.crud.blacklisted_token import blacklisted_token_manager
 
@@ -55,11 +55,13 @@ async def register_user(
                 })
 async def login_user(
                     form: LoginRequest,
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_session),
+                    read_session: AsyncSession = Depends(get_read_session)
                 ):
     
+    # пишущее соединение не занимается на время проверки пароля
     try:
-        user = await users_manager.get_by_email(session, form.email)
+        user = await users_manager.get_by_email(read_session, form.email)
     except HTTPException as e:
         if e.status_code == status.HTTP_404_NOT_FOUND:
             raise HTTPException(
@@ -68,9 +70,13 @@ async def login_user(
             )
         raise e 
 
-    if not verify_password(form.password, user.password):
+    if not await verify_password_async(form.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong password")
 
+    # стоимость bcrypt в настройках изменилась после создания хэша - перехэшируем, пока знаем пароль
+    if needs_rehash(user.password):
+        await users_manager.set_password_hash(session, user.id, await hash_password_async(form.password))
+
     return TokenResponse(
         access_token=create_access_token(user.id, user.role),
         refresh_token=create_refresh_token(user.id),
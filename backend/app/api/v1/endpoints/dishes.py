@@ -1,6 +1,6 @@
 import json
 import shutil
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query, File, UploadFile, Form
 
 from typing import Annotated, Optional
 import json
@@ -9,8 +9,9 @@ from app.core.utils.generation import generate_unique_filename
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
+from app.core.catalog_cache import catalog_cache
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.dish import dish_manager
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,18 +21,23 @@ from app.schemas.paginating import PaginationParams, PaginatedResponse
 
 dishes_router = APIRouter(prefix='/dishes', tags=['Dishes'])
 
-@dishes_router.get('/', summary='Получить список блюд', description='',
+@dishes_router.get('/', summary='Получить список блюд', description='Ответ содержит ETag: с заголовком If-None-Match неизменившийся каталог возвращается как 304 без тела',
                 response_model=PaginatedResponse[DishResponse],
                 responses={
-                    200: {'model': PaginatedResponse[DishResponse], 'description': 'Список блюд'}
+                    200: {'model': PaginatedResponse[DishResponse], 'description': 'Список блюд'},
+                    304: {'description': 'Каталог не изменился'}
                 })
 async def get_dishes(
+                request: Request,
                 params: Annotated[PaginationParams, Depends()],
                 search: Annotated[Optional[str], Query(description="Поиск по названию блюда")] = None,
-                session: AsyncSession = Depends(get_session),
+                session: AsyncSession = Depends(get_read_session),
             ):
 
-    return await dish_manager.get_all_paginated(session, params, search)
+    return await catalog_cache.respond(
+        request, ("dishes", params.page, params.limit, params.cursor, search), PaginatedResponse[DishResponse],
+        lambda: dish_manager.get_all_paginated(session, params, search)
+    )
 
 
 @dishes_router.post('/', response_model=DishResponse, status_code=status.HTTP_201_CREATED)
@@ -83,18 +89,23 @@ async def create_dish(
         )
 
 
-@dishes_router.get('/{dish_id}', summary='Получить информацию о блюде', description='',
+@dishes_router.get('/{dish_id}', summary='Получить информацию о блюде', description='Поддерживает ETag / If-None-Match',
                     response_model=DishDetailResponse,
                     responses={
                         200: {'model': DishDetailResponse, 'description': 'Информация о блюде'},
+                        304: {'description': 'Блюдо не изменилось'},
                         404: {'model': ErrorResponse, 'description': 'Ресурс не найден'},
                     })
 async def get_dish(
+                request: Request,
                 dish_id: int,
-                session: AsyncSession = Depends(get_session)
+                session: AsyncSession = Depends(get_read_session)
             ):
     
-    return await dish_manager.get_by_id(session, dish_id)
+    return await catalog_cache.respond(
+        request, ("dish", dish_id), DishDetailResponse,
+        lambda: dish_manager.get_by_id(session, dish_id)
+    )
 
 
 @dishes_router.patch('/{dish_id}', summary='Oбновить блюдо', description='Доступно только администраторам и поварам',
@@ -3,9 +3,10 @@ from typing import Annotated, Optional
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
+from app.core.serialization import json_response
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.ingredient import ingredients_manager
 
 from app.schemas.dish import IngredientResponse, UpdateIngredientRequest
@@ -29,9 +30,10 @@ async def get_ingredients(
     params: Annotated[PaginationParams, Depends()],
     search: Optional[str] = None,
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
     ):
-    return await ingredients_manager.get_all_paginated(session, params, search)
+    page = await ingredients_manager.get_all_paginated(session, params, search)
+    return json_response(page, PaginatedResponse[IngredientResponse])
 
 @ingredients_router.post(
         '/', 
@@ -69,7 +71,7 @@ async def add_ingredient(
 async def get_ingredient(
     ingredient_id: int, 
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
     ):
     return await ingredients_manager.get_by_id(session, ingredient_id)
 
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query
+
+from app.core.security.auth import require_roles
+from app.core.security.jwt import decode_token
+from app.core.enums import UserRole
+from app.core.kitchen_board import kitchen_board
+from app.crud.user import users_manager
+from app.db.session import SessionLocalRead
+
+from app.schemas.kitchen import KitchenBoardResponse
+from app.schemas.validation import ErrorResponse
+
+
+kitchen_router = APIRouter(tags=['Kitchen'])
+
+KITCHEN_ROLES = (UserRole.ADMIN, UserRole.COOK)
+
+
+@kitchen_router.get('/kitchen/board', summary='Доска кухни', description='Сколько порций каждого блюда в сегодняшних заказах ждет приготовления (paid) и выдачи (ready). '
+                    'Отдается из памяти без запросов к БД. Изменения приходят по WebSocket /ws/kitchen. Доступно поварам и администраторам',
+                    response_model=KitchenBoardResponse,
+                    responses={
+                        200: {'model': KitchenBoardResponse, 'description': 'Снимок доски'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'}
+                    })
+async def get_kitchen_board(
+                    user=Depends(require_roles(*KITCHEN_ROLES)),
+                ):
+
+    return kitchen_board.snapshot()
+
+
+@kitchen_router.websocket("/ws/kitchen")
+async def kitchen_websocket(
+    websocket: WebSocket,
+    token: str = Query(...)
+):
+    """
+    Экран кухни: сначала {"type": "snapshot", ...} как в GET /kitchen/board, затем
+    {"type": "delta", "version": n, "changes": [{"dish_id", "name", "paid": +3, "ready": 0, "paid_total", "ready_total"}]}.
+    """
+    try:
+        payload = decode_token(token)
+        if payload.get("type") != "access":
+            raise ValueError("not an access token")
+        user_id = int(payload["sub"])
+        async with SessionLocalRead() as session:
+            user = await users_manager.get_principal(session, user_id)
+    except Exception:
+        await websocket.close(code=4003)
+        return
+
+    if user.banned or UserRole(user.role) not in KITCHEN_ROLES:
+        await websocket.close(code=4003)
+        return
+
+    await kitchen_board.connect(user_id, websocket)
+
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        kitchen_board.screens.disconnect(user_id, websocket)
@@ -1,31 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Annotated, List, Optional
 
-from app.core.security.auth import require_roles
+from app.core.security.auth import require_roles, get_current_user, optional_oauth2_scheme
 from app.core.enums import UserRole
+from app.core.catalog_cache import catalog_cache
 
 from app.schemas.menu import MenuResponse, CreateMenuRequest, UpdateMenuRequest, MenuDetailResponse
 from app.schemas.validation import ValidationError, ErrorResponse
 
 from app.db.session import AsyncSession
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.menu import menu_manager
+from app.crud.allergen import allergens_manager
 
 menu_router = APIRouter(prefix='/menu', tags=['Menu'])
 
 @menu_router.get(
     '/', 
     summary='Получить список меню', 
-    description='Получить все доступные меню (завтраки, обеды)',
+    description='Получить все доступные меню (завтраки, обеды). Ответ содержит ETag: с заголовком If-None-Match '
+                'неизменившийся каталог возвращается как 304 без тела',
     response_model=List[MenuResponse],
     responses={
         200: {"model": List[MenuResponse]}, 
+        304: {"description": "Каталог не изменился"},
         }
     )
 async def get_menus(
-    session=Depends(get_session)
+    request: Request,
+    session=Depends(get_read_session)
     ):
-    return await menu_manager.get_all(session)
+    return await catalog_cache.respond(
+        request, ("menus",), List[MenuResponse],
+        lambda: menu_manager.get_all(session)
+    )
 
 
 @menu_router.post(
@@ -52,23 +60,45 @@ async def create_menu(
 @menu_router.get(
         '/{menu_id}', 
         summary='Получить меню по ID', 
-        description='Получить детальную информацию о меню с блюдами',
+        description='Получить детальную информацию о меню с блюдами. Поддерживает ETag / If-None-Match. '
+                    'С safe_for_me=true (нужна авторизация) остаются только блюда без ингредиентов из списка аллергий пользователя',
         response_model=MenuDetailResponse,
         responses={
             200: {"model": MenuDetailResponse},
+            304: {"description": "Меню не изменилось"},
+            401: {"model": ErrorResponse, "description": "safe_for_me без авторизации"},
             404: {"model": ErrorResponse, "description": "Ресурс не найден"}
         }
     )
 async def get_menu(
+    request: Request,
     menu_id: int, 
-    session: AsyncSession = Depends(get_session)
+    safe_for_me: Annotated[bool, Query(description="Только блюда, безопасные с учетом аллергий текущего пользователя")] = False,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    session: AsyncSession = Depends(get_read_session)
     ):
-    menu =  await menu_manager.get_by_id(session, menu_id)
-    return {
-        "id": menu.id,
-        "name": menu.name,
-        "items": [item.dish for item in menu.items] 
-    }
+    allergy_mask = 0
+    if safe_for_me:
+        if token is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        user = await get_current_user(token, session)
+        allergy_mask = await allergens_manager.user_mask(session, user.id)
+
+    # один и тот же ответ подходит всем пользователям с одинаковой маской аллергий
+    key = ("menu", menu_id, "safe", allergy_mask) if allergy_mask else ("menu", menu_id)
+
+    async def load():
+        menu =  await menu_manager.get_by_id(session, menu_id)
+        unsafe = set()
+        if allergy_mask:
+            unsafe = await allergens_manager.unsafe_dishes(session, user.id, [item.dish_id for item in menu.items])
+        return {
+            "id": menu.id,
+            "name": menu.name,
+            "items": [item.dish for item in menu.items if item.dish_id not in unsafe] 
+        }
+
+    return await catalog_cache.respond(request, key, MenuDetailResponse, load)
 
 @menu_router.patch(
     '/{menu_id}', 
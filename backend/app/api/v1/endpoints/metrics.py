@@ -0,0 +1,34 @@
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+from app.schemas.validation import ErrorResponse
+
+
+metrics_router = APIRouter(tags=['Metrics'])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_router.get('/metrics', summary='Метрики Prometheus', description='Латентность запросов по маршрутам и статусам, число SQL-запросов и время в БД на запрос (этот воркер). '
+                    'Если задан METRICS_TOKEN, нужен заголовок Authorization: Bearer <token>',
+                    response_class=PlainTextResponse,
+                    responses={
+                        200: {'content': {PROMETHEUS_CONTENT_TYPE: {}}, 'description': 'Метрики в текстовом формате Prometheus'},
+                        401: {'model': ErrorResponse, 'description': 'Неверный токен'},
+                        404: {'model': ErrorResponse, 'description': 'Метрики отключены'}
+                    })
+async def get_metrics(request: Request):
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+
+    if settings.metrics_token:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token, settings.metrics_token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
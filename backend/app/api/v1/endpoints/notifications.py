@@ -9,7 +9,7 @@ from app.core.websockets_manager import notification_manager
 
 from app.schemas.notification import NotificationResponse, CreateNotificationRequest 
 from app.schemas.validation import ErrorResponse, ValidationError
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session, get_replica_session
 from app.crud.notification import notifications_manager
 
 notifications_router = APIRouter(prefix='/notifications', tags=['Notifications'])
@@ -51,7 +51,7 @@ async def websocket_endpoint(
                         })
 async def get_notifications(
                         user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-                        session: AsyncSession = Depends(get_session)
+                        session: AsyncSession = Depends(get_replica_session)
                     ):
     
     return await notifications_manager.get_all_by_user(session, user_id=user.id)
@@ -102,7 +102,7 @@ async def mark_all_read(
 )
 async def get_unread_count(
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     count = await notifications_manager.get_unread_count(session, user.id)
     return {"count": count}
@@ -6,13 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole, OrderStatus
-from app.api.deps import get_session
+from app.core.serialization import json_response
+from app.api.deps import get_session, get_read_session, get_replica_session
 from app.crud.order import orders_manager
 from app.crud.user import users_manager
 
 from app.schemas.validation import ErrorResponse, ValidationError
 from app.schemas.paginating import PaginationParams, PaginatedResponse
-from app.schemas.order import OrderResponse, OrderDetailResponse, CreateOrderRequest
+from app.schemas.order import OrderResponse, OrderDetailResponse, CreateOrderRequest, OrderIdsRequest, OrderTransitionBatchResponse
 
 orders_router = APIRouter(prefix='/orders', tags=['Orders'])
 
@@ -31,24 +32,27 @@ async def get_orders(
     date_to: Optional[date] = None,
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
     session: AsyncSession = Depends(get_session), 
+    read_session: AsyncSession = Depends(get_replica_session),
 ):
     
     target_user_id = user_id
     if user.role == UserRole.STUDENT:
         target_user_id = user.id
     
-    return await orders_manager.get_all_paginated(
-        session, params, target_user_id, status, date_from, date_to
+    page = await orders_manager.get_all_paginated(
+        session, params, target_user_id, status, date_from, date_to, read_session=read_session
     )
+    return json_response(page, PaginatedResponse[OrderResponse])
 
 
-@orders_router.post('/', summary='Создать заказ', description='Оплата разового питания учеником. Администратор может создать заказ от имени другого пользователя, указав user_id.', 
+@orders_router.post('/', summary='Создать заказ', description='Оплата разового питания учеником. Администратор может создать заказ от имени другого пользователя, указав user_id. '
+                    'Если в блюдах есть ингредиенты из списка аллергий пользователя, заказ отклоняется с 409, пока не передан allow_allergens.', 
                     response_model=OrderDetailResponse,
                     status_code=status.HTTP_201_CREATED,
                     responses={
                         201: {'model': OrderDetailResponse},
                         400: {'model': ErrorResponse, 'description': 'Недостаточно средств или некорректный запрос'},
-                        409: {'model': ErrorResponse, 'description': 'Конфликт (операция недоступна в текущем состоянии)'},
+                        409: {'model': ErrorResponse, 'description': 'В блюдах есть аллергены пользователя'},
                         401: {'model': ErrorResponse, 'description': 'Не авторизован'},
                         403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
                         422: {'model': ValidationError, 'description': 'Ошибка валидации'}
@@ -73,6 +77,44 @@ async def create_order(
     return await orders_manager.create(session, target_user, order_in)
 
 
+# пути /batch/... объявлены раньше /{order_id}/..., иначе "batch" разбирался бы как order_id
+@orders_router.post('/batch/mark-ready', summary='Отметить готовность многих заказов (для Повара)',
+                    description='Оплаченные заказы из списка переводятся в READY одним запросом к БД, ученикам уходит одна пачка уведомлений. '
+                                'Для каждого id возвращается результат: updated, not_found или conflict (заказ не в статусе PAID)',
+                    response_model=OrderTransitionBatchResponse,
+                    responses={
+                        200: {'model': OrderTransitionBatchResponse, 'description': 'Результат по каждому заказу'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
+                        422: {'model': ValidationError, 'description': 'Ошибка валидации'},
+                    })
+async def mark_ready_orders(
+    form: OrderIdsRequest,
+    user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK)),
+    session: AsyncSession = Depends(get_session)
+):
+    return await orders_manager.mark_ready_many(session, form.order_ids)
+
+
+@orders_router.post('/batch/confirm-receipt', summary='Подтвердить получение многих заказов',
+                    description='Готовые или оплаченные заказы из списка переводятся в SERVED одним запросом к БД на каждый исходный статус. '
+                                'Ученик может подтвердить только свои заказы (чужие - forbidden). Результаты: updated, not_found, forbidden, conflict',
+                    response_model=OrderTransitionBatchResponse,
+                    responses={
+                        200: {'model': OrderTransitionBatchResponse, 'description': 'Результат по каждому заказу'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
+                        422: {'model': ValidationError, 'description': 'Ошибка валидации'},
+                    })
+async def confirm_orders(
+    form: OrderIdsRequest,
+    user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
+    session: AsyncSession = Depends(get_session)
+):
+    owner_id = user.id if user.role == UserRole.STUDENT else None
+    return await orders_manager.mark_served_many(session, form.order_ids, owner_id=owner_id)
+
+
 @orders_router.get('/{order_id}', summary='Получить информацию о заказе', description='', 
                    response_model=OrderDetailResponse,
                    responses={
@@ -83,7 +125,7 @@ async def create_order(
 async def get_order(
     order_id: int, 
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     order = await orders_manager.get_by_id(session, order_id)
     if user.role == UserRole.STUDENT and order.user_id != user.id:
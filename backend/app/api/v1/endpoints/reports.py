@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
 from datetime import datetime, timezone, timedelta, date
 from typing import Optional
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
-from app.core.utils.generation import generate_report
+from app.core.report_jobs import report_jobs
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.reports import reports_manager
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -34,7 +34,7 @@ async def report_costs(
                     date_from: Optional[date] = None,
                     date_to: Optional[date] = None,
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_read_session)
                 ):
     
     return await reports_manager.get_costs_report_data(session, date_from, date_to)
@@ -54,7 +54,7 @@ async def report_nutrition(
                     date_from: Optional[date] = None,
                     date_to: Optional[date] = None,
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_read_session)
                 ):
     
     return await reports_manager.get_nutrition_report_data(session, date_from, date_to)
@@ -74,7 +74,7 @@ async def report_attendance(
                     date_from: Optional[date] = None,
                     date_to: Optional[date] = None,
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_read_session)
                 ):
     
     return await reports_manager.get_attendance_report_data(session, date_from, date_to)
@@ -84,10 +84,14 @@ async def report_attendance(
 @reports_router.post(
     '/generate-pdf', 
     summary='Сгенерировать отчет', 
-    description='Администратор запускает генерацию отчета (например, по питанию) за период. Отчет формируется асинхронно, результат сохраняется в БД и может быть получен через другой эндпоинт.',
+    description='Администратор запускает генерацию отчета за период. Отчет формируется в фоне: ответ сразу содержит id и статус pending. '
+                'Готовность можно узнать через GET /reports/{report_id} или по WebSocket-сообщению report_ready. '
+                'Если отчет с такими же параметрами уже формируется или готов и его период закончился до формирования, возвращается он. '
+                'Отчет за период, включающий текущий день, формируется заново.',
     response_model=ReportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     responses={
-        200: {'model': ReportResponse, 'description': 'OK'},
+        202: {'model': ReportResponse, 'description': 'Отчет поставлен в очередь (или уже существует)'},
         400: {'model': ErrorResponse, 'description': 'Некорректный запрос'},
         401: {'model': ErrorResponse, 'description': 'Не авторизован'},
         403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
@@ -99,8 +103,24 @@ async def generate_new_report(
     user=Depends(require_roles(UserRole.ADMIN)),
     session: AsyncSession = Depends(get_session)
     ):
-    report  = await reports_manager.get(session, report_request)
-    if report:
-        return report
-    else:
-        return await generate_report(session, report_request)
\ No newline at end of file
+    return await report_jobs.enqueue(session, report_request, user.id)
+
+
+@reports_router.get(
+    '/{report_id}', 
+    summary='Статус отчета', 
+    description='Статус фоновой генерации отчета: pending, ready или failed. Файл доступен по download_url, когда статус ready.',
+    response_model=ReportResponse,
+    responses={
+        200: {'model': ReportResponse, 'description': 'OK'},
+        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'},
+        404: {'model': ErrorResponse, 'description': 'Отчет не найден'}
+        }   
+    )
+async def get_report(
+    report_id: int,
+    user=Depends(require_roles(UserRole.ADMIN)),
+    session: AsyncSession = Depends(get_read_session)
+    ):
+    return await reports_manager.get_by_id(session, report_id)
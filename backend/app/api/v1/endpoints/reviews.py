@@ -3,8 +3,9 @@ from typing import Optional, Annotated
 
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
+from app.core.serialization import json_response
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session, get_replica_session
 from app.crud.review import reviews_manager
 from app.crud.user import users_manager
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -28,10 +29,11 @@ reviews_router = APIRouter(prefix='/reviews', tags=['Reviews'])
 async def get_reviews(
                     params: Annotated[PaginationParams, Depends()],
                     dish_id: Optional[int] = None,
-                    session: AsyncSession = Depends(get_session),
+                    session: AsyncSession = Depends(get_replica_session),
                 ):
     
-    return await reviews_manager.get_all_paginated(session, params, dish_id)
+    page = await reviews_manager.get_all_paginated(session, params, dish_id)
+    return json_response(page, PaginatedResponse[ReviewResponse])
 
 
 @reviews_router.post(
@@ -67,7 +69,7 @@ async def create_review(
                 })
 async def get_review(
                 review_id: int, 
-                session: AsyncSession = Depends(get_session), 
+                session: AsyncSession = Depends(get_read_session), 
                 user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT))
             ):
     
@@ -5,11 +5,15 @@ from typing import Optional
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_replica_session
 from app.crud.statistic import statistic_manager
+from app.core.cache import principal_cache
+from app.core.catalog_cache import catalog_cache
+from app.core.websockets_manager import notification_manager
+from app.db.replicas import replica_router
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.statistic import DishStatistic, DishStatisticsResponse, PaymentStatisticsResponse, AttendanceStatisticsByDay, AttendanceStatisticsResponse
+from app.schemas.statistic import DishStatistic, DishStatisticsResponse, PaymentStatisticsResponse, AttendanceStatisticsByDay, AttendanceStatisticsResponse, CacheStatisticsResponse, CatalogCacheStatisticsResponse, WebsocketStatisticsResponse, ReplicaStatisticsResponse
 from app.schemas.report import GenerateReportRequest, ReportResponse
 from app.schemas.validation import ValidationError, ErrorResponse
 
@@ -27,7 +31,7 @@ async def get_payments(
                     date_from: Optional[datetime] = datetime.now(timezone.utc).date() - timedelta(days=7),
                     date_to: Optional[datetime] = datetime.now(timezone.utc).date(),
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_replica_session)
                 ):
     
     return await statistic_manager.get_payment_statistics(session, date_from, date_to)
@@ -44,7 +48,7 @@ async def get_attendance(
                     date_from: Optional[datetime] = (datetime.now(timezone.utc).date() - timedelta(days=7)),
                     date_to: Optional[datetime] = datetime.now(timezone.utc).date(),
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_replica_session)
                 ):
     
     return await statistic_manager.get_attendance_statistics(session, date_from, date_to)
@@ -61,12 +65,68 @@ async def get_dishes_stat(
                     date_from: Optional[datetime] = (datetime.now(timezone.utc).date() - timedelta(days=7)),
                     date_to: Optional[datetime] = datetime.now(timezone.utc).date(),
                     user=Depends(require_roles(UserRole.ADMIN)),
-                    session: AsyncSession = Depends(get_session)
+                    session: AsyncSession = Depends(get_replica_session)
                 ):
     
     return await statistic_manager.get_dish_statistics(session, date_from, date_to)
 
 
+@statistics_router.get('/statistics/principal-cache', summary='Статистика кэша пользователей', description='Попадания и промахи кэша авторизованных пользователей. Доступно только администраторам',
+                    response_model=CacheStatisticsResponse,
+                    responses={
+                        200: {'model': CacheStatisticsResponse, 'description': 'Статистика кэша'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'}
+                    })
+async def get_principal_cache_stat(
+                    user=Depends(require_roles(UserRole.ADMIN)),
+                ):
+    
+    return principal_cache.stats()
+
+
+@statistics_router.get('/statistics/catalog-cache', summary='Статистика кэша каталога', description='Версия каталога, попадания кэша ответов блюд и меню и число ответов 304 в этом воркере. Доступно только администраторам',
+                    response_model=CatalogCacheStatisticsResponse,
+                    responses={
+                        200: {'model': CatalogCacheStatisticsResponse, 'description': 'Статистика кэша'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'}
+                    })
+async def get_catalog_cache_stat(
+                    user=Depends(require_roles(UserRole.ADMIN)),
+                ):
+    
+    return catalog_cache.stats()
+
+
+@statistics_router.get('/statistics/websockets', summary='Статистика WebSocket-уведомлений', description='Подключения, глубина очередей отправки и отброшенные сообщения в этом воркере. Доступно только администраторам',
+                    response_model=WebsocketStatisticsResponse,
+                    responses={
+                        200: {'model': WebsocketStatisticsResponse, 'description': 'Статистика WebSocket'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'}
+                    })
+async def get_websocket_stat(
+                    user=Depends(require_roles(UserRole.ADMIN)),
+                ):
+    
+    return notification_manager.stats()
+
+
+@statistics_router.get('/statistics/replicas', summary='Статистика чтения с реплик', description='Доступные реплики, число чтений с реплик и с основной базы, переключения на основную базу в этом воркере. Доступно только администраторам',
+                    response_model=ReplicaStatisticsResponse,
+                    responses={
+                        200: {'model': ReplicaStatisticsResponse, 'description': 'Статистика реплик'},
+                        401: {'model': ErrorResponse, 'description': 'Не авторизован'},
+                        403: {'model': ErrorResponse, 'description': 'Доступ запрещен'}
+                    })
+async def get_replica_stat(
+                    user=Depends(require_roles(UserRole.ADMIN)),
+                ):
+    
+    return replica_router.stats()
+
+
 @statistics_router.post('/reports/generate', summary='Сформировать отчет', description='Aдминистратор формирует отчет по питанию и затратам',
                     response_model=ReportResponse,
                     status_code=status.HTTP_201_CREATED,
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends
 from app.core.security.auth import require_roles
 from app.core.enums import UserRole
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session
 from app.crud.user import users_manager
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -23,13 +23,13 @@ subscriptions_router = APIRouter(prefix='/subscriptions', tags=['Subscriptions']
                         })
 async def get_my_subscriptions(
                         user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-                        session: AsyncSession = Depends(get_session)
+                        session: AsyncSession = Depends(get_read_session)
                     ):
     
     return await users_manager.get_subscription_info(session, user.id)
 
 
-@subscriptions_router.post('/purchase', summary='Купить абонемент', description='Оплата абонемента на питание. Создает заказы на N дней вперед по шаблону выбранного заказа.',
+@subscriptions_router.post('/purchase', summary='Купить абонемент', description='Оплата абонемента на питание на N дней вперед по шаблону выбранного заказа. Сумма списывается сразу, а заказ на каждый оплаченный день создается, когда этот день наступает.',
                         response_model=PurchaseSubscriptionResponse,
                         responses={
                             200: {'model': PurchaseSubscriptionResponse, 'description': 'Абонемент успешно приобретен'},
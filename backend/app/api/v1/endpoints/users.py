@@ -2,16 +2,19 @@ from fastapi import APIRouter, Depends, Body, HTTPException, status
 from typing import List, Annotated, Optional
 
 from app.core.security.auth import require_roles
-from app.core.enums import UserRole
+from app.core.enums import UserRole, BalanceOperation
+from app.core.serialization import json_response
 
 from app.crud.user import users_manager
+from app.crud.balance import balance_manager
 
 from app.schemas.user import UserResponse, UpdateUserRequest, AdminUpdateUserRequest
 from app.schemas.validation import ValidationError, ErrorResponse
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.schemas.dish import IngredientResponse
+from app.schemas.balance import BalanceTransactionResponse
 
-from app.api.deps import get_session
+from app.api.deps import get_session, get_read_session, get_replica_session
 from app.db.session import AsyncSession
 
 
@@ -66,7 +69,7 @@ async def update_current_user(
     )
 async def get_current_user_allergies(
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
     ):
     allergies = await users_manager.get_allergies(session, user.id)
     return allergies
@@ -116,15 +119,16 @@ async def delete_current_user_allergy(
 @users_router.patch(
     "/me/top-up",
     summary="Пополнить собственный баланс",
-    description="Для всех пользователей",
+    description="Для всех пользователей. Сумма пополнения должна быть положительной",
     responses={
             200: {'description': "Баланс пополнен"},
             401: {'model': ErrorResponse, "description": "Не авторизован"},
-            400: {'model': ErrorResponse, "description": "Некорректный запрос"}
+            400: {'model': ErrorResponse, "description": "Некорректный запрос"},
+            422: {"model": ValidationError, "description": "Ошибка валидации"}
         }
     )
 async def update_own_balance(
-    summa: int = Body(embed=True),
+    summa: int = Body(embed=True, gt=0),
     user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
     session: AsyncSession =Depends(get_session)
     ):
@@ -151,10 +155,50 @@ async def update_user_balance_admin(
     session: AsyncSession =Depends(get_session)
     ):
     change_user = await users_manager.get_by_id(session, user_id)
-    await users_manager.update_balance(session, change_user.id, summa)
+    await users_manager.update_balance(session, change_user.id, summa, BalanceOperation.ADJUSTMENT)
     return change_user
 
 
+@users_router.get(
+    "/me/transactions",
+    summary="История операций по балансу",
+    description="Пополнения, оплаты и возвраты текущего пользователя, новые сверху. Поддерживает курсорную пагинацию",
+    response_model=PaginatedResponse[BalanceTransactionResponse],
+    responses={
+        200: {"model": PaginatedResponse[BalanceTransactionResponse]},
+        401: {"model": ErrorResponse, "description": "Не авторизован"}
+        }
+    )
+async def get_own_transactions(
+    params: Annotated[PaginationParams, Depends()],
+    user=Depends(require_roles(UserRole.ADMIN, UserRole.COOK, UserRole.STUDENT)),
+    session: AsyncSession = Depends(get_replica_session)
+    ):
+    page = await balance_manager.get_history(session, user.id, params)
+    return json_response(page, PaginatedResponse[BalanceTransactionResponse])
+
+
+@users_router.get(
+    "/{user_id}/transactions",
+    summary="История операций пользователя",
+    description="Доступно только администраторам",
+    response_model=PaginatedResponse[BalanceTransactionResponse],
+    responses={
+        200: {"model": PaginatedResponse[BalanceTransactionResponse]},
+        401: {"model": ErrorResponse, "description": "Не авторизован"},
+        403: {"model": ErrorResponse, "description": "Доступ запрещен"}
+        }
+    )
+async def get_user_transactions(
+    user_id: int,
+    params: Annotated[PaginationParams, Depends()],
+    user=Depends(require_roles(UserRole.ADMIN)),
+    session: AsyncSession = Depends(get_replica_session)
+    ):
+    page = await balance_manager.get_history(session, user_id, params)
+    return json_response(page, PaginatedResponse[BalanceTransactionResponse])
+
+
 @users_router.get(
     "/",
     summary="Получить список пользователей",
@@ -171,9 +215,10 @@ async def get_users(
     role: Optional[str] = None,
     search: Optional[str] = None,
     user=Depends(require_roles(UserRole.ADMIN)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_replica_session)
     ):  
-    return await users_manager.get_all_paginated(session, params, role, search)
+    page = await users_manager.get_all_paginated(session, params, role, search)
+    return json_response(page, PaginatedResponse[UserResponse])
 
 
 @users_router.get(
@@ -191,7 +236,7 @@ async def get_users(
 async def get_user(
     user_id: int, 
     user=Depends(require_roles(UserRole.ADMIN)),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
     ):  
     return await users_manager.get_by_id(session, user_id)
 
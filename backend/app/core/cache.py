@@ -0,0 +1,89 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+from app.core.websockets_manager import notification_manager
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_TOPIC = "principal"
+
+
+class TTLCache:
+    """
+    Ограниченный LRU-кэш в памяти процесса с временем жизни записей.
+    Считает попадания и промахи, чтобы было видно, сколько запросов к БД он экономит.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Снимки пользователей для get_current_user, ключ - id пользователя
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
+
+
+async def invalidate_principal(user_id: int) -> None:
+    """
+    Сбросить снимок пользователя после изменения его строки - здесь и во всех воркерах,
+    иначе бан или смена роли в других воркерах вступили бы в силу только через ttl.
+    Вызывать после коммита.
+    """
+    principal_cache.invalidate(user_id)
+    try:
+        await notification_manager.publish_event(PRINCIPAL_TOPIC, {"user_id": user_id})
+    except Exception as e:
+        logger.warning(f"Failed to publish principal invalidation for user {user_id}: {e}")
+
+
+notification_manager.on_event(PRINCIPAL_TOPIC, lambda message: principal_cache.invalidate(message["user_id"]))
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.serialization import dump_json
+from app.core.websockets_manager import notification_manager
+from app.db.session import SessionLocalRead
+from app.models.catalog import CatalogVersion
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TOPIC = "catalog"
+
+
+class CatalogCache:
+    """
+    Кэш готовых JSON-ответов каталога (блюда, меню) в памяти процесса.
+    Записи привязаны к версии каталога: любая запись через DishCRUD, MenuCRUD или IngredientCRUD
+    коммитится через commit(), которая в той же транзакции меняет версию в таблице catalog_version,
+    и все закэшированные ответы разом устаревают.
+
+    ETag вычисляется только из версии, окна ttl и ключа запроса, поэтому на If-None-Match
+    можно ответить 304 без запроса к БД. Версия общая для всех воркеров: новая рассылается
+    через fan-out уведомлений, а на случай потерянного события каждый воркер перечитывает ее
+    из БД не реже раза в version_check_seconds. Окно ttl в ETag ограничивает жизнь 304 и после
+    правок каталога напрямую в БД.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, version_check_seconds: float):
+        self.version = self._new_version()
+        self.ttl = ttl
+        self.version_check_seconds = version_check_seconds
+        self.not_modified = 0
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._checked_at = float("-inf")
+
+    @staticmethod
+    def _new_version() -> str:
+        return secrets.token_hex(6)
+
+    def etag(self, key: Hashable) -> str:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+        return f'"{self.version}-{int(time.time() // self.ttl)}-{digest}"'
+
+    async def commit(self, session: AsyncSession) -> None:
+        """Закоммитить изменение каталога вместе с новой версией и сбросить ответы здесь и во всех воркерах."""
+        version = self._new_version()
+        await session.execute(update(CatalogVersion).values(version=version))
+        await session.commit()
+        self.adopt({"version": version})
+        try:
+            await notification_manager.publish_event(CATALOG_TOPIC, {"version": version})
+        except Exception as e:
+            logger.warning(f"Failed to publish catalog version: {e}")
+
+    async def refresh(self) -> None:
+        """Перечитать версию из БД, если с прошлой проверки прошло больше version_check_seconds."""
+        now = time.monotonic()
+        if now - self._checked_at < self.version_check_seconds:
+            return
+        self._checked_at = now
+        try:
+            async with SessionLocalRead() as session:
+                version = (await session.execute(select(CatalogVersion.version))).scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Failed to read catalog version: {e}")
+            return
+        if version is not None:
+            self.adopt({"version": version})
+
+    def adopt(self, message: dict) -> None:
+        if message["version"] != self.version:
+            self.version = message["version"]
+            self._responses.clear()
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        response_type: Any,
+        load: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        Ответ каталога с ETag: 304 по совпавшему If-None-Match, готовые байты из кэша
+        или load() -> сериализация по response_type -> кэш.
+        """
+        await self.refresh()
+        version = self.version
+        etag = self.etag(key)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        body = self._responses.get((version, key))
+        if body is None:
+            data = await load()
+            body = dump_json(data, response_type)
+            # пока читали из БД, каталог мог измениться - такой ответ не кэшируем и отдаем со старым ETag
+            if version == self.version:
+                self._responses.set((version, key), body)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {**self._responses.stats(), "version": self.version, "not_modified": self.not_modified}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.catalog_cache_size,
+    ttl=settings.catalog_cache_ttl_seconds,
+    version_check_seconds=settings.catalog_version_check_seconds,
+)
+notification_manager.on_event(CATALOG_TOPIC, catalog_cache.adopt)
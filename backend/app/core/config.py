@@ -1,10 +1,22 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./test.db"
+    auto_migrate: bool = Field(default=False, description="Apply pending schema migrations on startup (development). Deployments run 'python -m app.scripts.migrate' instead")
     
+    sqlite_profile: Literal["default", "production"] = Field(default="default", description="SQLite engine tuning: 'default' (driver defaults, one pool) or 'production' (WAL and pragmas, one writer connection plus a read-only pool for GET requests)")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, description="How long a connection waits for a lock before 'database is locked' (production profile)")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, ge=0, description="Bytes of the database file read through mmap (production profile)")
+    sqlite_cache_size_kib: int = Field(default=64 * 1024, ge=0, description="Page cache per connection in KiB (production profile)")
+    sqlite_read_pool_size: int = Field(default=4, ge=1, description="Read-only connections serving GET requests (production profile)")
+
+    database_replica_urls: List[str] = Field(default_factory=list, description="Read replicas for list and statistics endpoints, as a JSON list of URLs (e.g. a copy of the SQLite file)")
+    replica_read_your_writes_seconds: float = Field(default=5, ge=0, description="After a user's own write, their reads go to the primary for this long")
+    replica_retry_seconds: float = Field(default=30, gt=0, description="How long a replica that failed to connect is skipped")
+
     jwt_secret_key: str = Field(
         default="your-super-secret-key-change-in-production",
         description="Secret key for JWT token signing. MUST be changed in production!"
@@ -12,7 +24,39 @@ class Settings(BaseSettings):
     jwt_algorithm: str = Field(default="HS256", description="JWT signing algorithm")
     access_ttl_minutes: int = Field(default=30, description="Access token lifetime in minutes")
     refresh_ttl_days: int = Field(default=7, description="Refresh token lifetime in days")
-    
+
+    principal_cache_size: int = Field(default=10000, description="Max number of users kept in the principal cache (0 disables it)")
+    principal_cache_ttl_seconds: float = Field(default=30, description="Principal cache entry lifetime in seconds")
+
+    catalog_cache_size: int = Field(default=1000, description="Max number of serialized dish/menu responses kept in memory (0 disables it)")
+    catalog_cache_ttl_seconds: float = Field(default=3600, gt=0, description="Upper bound on catalog response lifetime, e.g. after edits made directly in the database")
+    catalog_version_check_seconds: float = Field(default=1, ge=0, description="How often each worker re-reads the catalog version from the database, in case a fan-out event was lost")
+
+    fast_json_responses: bool = Field(default=True, description="Serialize list responses once with cached TypeAdapters and pydantic-core JSON instead of FastAPI's default response_model path")
+
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, description="bcrypt cost factor for new password hashes")
+    password_hash_workers: int = Field(default=4, ge=1, description="Threads dedicated to password hashing")
+
+    notification_flush_ms: float = Field(default=5, ge=0, description="How long notifications are collected before one batched INSERT")
+    notification_batch_size: int = Field(default=500, ge=1, description="Max notifications written by one INSERT")
+
+    ws_fanout_backend: Literal["memory", "sqlite"] = Field(default="memory", description="How websocket messages reach other workers: 'memory' (single process) or 'sqlite' (shared file, several workers on one host)")
+    ws_fanout_sqlite_path: str = Field(default="./ws_fanout.db", description="Shared SQLite file for the 'sqlite' fan-out backend")
+    ws_fanout_poll_ms: float = Field(default=50, gt=0, description="How often each worker polls the fan-out table")
+    ws_fanout_retention_seconds: float = Field(default=60, gt=0, description="How long published fan-out events are kept")
+    ws_send_queue_size: int = Field(default=100, ge=1, description="Outgoing messages buffered per websocket")
+    ws_slow_consumer_policy: Literal["drop_oldest", "drop_newest", "disconnect"] = Field(default="drop_oldest", description="What to do when a websocket's outgoing queue is full")
+
+    kitchen_board_resync_seconds: float = Field(default=60, gt=0, description="How often each worker reloads the kitchen board from the database; bounds how long a lost delta stays visible")
+
+    subscription_materialize_interval_seconds: float = Field(default=600, gt=0, description="How often subscription days that have come are turned into orders")
+
+    report_workers: Optional[int] = Field(default=None, ge=1, description="Processes rendering PDF reports (default: number of CPU cores)")
+    report_pending_timeout_seconds: float = Field(default=600, gt=0, description="A report still pending after this long is treated as failed (its job was lost) and generated again")
+
+    metrics_enabled: bool = Field(default=True, description="Count SQL statements and DB time per route and serve them with request latencies at GET /metrics")
+    metrics_token: Optional[str] = Field(default=None, description="If set, GET /metrics requires 'Authorization: Bearer <token>'")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
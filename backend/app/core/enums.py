@@ -23,4 +23,20 @@ class Reports(str, Enum):
     PAYMENT = "payments" 
     ATTEND = "attendance"
     DISH = "nutrirtion"
-    ALL = "full"
\ No newline at end of file
+    ALL = "full"
+
+
+class ReportStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class BalanceOperation(str, Enum):
+    OPENING = "opening"                      # остаток на момент появления журнала
+    TOP_UP = "top_up"
+    ADJUSTMENT = "adjustment"                # изменение баланса администратором
+    ORDER_PAYMENT = "order_payment"
+    ORDER_REFUND = "order_refund"
+    SUBSCRIPTION_PAYMENT = "subscription_payment"
+    SUBSCRIPTION_REFUND = "subscription_refund"
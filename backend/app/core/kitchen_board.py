@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import WebSocket
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import OrderStatus
+from app.core.websockets_manager import ConnectionManager, notification_manager
+from app.models.associations import OrderItem
+from app.models.dish import Dish
+from app.db.session import SessionLocalRead
+from app.models.order import Order
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_TOPIC = "kitchen"
+
+
+class KitchenDelta:
+    """Изменение доски кухни от смены статусов заказов: dish_id -> [название, +-PAID, +-READY] в порциях."""
+
+    def __init__(self):
+        self.changes: Dict[int, list] = {}
+
+    def move(self, old_status: Optional[OrderStatus], new_status: OrderStatus, items: Iterable[Tuple[int, str, int]]) -> None:
+        """Заказ с позициями (dish_id, название, количество) перешел из old_status (None - новый) в new_status."""
+        for dish_id, name, quantity in items:
+            change = self.changes.setdefault(dish_id, [name, 0, 0])
+            if old_status == OrderStatus.PAID:
+                change[1] -= quantity
+            elif old_status == OrderStatus.READY:
+                change[2] -= quantity
+            if new_status == OrderStatus.PAID:
+                change[1] += quantity
+            elif new_status == OrderStatus.READY:
+                change[2] += quantity
+
+    def __bool__(self) -> bool:
+        return any(paid or ready for _, paid, ready in self.changes.values())
+
+
+class KitchenBoard:
+    """
+    Доска кухни: сколько порций каждого блюда в сегодняшних заказах ждет приготовления (PAID)
+    и выдачи (READY). Заполняется из БД один раз при старте, дальше меняется только дельтами
+    из OrderCRUD и материализации абонементов - после коммита они рассылаются всем воркерам
+    через fan-out уведомлений, и каждый воркер правит свою копию и шлет дельту своим экранам.
+    Снимок и дельты не требуют запросов к БД, сколько бы экранов ни было подключено.
+    С наступлением нового дня доска начинается с нуля: все заказы дня приходят дельтами.
+
+    Дельта может не дойти (сбой публикации, memory fan-out при нескольких воркерах), поэтому
+    доска раз в resync_seconds перечитывается из БД, а раньше - если дельты воркера пришли
+    с пропуском номера, публикация не удалась или счетчик ушел в минус.
+    """
+
+    def __init__(self, resync_seconds: float):
+        self.resync_seconds = resync_seconds
+        self.day: Optional[date] = None
+        self.version = 0
+        self._counts: Dict[int, List[int]] = {}   # dish_id -> [PAID, READY]
+        self._names: Dict[int, str] = {}
+        self.screens = ConnectionManager()          # сокеты экранов этого воркера, без fan-out
+        self._origin = uuid.uuid4().hex
+        self._seq = 0
+        self._last_seq: Dict[str, int] = {}         # воркер -> номер последней его дельты
+        self._loading: Optional[List[dict]] = None  # дельты, пришедшие во время load()
+        self._resync = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request_resync(self, reason: str) -> None:
+        if not self._resync.is_set():
+            logger.warning(f"Kitchen board resync requested: {reason}")
+            self._resync.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._resync.wait(), timeout=self.resync_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._resync.clear()
+            try:
+                async with SessionLocalRead() as session:
+                    await self.load(session)
+            except Exception as e:
+                logger.error(f"Kitchen board reload failed: {e}")
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Перечитать доску из БД. Дельты, пришедшие во время запроса, применяются поверх
+        снимка; если какая-то из них уже попала в снимок, расхождение исправит следующая сверка.
+        """
+        today = date.today()
+        start = datetime.combine(today, time.min)
+        stmt = (
+            select(OrderItem.dish_id, Dish.name, Order.status, func.sum(OrderItem.quantity))
+            .join(Order, OrderItem.order_id == Order.id)
+            .join(Dish, OrderItem.dish_id == Dish.id)
+            .where(
+                Order.status.in_([OrderStatus.PAID, OrderStatus.READY]),
+                Order.ordered_at >= start,
+                Order.ordered_at < start + timedelta(days=1)
+            )
+            .group_by(OrderItem.dish_id, Dish.name, Order.status)
+        )
+        self._loading = []
+        try:
+            rows = (await session.execute(stmt)).all()
+        except BaseException:
+            pending, self._loading = self._loading, None
+            for message in pending:
+                self._apply(message)
+            raise
+        counts: Dict[int, List[int]] = {}
+        names: Dict[int, str] = {}
+        for dish_id, name, status, quantity in rows:
+            counts.setdefault(dish_id, [0, 0])[0 if status == OrderStatus.PAID else 1] += quantity
+            names[dish_id] = name
+        changed = today != self.day or counts != self._counts
+        self.day, self._counts, self._names = today, counts, names
+        self.version += 1
+        pending, self._loading = self._loading, None
+        if changed:
+            self._send({"type": "snapshot", **self._dishes()})
+        for message in pending:
+            self._apply(message)
+        logger.debug(f"Kitchen board loaded: {len(counts)} dishes for {today}")
+
+    async def publish(self, ordered_at: datetime, delta: KitchenDelta) -> None:
+        """Разослать изменение всем воркерам (включая этот). Вызывать после коммита."""
+        if ordered_at.date() != date.today() or not delta:
+            return
+        # номер растет и при неудачной публикации: другие воркеры увидят пропуск и перечитают доску
+        self._seq += 1
+        message = {
+            "origin": self._origin,
+            "seq": self._seq,
+            "day": ordered_at.date().isoformat(),
+            "changes": [[dish_id, name, paid, ready] for dish_id, (name, paid, ready) in delta.changes.items() if paid or ready],
+        }
+        try:
+            await notification_manager.publish_event(KITCHEN_TOPIC, message)
+        except Exception as e:
+            self.request_resync(f"failed to publish delta: {e}")
+
+    def apply(self, message: dict) -> None:
+        if self._loading is not None:
+            self._loading.append(message)
+            return
+        self._apply(message)
+
+    def _apply(self, message: dict) -> None:
+        origin, seq = message.get("origin"), message.get("seq")
+        if origin is not None:
+            last = self._last_seq.get(origin)
+            if last is not None and seq != last + 1:
+                self.request_resync(f"deltas {last + 1}..{seq - 1} from worker {origin} were lost")
+            self._last_seq[origin] = max(seq, last or 0)
+
+        day = date.fromisoformat(message["day"])
+        if self.day is None or day > self.day:
+            self._start_day(day)
+        elif day < self.day:
+            return
+
+        self.version += 1
+        changes = []
+        for dish_id, name, paid, ready in message["changes"]:
+            counts = self._counts.setdefault(dish_id, [0, 0])
+            counts[0] += paid
+            counts[1] += ready
+            if counts[0] < 0 or counts[1] < 0:
+                self.request_resync(f"negative count for dish {dish_id}")
+                counts[0], counts[1] = max(0, counts[0]), max(0, counts[1])
+            if name:
+                self._names[dish_id] = name
+            changes.append({
+                "dish_id": dish_id, "name": self._names.get(dish_id),
+                "paid": paid, "ready": ready, "paid_total": counts[0], "ready_total": counts[1],
+            })
+            if counts == [0, 0]:
+                del self._counts[dish_id]
+        self._send({"type": "delta", "day": self.day.isoformat(), "version": self.version, "changes": changes})
+
+    def snapshot(self) -> dict:
+        today = date.today()
+        if self.day != today:
+            self._start_day(today)
+        return {**self._dishes(), "day": self.day}
+
+    def _dishes(self) -> dict:
+        return {
+            "day": self.day.isoformat(),
+            "version": self.version,
+            "dishes": [
+                {"dish_id": dish_id, "name": self._names.get(dish_id), "paid": paid, "ready": ready}
+                for dish_id, (paid, ready) in sorted(self._counts.items(), key=lambda item: (-item[1][0], item[0]))
+            ],
+        }
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> None:
+        """Подключить экран: первым сообщением уходит снимок, дальше - дельты."""
+        await self.screens.connect(user_id, websocket)
+        snapshot = self.snapshot()
+        self.screens.active_connections[user_id][-1].offer({"type": "snapshot", **snapshot, "day": snapshot["day"].isoformat()})
+
+    def _start_day(self, day: date) -> None:
+        had_orders = bool(self._counts)
+        self.day = day
+        self._counts = {}
+        self.version += 1
+        if had_orders:
+            self._send({"type": "snapshot", "day": day.isoformat(), "version": self.version, "dishes": []})
+
+    def _send(self, message: dict) -> None:
+        for connections in self.screens.active_connections.values():
+            for connection in connections:
+                connection.offer(message)
+
+
+kitchen_board = KitchenBoard(resync_seconds=settings.kitchen_board_resync_seconds)
+notification_manager.on_event(KITCHEN_TOPIC, kitchen_board.apply)
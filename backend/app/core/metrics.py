@@ -0,0 +1,175 @@
+"""
+Метрики запросов в формате Prometheus (GET /metrics).
+
+MetricsMiddleware кладет в contextvar счетчик текущего запроса, хуки движков SQLAlchemy
+(before/after_cursor_execute) прибавляют к нему число запросов к БД и время в БД.
+По завершении запроса все это записывается с метками method, route (шаблон пути, а не сам путь)
+и status. Запросы к БД вне HTTP-запросов (фоновые задачи) считаются отдельно.
+Метрики - в памяти воркера, каждый воркер отдает свои.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetrics:
+    __slots__ = ("statements", "db_seconds", "open")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.open = True
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self.statements: Dict[Tuple[str, str], Histogram] = {}
+        self.db_seconds: Dict[Tuple[str, str], float] = {}
+        self.background_statements = 0
+        self.background_db_seconds = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, request: RequestMetrics) -> None:
+        key = (method, route, str(status))
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+        route_key = (method, route)
+        histogram = self.statements.get(route_key)
+        if histogram is None:
+            histogram = self.statements[route_key] = Histogram(STATEMENT_BUCKETS)
+        histogram.observe(request.statements)
+        self.db_seconds[route_key] = self.db_seconds.get(route_key, 0.0) + request.db_seconds
+
+    def observe_statement(self, seconds: float) -> None:
+        request = current_request.get()
+        if request is not None and request.open:
+            request.statements += 1
+            request.db_seconds += seconds
+        else:
+            self.background_statements += 1
+            self.background_db_seconds += seconds
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.latency.items()):
+            _render_histogram(lines, "http_request_duration_seconds", f'method="{method}",route="{_escape(route)}",status="{status}"', histogram)
+
+        lines += [
+            "# HELP http_request_db_statements SQL statements executed per HTTP request.",
+            "# TYPE http_request_db_statements histogram",
+        ]
+        for (method, route), histogram in sorted(self.statements.items()):
+            _render_histogram(lines, "http_request_db_statements", f'method="{method}",route="{_escape(route)}"', histogram)
+
+        lines += [
+            "# HELP http_request_db_seconds_total Time spent executing SQL statements during HTTP requests.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(self.db_seconds.items()):
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds:.6f}')
+
+        lines += [
+            "# HELP db_background_statements_total SQL statements executed outside HTTP requests.",
+            "# TYPE db_background_statements_total counter",
+            f"db_background_statements_total {self.background_statements}",
+            "# HELP db_background_seconds_total Time spent executing SQL statements outside HTTP requests.",
+            "# TYPE db_background_seconds_total counter",
+            f"db_background_seconds_total {self.background_db_seconds:.6f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(lines: list, name: str, labels: str, histogram: Histogram) -> None:
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:g}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Хуки времени и числа SQL-запросов на синхронный движок (AsyncEngine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.observe_statement(time.perf_counter() - context._metrics_started)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: латентность и SQL-счетчики каждого HTTP-запроса."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = current_request.set(request)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request.open = False
+            current_request.reset(token)
+            # шаблон маршрута ("/orders/{order_id}") роутер FastAPI кладет в scope при совпадении
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            metrics.observe_request(scope["method"], route, status, time.perf_counter() - started, request)
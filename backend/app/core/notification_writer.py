@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, literal, select
+
+from app.core.config import settings
+from app.core.enums import UserRole
+from app.core.websockets_manager import notification_manager
+from app.db.session import SessionLocalAsync
+from app.models.notification import Notification
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ATTEMPTS = 3           # попыток записать уведомление, поставленное без ожидания (enqueue)
+RETRY_DELAY_SECONDS = 0.5    # пауза перед повтором, растет с номером попытки
+
+
+class NotificationWriter:
+    """
+    Write-behind запись уведомлений.
+    Копит уведомления flush_ms миллисекунд (или до batch_size штук), сохраняет их
+    одной многострочной вставкой в одной транзакции и только потом рассылает по WebSocket.
+    Если запись пачки не удалась, ожидающие write() получают исключение, а уведомления
+    из enqueue возвращаются в начало очереди и пишутся повторно (до FLUSH_ATTEMPTS попыток).
+    """
+
+    def __init__(self, flush_ms: float, batch_size: int):
+        self.flush_ms = flush_ms
+        self.batch_size = batch_size
+        self._pending: list[tuple[dict, Optional[asyncio.Future], int]] = []   # (значения, future, попытка)
+        self._has_items: Optional[asyncio.Event] = None
+        self._is_full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._has_items = asyncio.Event()
+        self._is_full = asyncio.Event()
+        if self._pending:
+            self._has_items.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановить фоновую задачу, дописав все, что осталось в очереди.
+        Задача не отменяется: текущая пачка дописывается, а цикл сам выходит, когда очередь пуста.
+        """
+        self._stopping = True
+        try:
+            if self._task is not None:
+                self._has_items.set()
+                await self._task
+                self._task = None
+            while self._pending:
+                await self._flush_pending()
+        finally:
+            self._stopping = False
+
+    def enqueue(self, user_id: int, title: str, body: str) -> None:
+        """Поставить уведомление в очередь, не дожидаясь записи."""
+        self._put({"user_id": user_id, "title": title, "body": body, "read": False}, None)
+
+    def enqueue_many(self, notifications: List[Tuple[int, str, str]]) -> None:
+        """Поставить в очередь сразу пачку уведомлений (user_id, title, body) - они уйдут общими вставками."""
+        for user_id, title, body in notifications:
+            self._put({"user_id": user_id, "title": title, "body": body, "read": False}, None)
+
+    def enqueue_for_role(self, role: UserRole, title: str, body: str) -> None:
+        """Уведомление всем пользователям роли. Получатели выбираются уже в фоне, при записи пачки."""
+        self._put({"role": role, "title": title, "body": body, "read": False}, None)
+
+    async def write(self, user_id: int, title: str, body: str) -> Notification:
+        """Поставить уведомление в очередь и дождаться коммита пачки, в которую оно попало."""
+        future = asyncio.get_running_loop().create_future()
+        self._put({"user_id": user_id, "title": title, "body": body, "read": False}, future)
+        return await future
+
+    def _put(self, values: dict, future: Optional[asyncio.Future]) -> None:
+        self.start()
+        self._pending.append((values, future, 1))
+        self._has_items.set()
+        if len(self._pending) >= self.batch_size:
+            self._is_full.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_items.wait()
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._is_full.wait(), timeout=self.flush_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_pending()
+            if self._stopping and not self._pending:
+                return
+
+    async def _flush_pending(self) -> None:
+        batch = self._pending[:self.batch_size]
+        del self._pending[:self.batch_size]
+        if len(self._pending) < self.batch_size:
+            self._is_full.clear()
+        if not self._pending:
+            self._has_items.clear()
+        if batch:
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, Optional[asyncio.Future], int]]) -> None:
+        direct = [(values, future) for values, future, _ in batch if "role" not in values]
+        by_role = [values for values, _, _ in batch if "role" in values]
+        try:
+            async with SessionLocalAsync() as session:
+                notifications = []
+                if direct:
+                    # один INSERT ... VALUES (...), (...) на всю пачку; id выдаются по порядку строк,
+                    # поэтому сортировка по id восстанавливает соответствие строкам пачки
+                    stmt = insert(Notification).values([values for values, _ in direct]).returning(Notification)
+                    notifications = sorted((await session.execute(stmt)).scalars().all(), key=lambda n: n.id)
+
+                for values in by_role:
+                    # получатели выбираются тем же INSERT ... SELECT - без отдельного чтения перед записью
+                    recipients = select(
+                        User.id, literal(values["title"]), literal(values["body"]), literal(False)
+                    ).where(User.role == values["role"])
+                    stmt = (
+                        insert(Notification)
+                        .from_select(["user_id", "title", "body", "read"], recipients)
+                        .returning(Notification)
+                    )
+                    notifications.extend((await session.execute(stmt)).scalars().all())
+
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} notifications: {e}")
+            self._retry(batch, e)
+            if any(future is None for _, future, _ in batch):
+                await asyncio.sleep(RETRY_DELAY_SECONDS * batch[0][2])
+            return
+
+        for notification, (_, future) in zip(notifications, direct):
+            if future is not None and not future.done():
+                future.set_result(notification)
+
+        for notification in notifications:
+            try:
+                await notification_manager.send_personal_notification(
+                    user_id=notification.user_id,
+                    message={
+                        "type": "new_notification",
+                        "id": notification.id,
+                        "title": notification.title,
+                        "body": notification.body,
+                        "read": notification.read,
+                        "created_at": notification.created_at.isoformat()
+                    }
+                )
+            except Exception as e:
+                logger.warning(f"Failed to push notification {notification.id}: {e}")
+
+
+    def _retry(self, batch: list[tuple[dict, Optional[asyncio.Future], int]], error: Exception) -> None:
+        """Вызывающие write() узнают об ошибке сами; уведомления из enqueue - обратно в начало очереди."""
+        retry = []
+        for values, future, attempt in batch:
+            if future is not None:
+                if not future.done():
+                    future.set_exception(error)
+            elif attempt < FLUSH_ATTEMPTS:
+                retry.append((values, None, attempt + 1))
+            else:
+                logger.error(f"Dropping notification after {attempt} attempts: {values}")
+        if retry:
+            self._pending[:0] = retry
+            self._has_items.set()
+            if len(self._pending) >= self.batch_size:
+                self._is_full.set()
+
+
+notification_writer = NotificationWriter(
+    flush_ms=settings.notification_flush_ms,
+    batch_size=settings.notification_batch_size,
+)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import ReportStatus
+from app.core.utils.generation import collect_report_data, report_filepath, report_names
+from app.core.utils.pdf_gen import render_pdf
+from app.core.websockets_manager import notification_manager
+from app.crud.reports import reports_manager
+from app.db.session import SessionLocalAsync, SessionLocalRead
+from app.models.report import Report
+from app.schemas.report import GenerateReportRequest
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobRunner:
+    """
+    Фоновое формирование PDF-отчетов.
+    Запрос только создает запись отчета со статусом pending и сразу отвечает.
+    Данные собираются в event loop короткими запросами, а рендер ReportLab
+    выполняется в пуле процессов, поэтому не блокирует обработку заказов
+    и масштабируется по числу ядер.
+    """
+
+    def __init__(self, workers: Optional[int]):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: не копировать в дочерние процессы event loop, потоки и соединения с БД
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def enqueue(self, session: AsyncSession, request: GenerateReportRequest, user_id: int) -> Report:
+        """Вернуть подходящий готовый/формирующийся отчет с такими же параметрами (см. ReportCRUD.get) или поставить новый в очередь."""
+        report = await reports_manager.get(session, request)
+        if report:
+            return report
+
+        filepath = report_filepath(request)
+        report = await reports_manager.create(session, request, filepath, status=ReportStatus.PENDING)
+
+        task = asyncio.create_task(self._run(report.id, request, filepath, user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return report
+
+    async def stop(self) -> None:
+        """Прервать незавершенные задания (они будут помечены failed) и остановить пул."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, report_id: int, request: GenerateReportRequest, filepath: str, user_id: int) -> None:
+        error = None
+        try:
+            async with SessionLocalRead() as session:
+                data = await collect_report_data(session, request)
+
+            render = partial(
+                render_pdf,
+                report_names[request.report_type],
+                request.date_from,
+                request.date_to,
+                filepath,
+                **data
+            )
+            await asyncio.get_running_loop().run_in_executor(self._get_pool(), render)
+        except asyncio.CancelledError:
+            error = "Формирование прервано остановкой сервера"
+            await self._finish(report_id, filepath, user_id, error)
+            raise
+        except Exception as e:
+            logger.error(f"Report {report_id} generation failed: {e}")
+            error = str(e) or e.__class__.__name__
+
+        await self._finish(report_id, filepath, user_id, error)
+
+    async def _finish(self, report_id: int, filepath: str, user_id: int, error: Optional[str]) -> None:
+        status = ReportStatus.FAILED if error else ReportStatus.READY
+        try:
+            async with SessionLocalAsync() as session:
+                await reports_manager.set_status(session, report_id, status, error)
+        except Exception as e:
+            logger.error(f"Failed to save status of report {report_id}: {e}")
+            return
+
+        try:
+            await notification_manager.send_personal_notification(
+                user_id=user_id,
+                message={
+                    "type": "report_ready",
+                    "id": report_id,
+                    "status": status.value,
+                    "download_url": filepath,
+                    "error": error
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Failed to push report {report_id} status: {e}")
+
+
+report_jobs = ReportJobRunner(workers=settings.report_workers)
@@ -11,6 +11,8 @@ from app.schemas.validation import ErrorResponse
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", refreshUrl="/auth/refresh_token")
+# для публичных эндпоинтов, где авторизация нужна только для части запросов
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", refreshUrl="/auth/refresh_token", auto_error=False)
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -23,7 +25,14 @@ async def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, 
                             detail=f"Wrong token type. Expected 'access', got '{payload['type']}'")
 
-    return await users_manager.get_by_id(session, int(payload["sub"]))
+    user = await users_manager.get_principal(session, int(payload["sub"]))
+    # коммиты этой сессии - записи пользователя (read-your-writes для чтения с реплик)
+    session.info["user_id"] = user.id
+    if session.in_transaction():
+        # промах кэша: вернуть соединение в пул сразу, а не в конце запроса
+        # (в профиле production это единственное пишущее соединение)
+        await session.commit()
+    return user
 
 
 def require_roles(*allowed_roles: UserRole):
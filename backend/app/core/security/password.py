@@ -1,9 +1,37 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+from app.core.config import settings
+
+# bcrypt отпускает GIL, поэтому хэши считаются в отдельных потоках и не блокируют event loop.
+# Размер пула ограничен, чтобы пик логинов не съел все ядра.
+_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt")
+
+
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed.encode()) 
\ No newline at end of file
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Хэш посчитан со стоимостью, отличной от settings.bcrypt_rounds ($2b$<cost>$...)."""
+    try:
+        return int(hashed.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password, password, hashed)
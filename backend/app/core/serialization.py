@@ -0,0 +1,40 @@
+"""
+Быстрая сериализация ответов списков.
+
+По умолчанию FastAPI превращает возвращенную модель в dict, заново валидирует его по
+response_model и кодирует стандартным json. Для ответов CRUD-слоя, которым мы доверяем,
+json_response валидирует данные (ORM-объекты через from_attributes) один раз закэшированным
+TypeAdapter и сразу кодирует их в JSON средствами pydantic-core (Rust), минуя dict и json.dumps.
+Тело ответа совпадает с обычным путем; response_model у эндпоинта остается для OpenAPI.
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def adapter(response_type: Any) -> TypeAdapter:
+    """TypeAdapter на тип ответа; строится один раз на процесс."""
+    cached = _adapters.get(response_type)
+    if cached is None:
+        cached = _adapters[response_type] = TypeAdapter(response_type)
+    return cached
+
+
+def dump_json(data: Any, response_type: Any) -> bytes:
+    type_adapter = adapter(response_type)
+    return type_adapter.dump_json(type_adapter.validate_python(data, from_attributes=True))
+
+
+def json_response(data: Any, response_type: Any, status_code: int = 200, headers: Optional[dict] = None) -> Any:
+    """
+    Готовый JSON-ответ по response_type. При FAST_JSON_RESPONSES=false возвращает data как есть,
+    и ответ строит FastAPI обычным путем (для сравнения в benchmarks.serialization).
+    """
+    if not settings.fast_json_responses:
+        return data
+    return Response(content=dump_json(data, response_type), status_code=status_code, media_type="application/json", headers=headers)
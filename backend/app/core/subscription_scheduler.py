@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.crud.subscription import subscriptions_manager
+from app.db.session import SessionLocalAsync
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionScheduler:
+    """
+    Фоновая задача: при старте и затем раз в interval_seconds создает заказы
+    за наступившие дни абонементов. Повторный запуск в тот же день ничего не делает.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with SessionLocalAsync() as session:
+                    await subscriptions_manager.materialize_due(session, force=True)
+            except Exception as e:
+                logger.error(f"Subscription materialization failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+
+subscription_scheduler = SubscriptionScheduler(interval_seconds=settings.subscription_materialize_interval_seconds)
@@ -153,4 +153,35 @@ class ReportGenerator:
     def get_pdf_bytes(self) -> BytesIO:
         self.c.save()
         self.buffer.seek(0)
-        return self.buffer
\ No newline at end of file
+        return self.buffer
+
+
+def render_pdf(
+    title: str,
+    date_from: date,
+    date_to: date,
+    filepath: str,
+    payments=None,
+    attendance=None,
+    dishes=None
+) -> None:
+    """
+    Собрать PDF по готовым данным и записать его в filepath.
+    Не трогает БД и event loop - вызывается в пуле процессов (см. app.core.report_jobs).
+    """
+    generator = ReportGenerator()
+    generator.add_title_page(title, date_from, date_to)
+
+    if payments is not None:
+        generator.add_payments_section(payments)
+    if attendance is not None:
+        generator.add_attendance_section(attendance)
+    if dishes is not None:
+        generator.add_dishes_section(dishes)
+
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    # пишем во временный файл, чтобы по download_url никогда не отдавался недописанный PDF
+    partial_path = f"{filepath}.part"
+    with open(partial_path, "wb") as out_file:
+        out_file.write(generator.get_pdf_bytes().read())
+    os.replace(partial_path, filepath)
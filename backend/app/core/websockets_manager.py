@@ -1,33 +1,287 @@
+import asyncio
+from abc import ABC, abstractmethod
+import json
+import logging
+import sqlite3
+import threading
+import time
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutBackend(ABC):
+    """
+    Доставка сообщений во все воркеры приложения.
+    publish() отправляет конверт {"user_id": ..., "message": ...}, а deliver вызывается
+    в каждом воркере для каждого опубликованного конверта.
+    """
 
-class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.deliver: Optional[Callable[[dict], Awaitable[None]]] = None
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, envelope: dict) -> None:
+        ...
+
+
+class InMemoryFanout(FanoutBackend):
+    """Один процесс: конверт сразу доставляется локальным сокетам."""
+
+    async def publish(self, envelope: dict) -> None:
+        if self.deliver is not None:
+            await self.deliver(envelope)
+
+
+class SqliteFanout(FanoutBackend):
+    """
+    Несколько воркеров на одном хосте без внешних сервисов.
+    Конверты пишутся в общий SQLite-файл, каждый воркер опрашивает новые строки
+    и доставляет их своим сокетам (включая те, что опубликовал сам).
+    """
+
+    def __init__(self, path: str, poll_ms: float, retention_seconds: float):
+        super().__init__()
+        self.path = path
+        self.poll_ms = poll_ms
+        self.retention_seconds = retention_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._open)
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def publish(self, envelope: dict) -> None:
+        payload = json.dumps(envelope, ensure_ascii=False, default=str)
+        await asyncio.to_thread(self._execute, "INSERT INTO ws_events (created, payload) VALUES (?, ?)", (time.time(), payload))
+
+    def _open(self) -> None:
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ws_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        # старые события этому воркеру не нужны - начинаем с конца таблицы
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM ws_events").fetchone()[0]
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _poll(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            try:
+                rows = await asyncio.to_thread(
+                    self._execute, "SELECT id, payload FROM ws_events WHERE id > ? ORDER BY id", (self._last_id,)
+                )
+                for event_id, payload in rows:
+                    self._last_id = event_id
+                    if self.deliver is not None:
+                        await self.deliver(json.loads(payload))
+
+                if time.monotonic() - last_prune > self.retention_seconds:
+                    last_prune = time.monotonic()
+                    await asyncio.to_thread(
+                        self._execute, "DELETE FROM ws_events WHERE created < ?", (time.time() - self.retention_seconds,)
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Websocket fan-out poll failed: {e}")
+
+            await asyncio.sleep(self.poll_ms / 1000)
+
 
-    async def connect(self, user_id: int, websocket: WebSocket):    
+def create_fanout_backend() -> FanoutBackend:
+    if settings.ws_fanout_backend == "sqlite":
+        return SqliteFanout(
+            path=settings.ws_fanout_sqlite_path,
+            poll_ms=settings.ws_fanout_poll_ms,
+            retention_seconds=settings.ws_fanout_retention_seconds,
+        )
+    return InMemoryFanout()
+
+
+class ClientConnection:
+    """
+    Сокет с ограниченной очередью исходящих сообщений и собственной задачей-писателем.
+    Медленный клиент копит очередь у себя и не задерживает доставку остальным.
+    """
+
+    def __init__(self, manager: "ConnectionManager", user_id: int, websocket: WebSocket, max_queue: int):
+        self.manager = manager
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.task = asyncio.create_task(self._writer())
+
+    def offer(self, message: dict) -> None:
+        """Положить сообщение в очередь, при переполнении применить политику slow_consumer_policy."""
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+            return
+
+        self.manager.messages_dropped += 1
+        policy = self.manager.slow_consumer_policy
+        if policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+        elif policy == "disconnect":
+            self.manager.slow_disconnects += 1
+            self.manager.unregister(self)
+            self.manager.close_later(self, code=1013)
+        # drop_newest: новое сообщение просто не попадает в очередь
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+    async def _writer(self) -> None:
+        while True:
+            message = await self.queue.get()
+            try:
+                await self.websocket.send_json(message)
+                self.manager.messages_sent += 1
+            except Exception as e:
+                logger.info(f"Dropping websocket of user {self.user_id} after send error: {e}")
+                self.manager.send_errors += 1
+                # закрывает отдельная задача: unregister отменяет этого писателя
+                self.manager.close_later(self, code=1011)
+                self.manager.unregister(self)
+                return
+
+    async def close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    def __init__(self, backend: Optional[FanoutBackend] = None):
+        self.active_connections: Dict[int, List[ClientConnection]] = {}
+        self.backend = backend or InMemoryFanout()
+        self.backend.deliver = self._deliver_local
+        self.event_listeners: Dict[str, Callable[[dict], None]] = {}
+
+        self.max_queue = settings.ws_send_queue_size
+        self.slow_consumer_policy = settings.ws_slow_consumer_policy
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_disconnects = 0
+        self.send_errors = 0
+        self._closing: set = set()   # задачи закрытия сокетов; asyncio хранит задачи только по слабым ссылкам
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+        for user_connections in list(self.active_connections.values()):
+            for connection in list(user_connections):
+                self.unregister(connection)
+                self.close_later(connection, code=1001)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def close_later(self, connection: ClientConnection, code: int) -> None:
+        """Закрыть сокет в фоне, не теряя ссылку на задачу."""
+        task = asyncio.create_task(connection.close(code=code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def connect(self, user_id: int, websocket: WebSocket):
         await websocket.accept()
         if user_id not in self.active_connections:
             self.active_connections[user_id] = []
-        self.active_connections[user_id].append(websocket)
+        self.active_connections[user_id].append(ClientConnection(self, user_id, websocket, self.max_queue))
 
     def disconnect(self, user_id: int, websocket: WebSocket):
-        if user_id in self.active_connections:
-            self.active_connections[user_id].remove(websocket)
-            if not self.active_connections[user_id]:
-                del self.active_connections[user_id]
+        for connection in list(self.active_connections.get(user_id, [])):
+            if connection.websocket is websocket:
+                self.unregister(connection)
+
+    def unregister(self, connection: ClientConnection):
+        user_connections = self.active_connections.get(connection.user_id)
+        if user_connections and connection in user_connections:
+            user_connections.remove(connection)
+            if not user_connections:
+                del self.active_connections[connection.user_id]
+        connection.cancel()
 
     async def send_personal_notification(self, user_id: int, message: dict):
-        """Отправить уведомление конкретному пользователю"""
-        if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                await connection.send_json(message)
+        """Отправить уведомление конкретному пользователю (в каком бы воркере он ни был подключен)"""
+        await self.backend.publish({"user_id": user_id, "message": message})
 
     async def broadcast(self, message: dict):
-        """Отправить уведомление вообще всем, кто в сети"""
-        for user_connections in self.active_connections.values():
-            for connection in user_connections:
-                await connection.send_json(message)
+        """Отправить уведомление вообще всем, кто в сети, во всех воркерах"""
+        await self.backend.publish({"user_id": None, "message": message})
+
+    def on_event(self, topic: str, listener: Callable[[dict], None]):
+        """Подписать обработчик на служебные события между воркерами (не уходят в сокеты)"""
+        self.event_listeners[topic] = listener
+
+    async def publish_event(self, topic: str, message: dict):
+        """Служебное событие для всех воркеров, включая текущий"""
+        await self.backend.publish({"user_id": None, "topic": topic, "message": message})
+
+    async def _deliver_local(self, envelope: dict):
+        """Разложить конверт по очередям сокетов этого воркера. Сама отправка идет в их писателях параллельно"""
+        user_id, message = envelope["user_id"], envelope["message"]
+        topic = envelope.get("topic")
+        if topic is not None:
+            listener = self.event_listeners.get(topic)
+            if listener is not None:
+                listener(message)
+            return
+
+        if user_id is None:
+            targets = [connection for user_connections in self.active_connections.values() for connection in user_connections]
+        else:
+            targets = list(self.active_connections.get(user_id, []))
+
+        for connection in targets:
+            connection.offer(message)
+
+    def stats(self) -> dict:
+        depths = [connection.queue.qsize() for user_connections in self.active_connections.values() for connection in user_connections]
+        return {
+            "connections": len(depths),
+            "users": len(self.active_connections),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_limit": self.max_queue,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "send_errors": self.send_errors,
+        }
 
 
-notification_manager = ConnectionManager()  
\ No newline at end of file
+notification_manager = ConnectionManager(create_fanout_backend())
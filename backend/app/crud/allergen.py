@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.cache import TTLCache
+from app.core.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.core.websockets_manager import notification_manager
+from app.models.associations import DishIngredient, user_allergies
+
+logger = logging.getLogger(__name__)
+
+ALLERGIES_TOPIC = "allergies"
+
+
+class AllergenSnapshot(NamedTuple):
+    version: str
+    bits: dict        # ingredient_id -> бит
+    dish_masks: dict  # dish_id -> OR битов ингредиентов блюда
+
+
+class AllergenIndex:
+    """
+    Битовые маски аллергенов в памяти процесса.
+    Каждый ингредиент, входящий хотя бы в одно блюдо, получает свой бит; маска блюда - OR битов
+    его ингредиентов, маска пользователя - OR битов ингредиентов из его аллергий.
+    Блюдо подходит пользователю, если dish_mask & user_mask == 0.
+
+    Маски блюд привязаны к версии каталога (catalog_cache.version): после изменения блюд или
+    ингредиентов в любом воркере индекс пересобирается одним запросом при первом обращении.
+    Маски пользователей живут столько же, сколько снимки в principal_cache; изменение аллергий
+    сбрасывает маску пользователя во всех воркерах через fan-out уведомлений.
+    """
+
+    def __init__(self, user_cache_size: int, user_cache_ttl: float):
+        self._snapshot: Optional[AllergenSnapshot] = None
+        self._user_masks = TTLCache(maxsize=user_cache_size, ttl=user_cache_ttl)
+        self._lock = asyncio.Lock()
+
+    async def snapshot(self, session: AsyncSession) -> AllergenSnapshot:
+        await catalog_cache.refresh()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == catalog_cache.version:
+            return snapshot
+
+        async with self._lock:
+            version = catalog_cache.version
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = await self._build(session, version)
+                self._user_masks.clear()
+            return self._snapshot
+
+    async def _build(self, session: AsyncSession, version: str) -> AllergenSnapshot:
+        stmt = select(DishIngredient.dish_id, DishIngredient.ingredient_id).order_by(DishIngredient.ingredient_id)
+        bits: dict = {}
+        dish_masks: dict = defaultdict(int)
+        for dish_id, ingredient_id in (await session.execute(stmt)).all():
+            bit = bits.setdefault(ingredient_id, 1 << len(bits))
+            dish_masks[dish_id] |= bit
+
+        logger.info(f"Allergen index rebuilt: {len(dish_masks)} dishes, {len(bits)} ingredients")
+        return AllergenSnapshot(version, bits, dict(dish_masks))
+
+    async def user_mask(self, session: AsyncSession, user_id: int, snapshot: Optional[AllergenSnapshot] = None) -> int:
+        """Маска аллергий пользователя в битах текущего индекса (0 - аллергий на ингредиенты блюд нет)."""
+        snapshot = snapshot or await self.snapshot(session)
+        key = (snapshot.version, user_id)
+        mask = self._user_masks.get(key)
+        if mask is None:
+            stmt = select(user_allergies.c.ingredient_id).where(user_allergies.c.user_id == user_id)
+            mask = 0
+            for ingredient_id in (await session.execute(stmt)).scalars():
+                mask |= snapshot.bits.get(ingredient_id, 0)
+            self._user_masks.set(key, mask)
+        return mask
+
+    async def unsafe_dishes(self, session: AsyncSession, user_id: int, dish_ids: Iterable[int]) -> Set[int]:
+        """Блюда из dish_ids, в которых есть ингредиенты из аллергий пользователя."""
+        snapshot = await self.snapshot(session)
+        mask = await self.user_mask(session, user_id, snapshot)
+        if not mask:
+            return set()
+        return {dish_id for dish_id in dish_ids if snapshot.dish_masks.get(dish_id, 0) & mask}
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Аллергии пользователя изменились (вызывать после коммита)."""
+        self.drop_user({"user_id": user_id})
+        try:
+            await notification_manager.publish_event(ALLERGIES_TOPIC, {"user_id": user_id})
+        except Exception as e:
+            logger.warning(f"Failed to publish allergy change for user {user_id}: {e}")
+
+    def drop_user(self, message: dict) -> None:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self._user_masks.invalidate((snapshot.version, message["user_id"]))
+
+
+allergens_manager = AllergenIndex(
+    user_cache_size=settings.principal_cache_size,
+    user_cache_ttl=settings.principal_cache_ttl_seconds,
+)
+notification_manager.on_event(ALLERGIES_TOPIC, allergens_manager.drop_user)
@@ -7,6 +7,7 @@ from fastapi import HTTPException, status
 import logging
 
 from app.crud.paginating import paginate
+from app.crud.projections import APPLICATION_COLUMNS, ApplicationRow
 from app.crud.notification import notifications_manager
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.core.enums import OrderStatus
@@ -59,15 +60,15 @@ class ApplicationCRUD:
         Get a list of applications with status filtering.
         """
         query = (
-            select(self.model)
-            .options(joinedload(self.model.applicant))
+            select(*APPLICATION_COLUMNS)
+            .join(self.model.applicant)
             .order_by(self.model.datetime.desc())
         )
 
         if status:
             query = query.where(self.model.status == status)
 
-        return await paginate(session, query, params)
+        return await paginate(session, query, params, row=ApplicationRow.from_row)
 
     async def create(
         self, 
@@ -122,7 +123,7 @@ class ApplicationCRUD:
                         title="Новая заявка на закупку",
                         body=f"Повар {applicant_name} создал заявку #{new_application.id} на закупку продуктов"
                     )
-                    await notifications_manager.create(session, notification)
+                    notifications_manager.enqueue(notification)
             except Exception as e:
                 logger.warning(f"Failed to send notification to admins: {e}")
             
@@ -158,7 +159,7 @@ class ApplicationCRUD:
                 title="Заявка одобрена",
                 body=f"Ваша заявка на закупку #{application.id} была одобрена администратором."
             )
-            await notifications_manager.create(session, notification)
+            notifications_manager.enqueue(notification)
         except Exception as e:
             logger.warning(f"Failed to send application approval notification: {e}")
         
@@ -194,7 +195,7 @@ class ApplicationCRUD:
                 title="Заявка отклонена",
                 body=f"Ваша заявка на закупку #{application.id} была отклонена.{rejection_text}"
             )
-            await notifications_manager.create(session, notification)
+            notifications_manager.enqueue(notification)
         except Exception as e:
             logger.warning(f"Failed to send application rejection notification: {e}")
         
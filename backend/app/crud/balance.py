@@ -0,0 +1,143 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, literal, exists
+from fastapi import HTTPException, status
+import logging
+
+from app.crud.paginating import paginate
+from app.models.balance import BalanceTransaction
+from app.models.user import User
+from app.core.enums import BalanceOperation
+from app.schemas.paginating import PaginationParams, PaginatedResponse
+from app.schemas.balance import BalanceTransactionResponse
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceCRUD:
+    """
+    Движение средств пользователя.
+    Каждая операция - один UPDATE users ... RETURNING balance плюс строка журнала в той же транзакции,
+    строка пользователя заранее не читается. Списание условное (WHERE balance >= :amount),
+    поэтому два одновременных запроса не могут потратить одни и те же деньги.
+    Коммитит (и сбрасывает principal_cache) вызывающий.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    async def debit(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        amount: int,
+        kind: BalanceOperation,
+        order_id: Optional[int] = None,
+        plan_id: Optional[int] = None
+    ) -> int:
+        """Списать amount, если хватает средств. Возвращает новый остаток, иначе 400."""
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.balance >= amount)
+            .values(balance=User.balance - amount)
+            .returning(User.balance)
+            .execution_options(synchronize_session="fetch")
+        )
+        balance = (await session.execute(stmt)).scalar_one_or_none()
+        if balance is None:
+            current = (await session.execute(select(User.balance).where(User.id == user_id))).scalar_one_or_none()
+            if current is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Not enough balance. Need {amount}, have {current}"
+            )
+
+        await self._record(session, user_id, -amount, balance, kind, order_id, plan_id)
+        return balance
+
+    async def credit(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        amount: int,
+        kind: BalanceOperation,
+        order_id: Optional[int] = None,
+        plan_id: Optional[int] = None
+    ) -> int:
+        """Зачислить amount. Возвращает новый остаток."""
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(balance=User.balance + amount)
+            .returning(User.balance)
+            .execution_options(synchronize_session="fetch")
+        )
+        balance = (await session.execute(stmt)).scalar_one_or_none()
+        if balance is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+        await self._record(session, user_id, amount, balance, kind, order_id, plan_id)
+        return balance
+
+    async def _record(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        amount: int,
+        balance_after: int,
+        kind: BalanceOperation,
+        order_id: Optional[int],
+        plan_id: Optional[int]
+    ) -> None:
+        await session.execute(
+            insert(self.model).values(
+                user_id=user_id,
+                created_at=datetime.now(),
+                kind=kind,
+                amount=amount,
+                balance_after=balance_after,
+                order_id=order_id,
+                plan_id=plan_id
+            )
+        )
+
+    async def get_history(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        params: PaginationParams
+    ) -> PaginatedResponse[BalanceTransactionResponse]:
+        """История операций пользователя, новые сверху (индекс user_id, id)."""
+        query = (
+            select(self.model)
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.id.desc())
+        )
+        return await paginate(session, query, params)
+
+    async def record_opening_balances(self, session: AsyncSession) -> None:
+        """
+        Баланс, накопленный до появления журнала, записывается одной строкой OPENING,
+        чтобы сумма журнала пользователя сходилась с users.balance.
+        """
+        has_transactions = exists().where(self.model.user_id == User.id)
+        result = await session.execute(
+            insert(self.model).from_select(
+                ["user_id", "created_at", "kind", "amount", "balance_after"],
+                select(
+                    User.id,
+                    literal(datetime.now()),
+                    literal(BalanceOperation.OPENING, self.model.__table__.c.kind.type),
+                    User.balance,
+                    User.balance
+                ).where(User.balance != 0, ~has_transactions)
+            )
+        )
+        await session.commit()
+        if result.rowcount:
+            logger.info(f"Recorded opening balances for {result.rowcount} users")
+
+
+balance_manager = BalanceCRUD(BalanceTransaction)
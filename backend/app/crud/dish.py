@@ -8,6 +8,7 @@ from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from typing import Optional
 
+from app.core.catalog_cache import catalog_cache
 from app.crud.paginating import paginate
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.models.dish import Dish
@@ -87,7 +88,7 @@ class DishCRUD:
                 )
                 session.add(new_relation)
                 
-            await session.commit()
+            await catalog_cache.commit(session)
             await session.refresh(db_dish)
             return db_dish
 
@@ -159,7 +160,7 @@ class DishCRUD:
                     )
                     session.add(new_relation)
 
-            await session.commit() 
+            await catalog_cache.commit(session)
 
             return await self.get_by_id(session, id)
 
@@ -191,7 +192,7 @@ class DishCRUD:
                 )
             
             await session.delete(dish)
-            await session.commit()
+            await catalog_cache.commit(session)
     
             logger.info(f'Dish {id} deleted successfully')
             return True
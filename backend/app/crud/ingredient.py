@@ -6,6 +6,7 @@ import logging
 from typing import Optional
 
 from app.core.enums import Measures
+from app.core.catalog_cache import catalog_cache
 from app.crud.paginating import paginate
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.models.dish import Ingredient
@@ -66,7 +67,7 @@ class IngredientCRUD:
             )
             
             session.add(db_ingredient)
-            await session.commit()
+            await catalog_cache.commit(session)
             await session.refresh(db_ingredient)
             return db_ingredient
 
@@ -108,7 +109,7 @@ class IngredientCRUD:
                     detail="Ingredient not found"
                 )
             
-            await session.commit()
+            await catalog_cache.commit(session)
             return await self.get_by_id(session, id)
             
         except IntegrityError:
@@ -136,7 +137,7 @@ class IngredientCRUD:
                 )
             
             await session.delete(ingredient)
-            await session.commit()
+            await catalog_cache.commit(session)
     
             logger.info(f'Ingredient {id} deleted successfully')
             return True
@@ -4,7 +4,9 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 import logging
+from typing import List
 
+from app.core.catalog_cache import catalog_cache
 from app.crud.paginating import paginate
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.models.associations import MenuItem
@@ -19,10 +21,10 @@ class MenuCRUD:
         self.model = model 
     
 
-    async def get_all(self, session: AsyncSession) -> Menu:
+    async def get_all(self, session: AsyncSession) -> List[Menu]:
         stmt = select(self.model)
         result = await session.execute(stmt)
-        return result.scalars()
+        return result.scalars().all()
 
     async def get_by_id(self, session: AsyncSession, id: int) -> Menu:
         """Get a menu by ID with items and dishes preloaded."""
@@ -76,7 +78,7 @@ class MenuCRUD:
                     )
                     session.add(menu_item)
 
-            await session.commit()
+            await catalog_cache.commit(session)
 
             stmt_final = (
                 select(self.model)
@@ -130,7 +132,7 @@ class MenuCRUD:
                     )
                     session.add(menu_item)
             
-            await session.commit()
+            await catalog_cache.commit(session)
             return await self.get_by_id(session, id)
             
         except HTTPException:
@@ -163,7 +165,7 @@ class MenuCRUD:
                     detail='Menu not found'
                 )
             await session.delete(menu)
-            await session.commit()
+            await catalog_cache.commit(session)
     
             logger.info(f'Menu {id} deleted successfully')
             return True
@@ -6,7 +6,8 @@ from fastapi import HTTPException, status
 
 from app.models.notification import Notification
 from app.schemas.notification import CreateNotificationRequest
-from app.core.websockets_manager import notification_manager 
+from app.core.notification_writer import notification_writer
+from app.core.enums import UserRole
 
 logger = logging.getLogger(__name__)
 
@@ -15,34 +16,25 @@ class NotificationCRUD:
         self.model = model
 
     async def create(self, session: AsyncSession, obj_in: CreateNotificationRequest) -> Notification:
-        """Создает уведомление в БД и отправляет его через WebSocket."""
+        """Создает уведомление в БД и отправляет его через WebSocket.
+        Запись идет пачкой через notification_writer, метод ждет ее коммита."""
         try:
-            db_obj = self.model(
-                title=obj_in.title,
-                body=obj_in.body,
-                user_id=obj_in.user_id,
-                read=False
-            )
-            session.add(db_obj)
-            await session.commit()
-            await session.refresh(db_obj)
-            await notification_manager.send_personal_notification(
-                user_id=db_obj.user_id,
-                message={
-                    "type": "new_notification",
-                    "id": db_obj.id,
-                    "title": db_obj.title,
-                    "body": db_obj.body,
-                    "read": db_obj.read,
-                    "created_at": db_obj.created_at.isoformat()
-                }
-            )
-
-            return db_obj
+            return await notification_writer.write(obj_in.user_id, obj_in.title, obj_in.body)
         except Exception as e:
-            await session.rollback()
             logger.error(f"Error creating notification: {e}")
             raise HTTPException(status_code=500, detail="Failed to create notification")
+
+    def enqueue(self, obj_in: CreateNotificationRequest) -> None:
+        """Ставит уведомление в очередь notification_writer, не дожидаясь записи в БД."""
+        notification_writer.enqueue(obj_in.user_id, obj_in.title, obj_in.body)
+
+    def enqueue_many(self, objs_in: List[CreateNotificationRequest]) -> None:
+        """Ставит в очередь пачку уведомлений одним вызовом, не дожидаясь записи в БД."""
+        notification_writer.enqueue_many([(obj.user_id, obj.title, obj.body) for obj in objs_in])
+
+    def enqueue_for_role(self, role: UserRole, title: str, body: str) -> None:
+        """Ставит в очередь уведомление всем пользователям роли (например, всем поварам)."""
+        notification_writer.enqueue_for_role(role, title, body)
             
     async def get_by_id(self, session: AsyncSession, notification_id: int) -> Optional[Notification]:
         """Получить уведомление по ID."""
@@ -1,21 +1,30 @@
+from collections import defaultdict
 from datetime import date, datetime, time
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update
 from sqlalchemy.orm import selectinload, joinedload
 from fastapi import HTTPException, status
 import logging
 
 from app.crud.paginating import paginate
+from app.crud.projections import ORDER_COLUMNS, OrderRow
+from app.crud.allergen import allergens_manager
+from app.crud.balance import balance_manager
 from app.crud.notification import notifications_manager
+from app.crud.rollup import rollups_manager, RollupDelta
+from app.crud.subscription import subscriptions_manager
+from app.core.cache import invalidate_principal
+from app.core.kitchen_board import kitchen_board, KitchenDelta
 
 from app.models.order import Order
 from app.models.associations import OrderItem
 from app.models.dish import Dish
 from app.models.user import User
 
-from app.core.enums import OrderStatus, UserRole
-from app.schemas.order import CreateOrderRequest, OrderResponse
+from app.core.enums import OrderStatus, UserRole, BalanceOperation
+from app.schemas.order import CreateOrderRequest, OrderResponse, OrderDetailResponse, OrderDishResponse, OrderTransitionResult, OrderTransitionBatchResponse
+from app.schemas.dish import DishResponse
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.schemas.notification import CreateNotificationRequest
 
@@ -25,6 +34,25 @@ class OrderCRUD:
     def __init__(self, model):
         self.model: Order = model
 
+    async def _set_status(self, session: AsyncSession, order: Order, new_status: OrderStatus) -> KitchenDelta:
+        """
+        Сменить статус заказа и поправить дневные сводки в той же транзакции.
+        Возвращает изменение доски кухни - его публикует вызывающий после коммита.
+        """
+        kitchen = KitchenDelta()
+        kitchen.move(order.status, new_status, [(item.dish_id, item.dish.name, item.quantity) for item in order.dishes])
+        rollup = RollupDelta()
+        rollup.move_order(
+            order.ordered_at,
+            order.status,
+            new_status,
+            sum(item.dish.price * item.quantity for item in order.dishes),
+            [(item.dish_id, item.quantity) for item in order.dishes]
+        )
+        order.status = new_status
+        await rollups_manager.apply(session, rollup)
+        return kitchen
+
     async def get_by_id(self, session: AsyncSession, order_id: int) -> Order:
         """Получить заказ по ID с подгрузкой блюд."""
         stmt = (
@@ -49,15 +77,30 @@ class OrderCRUD:
         user_id: Optional[int] = None,
         order_status: Optional[OrderStatus] = None,
         date_from: Optional[date] = None,
-        date_to: Optional[date] = None
+        date_to: Optional[date] = None,
+        read_session: Optional[AsyncSession] = None
     ) -> PaginatedResponse[OrderResponse]:
         """
         Получить список заказов с фильтрацией и пагинацией.
+        Список читается из read_session (реплики), если она передана и только что не появилось новых заказов.
         """
-        query = select(self.model).options(
-            selectinload(self.model.dishes).selectinload(OrderItem.dish),
-            selectinload(self.model.orderer),
-        ).order_by(self.model.ordered_at.desc())
+        created = 0
+        try:
+            # заказы абонементов на сегодня могли еще не создаться фоновой задачей
+            created = await subscriptions_manager.materialize_due(session)
+        except Exception as e:
+            await session.rollback()
+            logger.warning(f"Subscription orders materialization failed: {e}")
+
+        if read_session is not None and not created:
+            session = read_session
+
+        # только колонки OrderResponse: без позиций заказа и ORM-объектов
+        query = (
+            select(*ORDER_COLUMNS)
+            .join(self.model.orderer)
+            .order_by(self.model.ordered_at.desc())
+        )
 
         if user_id:
             query = query.where(self.model.user_id == user_id)
@@ -73,82 +116,96 @@ class OrderCRUD:
             dt_to = datetime.combine(date_to, time.max)
             query = query.where(self.model.ordered_at <= dt_to)
 
-        return await paginate(session, query, params)
+        return await paginate(session, query, params, row=OrderRow.from_row)
 
     async def create(
         self, 
         session: AsyncSession, 
         user: User, 
         order_in: CreateOrderRequest
-    ) -> Order:
+    ) -> OrderDetailResponse:
         """
         Создать новый заказ.
+        Позиции пишутся одним многострочным INSERT, ответ собирается из уже загруженных блюд
+        без повторного чтения заказа, а уведомление поварам уходит в фоне через notification_writer.
         """
         try:
             if not order_in.dishes:
                 raise HTTPException(status_code=400, detail="Order must contain dishes")
             
-            dish_ids = [item.dish_id for item in order_in.dishes]
-            stmt = select(Dish).where(Dish.id.in_(dish_ids))
+            quantities: dict[int, int] = {}
+            for item in order_in.dishes:
+                quantities[item.dish_id] = quantities.get(item.dish_id, 0) + item.quantity
+
+            stmt = select(Dish).where(Dish.id.in_(quantities))
             result = await session.execute(stmt)
             
             found_dishes = {d.id: d for d in result.scalars().all()}
             
-            if len(found_dishes) != len(set(dish_ids)):
-                missing_ids = set(dish_ids) - set(found_dishes.keys())
+            if len(found_dishes) != len(quantities):
+                missing_ids = set(quantities) - set(found_dishes.keys())
                 raise HTTPException(status_code=400, detail=f"Dishes not found: {missing_ids}")
             
-            total_cost = 0
-            for item in order_in.dishes:
-                dish = found_dishes[item.dish_id]
-                total_cost += dish.price * item.quantity
+            if not order_in.allow_allergens:
+                unsafe = await allergens_manager.unsafe_dishes(session, user.id, quantities)
+                if unsafe:
+                    names = ", ".join(found_dishes[dish_id].name for dish_id in sorted(unsafe))
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=f"Dishes contain ingredients from the allergy list: {names}. Set allow_allergens to order anyway"
+                    )
 
-            
-            if user.balance < total_cost:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Not enough balance. Need {total_cost}, have {user.balance}"
-                )
-            user.balance -= total_cost
-            session.add(user) 
+            total_cost = sum(found_dishes[dish_id].price * quantity for dish_id, quantity in quantities.items())
 
-            
-            new_order = self.model(
-                user_id=user.id,
-                ordered_at=datetime.now(),
-                status=OrderStatus.PAID, 
-                completed_at=None
+            ordered_at = datetime.now()
+            order_stmt = (
+                insert(self.model)
+                .values(user_id=user.id, ordered_at=ordered_at, status=OrderStatus.PAID, completed_at=None)
+                .returning(self.model.id)
             )
-            session.add(new_order)
-            await session.flush()
-            
-            for item in order_in.dishes:
-                order_item = OrderItem(
-                    order_id=new_order.id,
-                    dish_id=item.dish_id,
-                    quantity=item.quantity
-                )
-                session.add(order_item)
+            order_id = (await session.execute(order_stmt)).scalar_one()
+
+            await session.execute(
+                insert(OrderItem).values([
+                    {"order_id": order_id, "dish_id": dish_id, "quantity": quantity}
+                    for dish_id, quantity in quantities.items()
+                ])
+            )
+
+            # условное списание: при нехватке средств 400 и откат заказа вместе со всей транзакцией
+            await balance_manager.debit(session, user.id, total_cost, BalanceOperation.ORDER_PAYMENT, order_id=order_id)
+
+            rollup = RollupDelta()
+            rollup.add_order(ordered_at, OrderStatus.PAID, total_cost, quantities.items())
+            await rollups_manager.apply(session, rollup)
             
             await session.commit()
-            order_result = await self.get_by_id(session, new_order.id)
+            await invalidate_principal(user.id)
+
+            kitchen = KitchenDelta()
+            kitchen.move(None, OrderStatus.PAID, [(dish_id, found_dishes[dish_id].name, quantity) for dish_id, quantity in quantities.items()])
+            await kitchen_board.publish(ordered_at, kitchen)
             
             try:
-                cooks_stmt = select(User).where(User.role == UserRole.COOK)
-                cooks_result = await session.execute(cooks_stmt)
-                cooks = cooks_result.scalars().all()
-                
-                for cook in cooks:
-                    notification = CreateNotificationRequest(
-                        user_id=cook.id,
-                        title="Новый заказ",
-                        body=f"Поступил новый оплаченный заказ #{new_order.id} от {user.name} {user.surname}"
-                    )
-                    await notifications_manager.create(session, notification)
+                notifications_manager.enqueue_for_role(
+                    UserRole.COOK,
+                    title="Новый заказ",
+                    body=f"Поступил новый оплаченный заказ #{order_id} от {user.name} {user.surname}"
+                )
             except Exception as e:
                 logger.warning(f"Failed to send notification to cooks: {e}")
             
-            return order_result
+            return OrderDetailResponse(
+                id=order_id,
+                user_id=user.id,
+                ordered_at=ordered_at,
+                completed_at=None,
+                status=OrderStatus.PAID,
+                dishes=[
+                    OrderDishResponse(dish=DishResponse.model_validate(found_dishes[dish_id]), quantity=quantity)
+                    for dish_id, quantity in quantities.items()
+                ]
+            )
 
         except HTTPException:
             await session.rollback()
@@ -165,8 +222,9 @@ class OrderCRUD:
         if order.status != OrderStatus.PAID:
              raise HTTPException(status_code=409, detail="Only PAID orders can be marked as READY")
              
-        order.status = OrderStatus.READY
+        kitchen = await self._set_status(session, order, OrderStatus.READY)
         await session.commit()
+        await kitchen_board.publish(order.ordered_at, kitchen)
         
         try:
             notification = CreateNotificationRequest(
@@ -174,12 +232,118 @@ class OrderCRUD:
                 title="Заказ готов!",
                 body=f"Ваш заказ #{order.id} готов к выдаче. Приятного аппетита!"
             )
-            await notifications_manager.create(session, notification)
+            notifications_manager.enqueue(notification)
         except Exception as e:
             logger.warning(f"Failed to send order ready notification: {e}")
         
         return await self.get_by_id(session, order_id)
 
+    async def transition_many(
+        self,
+        session: AsyncSession,
+        order_ids: List[int],
+        expected: Tuple[OrderStatus, ...],
+        new_status: OrderStatus,
+        owner_id: Optional[int] = None
+    ) -> Tuple[OrderTransitionBatchResponse, Dict[int, int]]:
+        """
+        Перевести много заказов в new_status за одну транзакцию: одно чтение статусов, одно чтение позиций
+        и по одному UPDATE ... WHERE id IN (...) AND status = :expected RETURNING id на каждый ожидаемый статус.
+        Заказ, статус которого изменился между чтением и UPDATE, получает conflict.
+        owner_id - можно менять только свои заказы (ученик), чужие получают forbidden.
+        Возвращает ответ по каждому id и владельцев переведенных заказов {order_id: user_id}.
+        """
+        ids = list(dict.fromkeys(order_ids))
+        stmt = select(self.model.id, self.model.user_id, self.model.status, self.model.ordered_at).where(self.model.id.in_(ids))
+        found = {row.id: row for row in (await session.execute(stmt)).all()}
+
+        candidates = defaultdict(list)
+        for row in found.values():
+            if (owner_id is None or row.user_id == owner_id) and row.status in expected:
+                candidates[row.status].append(row.id)
+
+        values = {"status": new_status}
+        if new_status == OrderStatus.SERVED:
+            values["completed_at"] = datetime.now()
+
+        moved: Dict[int, OrderStatus] = {}
+        for old_status, group in candidates.items():
+            claim = (
+                update(self.model)
+                .where(self.model.id.in_(group), self.model.status == old_status)
+                .values(**values)
+                .returning(self.model.id)
+                .execution_options(synchronize_session=False)
+            )
+            for order_id in (await session.execute(claim)).scalars().all():
+                moved[order_id] = old_status
+
+        kitchen = KitchenDelta()
+        if moved:
+            items = defaultdict(list)
+            stmt = (
+                select(OrderItem.order_id, OrderItem.dish_id, OrderItem.quantity, Dish.price, Dish.name)
+                .join(Dish, OrderItem.dish_id == Dish.id)
+                .where(OrderItem.order_id.in_(moved))
+            )
+            for order_id, dish_id, quantity, price, name in (await session.execute(stmt)).all():
+                items[order_id].append((dish_id, quantity, price, name))
+
+            rollup = RollupDelta()
+            today = date.today()
+            for order_id, old_status in moved.items():
+                ordered_at = found[order_id].ordered_at
+                rollup.move_order(
+                    ordered_at,
+                    old_status,
+                    new_status,
+                    sum(price * quantity for _, quantity, price, _ in items[order_id]),
+                    [(dish_id, quantity) for dish_id, quantity, _, _ in items[order_id]]
+                )
+                if ordered_at.date() == today:
+                    kitchen.move(old_status, new_status, [(dish_id, name, quantity) for dish_id, quantity, _, name in items[order_id]])
+            await rollups_manager.apply(session, rollup)
+
+        await session.commit()
+        await kitchen_board.publish(datetime.now(), kitchen)
+
+        results = []
+        for order_id in ids:
+            row = found.get(order_id)
+            if row is None:
+                results.append(OrderTransitionResult(order_id=order_id, outcome="not_found"))
+            elif owner_id is not None and row.user_id != owner_id:
+                results.append(OrderTransitionResult(order_id=order_id, outcome="forbidden"))
+            elif order_id in moved:
+                results.append(OrderTransitionResult(order_id=order_id, outcome="updated", status=new_status))
+            else:
+                results.append(OrderTransitionResult(order_id=order_id, outcome="conflict", status=row.status))
+        owners = {order_id: found[order_id].user_id for order_id in moved}
+        return OrderTransitionBatchResponse(updated=len(moved), results=results), owners
+
+    async def mark_ready_many(self, session: AsyncSession, order_ids: List[int]) -> OrderTransitionBatchResponse:
+        """Повар отмечает готовыми сразу много оплаченных заказов; ученикам уходит одна пачка уведомлений."""
+        response, owners = await self.transition_many(session, order_ids, (OrderStatus.PAID,), OrderStatus.READY)
+        try:
+            notifications_manager.enqueue_many([
+                CreateNotificationRequest(
+                    user_id=user_id,
+                    title="Заказ готов!",
+                    body=f"Ваш заказ #{order_id} готов к выдаче. Приятного аппетита!"
+                )
+                for order_id, user_id in owners.items()
+            ])
+        except Exception as e:
+            logger.warning(f"Failed to send order ready notifications: {e}")
+        return response
+
+    async def mark_served_many(self, session: AsyncSession, order_ids: List[int], owner_id: Optional[int] = None) -> OrderTransitionBatchResponse:
+        """Выдача сразу многих готовых или оплаченных заказов (раздача или сам ученик - только свои)."""
+        response, _ = await self.transition_many(
+            session, order_ids, (OrderStatus.READY, OrderStatus.PAID), OrderStatus.SERVED, owner_id=owner_id
+        )
+        return response
+
     async def mark_prepared(self, session: AsyncSession, order_id: int) -> Order:
         """Повар отмечает заказ готовым к выдаче."""
         order = await self.get_by_id(session, order_id)
@@ -187,8 +351,9 @@ class OrderCRUD:
         if order.status != OrderStatus.PAID:
             raise HTTPException(status_code=409, detail=f"Only paid orders can be marked as prepared")
             
-        order.status = OrderStatus.READY
+        kitchen = await self._set_status(session, order, OrderStatus.READY)
         await session.commit()
+        await kitchen_board.publish(order.ordered_at, kitchen)
         
         try:
             notification = CreateNotificationRequest(
@@ -196,7 +361,7 @@ class OrderCRUD:
                 title="Заказ готов!",
                 body=f"Ваш заказ #{order.id} готов к выдаче. Приятного аппетита!"
             )
-            await notifications_manager.create(session, notification)
+            notifications_manager.enqueue(notification)
         except Exception as e:
             logger.warning(f"Failed to send order ready notification: {e}")
         
@@ -209,9 +374,10 @@ class OrderCRUD:
         if order.status not in [OrderStatus.READY, OrderStatus.PAID]:
             raise HTTPException(status_code=409, detail=f"Order must be ready or paid to be served")
             
-        order.status = OrderStatus.SERVED
+        kitchen = await self._set_status(session, order, OrderStatus.SERVED)
         order.completed_at = datetime.now() 
         await session.commit()
+        await kitchen_board.publish(order.ordered_at, kitchen)
         return await self.get_by_id(session, order_id)
 
     async def cancel(self, session: AsyncSession, order_id: int) -> Order:
@@ -233,17 +399,24 @@ class OrderCRUD:
         for item in order.dishes:
             refund_amount += item.dish.price * item.quantity
 
-        stmt = select(User).where(User.id == order.user_id)
-        user_result = await session.execute(stmt)
-        user = user_result.scalar_one()
-
-        user.balance += refund_amount
-        session.add(user)
+        # статус меняется условно: из двух одновременных отмен деньги вернет только одна
+        claimed = await session.execute(
+            update(self.model)
+            .where(self.model.id == order.id, self.model.status == order.status)
+            .values(status=OrderStatus.CANCELLED)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.first() is None:
+            await session.rollback()
+            raise HTTPException(status_code=409, detail="Order status has changed, try again")
 
-        
-        order.status = OrderStatus.CANCELLED
+        await balance_manager.credit(session, order.user_id, refund_amount, BalanceOperation.ORDER_REFUND, order_id=order.id)
+        kitchen = await self._set_status(session, order, OrderStatus.CANCELLED)
         
         await session.commit()
+        await invalidate_principal(order.user_id)
+        await kitchen_board.publish(order.ordered_at, kitchen)
         return await self.get_by_id(session, order_id)
 
 orders_manager = OrderCRUD(Order)
\ No newline at end of file
@@ -1,24 +1,40 @@
+import base64
+import binascii
+import enum
+import json
 import math
-from sqlalchemy import select, func
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Sequence
+from sqlalchemy import select, func, inspect, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import Select
+from sqlalchemy.sql import Select, operators
+from sqlalchemy.sql.elements import UnaryExpression
+from fastapi import HTTPException, status
 from app.schemas.paginating import PaginatedResponse, PaginationParams
 
 async def paginate(
                    session: AsyncSession,
                    query: Select,
-                   params: PaginationParams
+                   params: PaginationParams,
+                   row: Optional[Callable[[Sequence], Any]] = None
                   ) -> PaginatedResponse:
-    
+    """
+    Страница результатов query. Без row элементы - ORM-объекты (первая колонка),
+    с row - результат row(колонки строки) для запросов, выбирающих отдельные колонки.
+    """
+
+    if params.cursor is not None:
+        return await paginate_by_cursor(session, query, params, row)
+
     count_query = select(func.count()).select_from(query.subquery())
     total_result = await session.execute(count_query)
     total = total_result.scalar() or 0
 
     offset = (params.page - 1) * params.limit
     paginated_query = query.offset(offset).limit(params.limit)
-    
+
     result = await session.execute(paginated_query)
-    items = result.scalars().all()
+    items = [row(values) for values in result.all()] if row else result.scalars().all()
 
     pages = math.ceil(total / params.limit) if params.limit > 0 else 0
 
@@ -27,4 +43,106 @@ async def paginate(
                             total=total,
                             page=params.page,
                             pages=pages
-                        )
\ No newline at end of file
+                        )
+
+
+async def paginate_by_cursor(
+                   session: AsyncSession,
+                   query: Select,
+                   params: PaginationParams,
+                   row: Optional[Callable[[Sequence], Any]] = None
+                  ) -> PaginatedResponse:
+    """
+    Постраничная выборка по ключу (keyset) вместо OFFSET и без COUNT(*).
+    Ключ - колонки из order_by запроса плюс первичный ключ сущности для однозначности.
+    Колонки ключа не должны содержать NULL.
+    """
+    keys = _sort_keys(query)
+    columns = [column for column, _ in keys]
+
+    keyset_query = (
+        query
+        .add_columns(*columns)
+        .order_by(None)
+        .order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+        .limit(params.limit + 1)
+    )
+    if params.cursor:
+        keyset_query = keyset_query.where(_after(keys, _decode_cursor(params.cursor, len(keys))))
+
+    rows = (await session.execute(keyset_query)).all()
+    width = len(rows[0]) - len(keys) if rows else 0
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = _encode_cursor(rows[-1][width:])
+
+    return PaginatedResponse(
+                            items=[row(values[:width]) for values in rows] if row else [values[0] for values in rows],
+                            total=None,
+                            page=params.page,
+                            pages=None,
+                            next_cursor=next_cursor
+                        )
+
+
+def _sort_keys(query: Select) -> list:
+    keys = []
+    for clause in query._order_by_clauses:
+        descending = False
+        if isinstance(clause, UnaryExpression) and clause.modifier in (operators.desc_op, operators.asc_op):
+            descending = clause.modifier is operators.desc_op
+            clause = clause.element
+        keys.append((clause, descending))
+
+    entity = query.column_descriptions[0]["entity"]
+    for pk_column in inspect(entity).primary_key:
+        if not any(column.compare(pk_column) for column, _ in keys):
+            keys.append((pk_column, False))
+    return keys
+
+
+def _after(keys: list, values: list):
+    """(k1, k2, ...) строго после (v1, v2, ...) с учетом направления каждой колонки."""
+    conditions = []
+    for i, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*equal_prefix, step))
+    return or_(*conditions)
+
+
+def _encode_cursor(values) -> str:
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"dt": value.isoformat()})
+        elif isinstance(value, date):
+            payload.append({"d": value.isoformat()})
+        elif isinstance(value, enum.Enum):
+            payload.append(value.name)
+        else:
+            payload.append(value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, expected_len: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = []
+        for value in payload:
+            if isinstance(value, dict) and "dt" in value:
+                values.append(datetime.fromisoformat(value["dt"]))
+            elif isinstance(value, dict) and "d" in value:
+                values.append(date.fromisoformat(value["d"]))
+            else:
+                values.append(value)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if len(values) != expected_len:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
@@ -0,0 +1,159 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from fastapi import HTTPException
+
+from app.crud.application import applications_manager
+from app.models.order import Order
+from app.models.associations import OrderItem, DishIngredient
+from app.models.dish import Ingredient
+from app.models.subscription import SubscriptionPlan, SubscriptionPlanItem
+from app.core.enums import OrderStatus
+from app.schemas.application import (
+    ApplicationProductLink,
+    CreateApplicationRequest,
+    IngredientDemandResponse,
+    ProcurementPlanResponse
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ProcurementPlanner:
+    """
+    Потребность в ингредиентах на ближайшие дни.
+
+    Спрос на блюда собирается в матрицу D (дни x блюда) из оплаченных, но еще не выданных заказов
+    и из дней абонементов, заказы на которые еще не созданы. Рецептуры - матрица R (блюда x ингредиенты)
+    из DishIngredient.amount_thousandth_measure. Потребность по дням - одно умножение D @ R.
+    """
+
+    async def plan(self, session: AsyncSession, days: int, today: Optional[date] = None) -> ProcurementPlanResponse:
+        today = today or date.today()
+        horizon = today + timedelta(days=days - 1)
+
+        # (день, блюдо, порции): заказы группирует БД, старые невыданные заказы относятся на сегодня
+        order_day = func.date(Order.ordered_at)
+        order_rows = (await session.execute(
+            select(order_day, OrderItem.dish_id, func.sum(OrderItem.quantity))
+            .join(Order, OrderItem.order_id == Order.id)
+            .where(Order.status == OrderStatus.PAID, Order.ordered_at < datetime.combine(horizon + timedelta(days=1), time.min))
+            .group_by(order_day, OrderItem.dish_id)
+        )).all()
+
+        plan_rows = (await session.execute(
+            select(
+                SubscriptionPlan.first_day,
+                SubscriptionPlan.meals_total,
+                SubscriptionPlan.materialized_through,
+                SubscriptionPlanItem.dish_id,
+                func.sum(SubscriptionPlanItem.quantity)
+            )
+            .join(SubscriptionPlanItem, SubscriptionPlanItem.plan_id == SubscriptionPlan.id)
+            .where(
+                SubscriptionPlan.cancelled_at.is_(None),
+                SubscriptionPlan.materialized_through < SubscriptionPlan.last_day,
+                SubscriptionPlan.first_day <= horizon
+            )
+            # абонементы с одинаковым расписанием складываются еще в БД
+            .group_by(
+                SubscriptionPlan.first_day,
+                SubscriptionPlan.meals_total,
+                SubscriptionPlan.materialized_through,
+                SubscriptionPlanItem.dish_id
+            )
+        )).all()
+
+        day_idx, dish_ids, quantities = [], [], []
+        for day, dish_id, quantity in order_rows:
+            day_idx.append(max((date.fromisoformat(str(day)) - today).days, 0))
+            dish_ids.append(dish_id)
+            quantities.append(quantity)
+
+        schedules: dict = {}
+        for first_day, meals_total, materialized_through, dish_id, quantity in plan_rows:
+            key = (first_day, meals_total, materialized_through)
+            if key not in schedules:
+                schedules[key] = [
+                    max((day - today).days, 0) for day in SubscriptionPlan.schedule_days(first_day, meals_total)
+                    if materialized_through < day <= horizon
+                ]
+            for offset in schedules[key]:
+                day_idx.append(offset)
+                dish_ids.append(dish_id)
+                quantities.append(quantity)
+
+        demand_dishes = sorted(set(dish_ids))
+        recipe_rows = (await session.execute(
+            select(DishIngredient.dish_id, DishIngredient.ingredient_id, DishIngredient.amount_thousandth_measure)
+            .where(DishIngredient.dish_id.in_(demand_dishes))
+        )).all() if demand_dishes else []
+
+        ingredient_ids = sorted({ingredient_id for _, ingredient_id, _ in recipe_rows})
+        ingredients = {
+            ingredient.id: ingredient
+            for ingredient in (await session.execute(
+                select(Ingredient).where(Ingredient.id.in_(ingredient_ids))
+            )).scalars().all()
+        } if ingredient_ids else {}
+
+        dish_pos = {dish_id: i for i, dish_id in enumerate(demand_dishes)}
+        ingredient_pos = {ingredient_id: j for j, ingredient_id in enumerate(ingredient_ids)}
+
+        demand = np.zeros((days, len(demand_dishes)), dtype=np.int64)
+        if quantities:
+            np.add.at(
+                demand,
+                (np.asarray(day_idx, dtype=np.int64), np.fromiter((dish_pos[d] for d in dish_ids), dtype=np.int64, count=len(dish_ids))),
+                np.asarray(quantities, dtype=np.int64)
+            )
+
+        recipes = np.zeros((len(demand_dishes), len(ingredient_ids)), dtype=np.int64)
+        for dish_id, ingredient_id, amount in recipe_rows:
+            recipes[dish_pos[dish_id], ingredient_pos[ingredient_id]] = amount or 0
+
+        per_day = demand @ recipes                       # дни x ингредиенты, в тысячных долях единицы
+        totals = per_day.sum(axis=0)
+        units = -(-totals // 1000)                       # закупка - целыми кг/л с округлением вверх
+        prices = np.fromiter((ingredients[i].price for i in ingredient_ids), dtype=np.int64, count=len(ingredient_ids))
+        costs = units * prices
+
+        items = [
+            IngredientDemandResponse(
+                ingredient=ingredients[ingredient_id],
+                amount_thousandth_measure=int(totals[j]),
+                per_day_thousandth_measure=per_day[:, j].tolist(),
+                quantity=int(units[j]),
+                cost=int(costs[j])
+            )
+            for j, ingredient_id in enumerate(ingredient_ids)
+            if totals[j] > 0
+        ]
+        items.sort(key=lambda item: item.cost, reverse=True)
+
+        return ProcurementPlanResponse(
+            date_from=today,
+            date_to=horizon,
+            portions=int(demand.sum()),
+            total_cost=int(costs.sum()),
+            ingredients=items
+        )
+
+    async def create_application(self, session: AsyncSession, user_id: int, days: int):
+        """Заявка на закупку, заполненная по плану (дальше обычный цикл согласования администратором)."""
+        plan = await self.plan(session, days)
+        if not plan.ingredients:
+            raise HTTPException(status_code=400, detail="Nothing to purchase for the selected period")
+
+        application_in = CreateApplicationRequest(products=[
+            ApplicationProductLink(ingredient_id=item.ingredient.id, quantity=item.quantity)
+            for item in plan.ingredients
+        ])
+        return await applications_manager.create(session, user_id, application_in)
+
+
+planner_manager = ProcurementPlanner()
@@ -0,0 +1,73 @@
+"""
+Легкие строки для списков: запросы выбирают только колонки схемы ответа, а строки
+собираются в именованные кортежи (без __dict__, без identity map и без загрузки связей).
+Поля и вложенные кортежи называются как в схемах ответа, поэтому их валидирует
+from_attributes так же, как ORM-объекты.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional, Sequence
+
+from app.core.enums import OrderStatus
+from app.models.application import Application
+from app.models.order import Order
+from app.models.review import Review
+from app.models.user import User
+
+
+class UserShortRow(NamedTuple):
+    id: int
+    name: str
+    surname: str
+    patronymic: Optional[str]
+
+
+USER_SHORT_COLUMNS = (User.id, User.name, User.surname, User.patronymic)
+
+
+class OrderRow(NamedTuple):
+    id: int
+    user_id: int
+    ordered_at: datetime
+    completed_at: Optional[datetime]
+    status: OrderStatus
+    orderer: UserShortRow
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "OrderRow":
+        return cls(row[0], row[1], row[2], row[3], row[4], UserShortRow(row[5], row[6], row[7], row[8]))
+
+
+ORDER_COLUMNS = (Order.id, Order.user_id, Order.ordered_at, Order.completed_at, Order.status, *USER_SHORT_COLUMNS)
+
+
+class ReviewRow(NamedTuple):
+    id: int
+    user_id: int
+    dish_id: int
+    rating: Optional[int]
+    content: Optional[str]
+    datetime: datetime
+    user: UserShortRow
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "ReviewRow":
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5], UserShortRow(row[6], row[7], row[8], row[9]))
+
+
+REVIEW_COLUMNS = (Review.id, Review.user_id, Review.dish_id, Review.rating, Review.content, Review.datetime, *USER_SHORT_COLUMNS)
+
+
+class ApplicationRow(NamedTuple):
+    id: int
+    user_id: int
+    datetime: datetime
+    status: OrderStatus
+    rejection_reason: Optional[str]
+    applicant: UserShortRow
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "ApplicationRow":
+        return cls(row[0], row[1], row[2], row[3], row[4], UserShortRow(row[5], row[6], row[7], row[8]))
+
+
+APPLICATION_COLUMNS = (Application.id, Application.user_id, Application.datetime, Application.status, Application.rejection_reason, *USER_SHORT_COLUMNS)
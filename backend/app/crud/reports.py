@@ -1,6 +1,7 @@
 from datetime import date, datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, Select, distinct, desc
+from sqlalchemy import select, update, func, Select, distinct, desc
+from fastapi import HTTPException
 
 
 
@@ -12,7 +13,8 @@ from app.models.application import Application
 from app.models.associations import ApplicationItem
 from app.models.dish import Ingredient
 
-from app.core.enums import OrderStatus
+from app.core.config import settings
+from app.core.enums import OrderStatus, ReportStatus
 
 from app.schemas.report import (
     CostsReportResponse,
@@ -26,12 +28,20 @@ class ReportCRUD:
         self.model = Report
 
 
-    async def create(self, session: AsyncSession, data: GenerateReportRequest, download_url: str):
+    async def create(
+        self,
+        session: AsyncSession,
+        data: GenerateReportRequest,
+        download_url: str,
+        status: ReportStatus = ReportStatus.READY
+    ):
         new_report = self.model(
             report_type=data.report_type,
             download_url=download_url,
             date_from=data.date_from,
-            date_to=data.date_to
+            date_to=data.date_to,
+            status=status,
+            generated_at=datetime.now()
         )
         session.add(new_report)
         await session.commit()
@@ -40,13 +50,65 @@ class ReportCRUD:
 
 
     async def get(self, session: AsyncSession, data_in: GenerateReportRequest):
+        """
+        Отчет с такими же параметрами, который можно отдать вместо нового:
+        - готовый, если его период закончился до формирования (позже данные за период не меняются);
+          отчет за период, включающий день формирования, каждый раз строится заново;
+        - формирующийся, если он поставлен не раньше report_pending_timeout_seconds назад.
+        Более старые pending-отчеты (задание потеряно при падении процесса) помечаются failed.
+        """
+        # даты периода хранятся в DateTime-колонках, date с ними напрямую не совпадает
+        as_datetime = lambda value: datetime.combine(value, datetime.min.time()) if value else None
         stmt = select(self.model).where(
             self.model.report_type == data_in.report_type,
-            self.model.date_from == data_in.date_from,
-            self.model.date_to == data_in.date_to
+            self.model.date_from == as_datetime(data_in.date_from),
+            self.model.date_to == as_datetime(data_in.date_to),
+            self.model.status.in_([ReportStatus.READY, ReportStatus.PENDING])
         ).order_by(self.model.generated_at.desc())
         result = await session.execute(stmt)
-        return result.scalars().first()
+
+        pending_since = datetime.now() - timedelta(seconds=settings.report_pending_timeout_seconds)
+        found, stale = None, []
+        for report in result.scalars():
+            if report.status == ReportStatus.PENDING:
+                if report.generated_at < pending_since:
+                    stale.append(report.id)
+                elif found is None:
+                    found = report
+            elif found is None and report.date_to is not None and report.generated_at >= report.date_to + timedelta(days=1):
+                found = report
+
+        if stale:
+            await session.execute(
+                update(self.model)
+                .where(self.model.id.in_(stale), self.model.status == ReportStatus.PENDING)
+                .values(status=ReportStatus.FAILED, error="Формирование не завершилось вовремя")
+            )
+            await session.commit()
+        return found
+
+
+    async def get_by_id(self, session: AsyncSession, report_id: int) -> Report:
+        report = await session.get(self.model, report_id)
+        if not report:
+            raise HTTPException(status_code=404, detail="Report not found")
+        return report
+
+
+    async def set_status(
+        self,
+        session: AsyncSession,
+        report_id: int,
+        status: ReportStatus,
+        error: str = None
+    ) -> None:
+        stmt = (
+            update(self.model)
+            .where(self.model.id == report_id)
+            .values(status=status, error=error, generated_at=datetime.now())
+        )
+        await session.execute(stmt)
+        await session.commit()
 
 
     async def create_report_entry(self, report_type: str, download_url: str, date_from: datetime = None, date_to: datetime = None):
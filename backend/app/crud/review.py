@@ -2,12 +2,13 @@ from typing import Optional, List, Union
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 import logging
 
 from app.crud.paginating import paginate
+from app.crud.projections import REVIEW_COLUMNS, ReviewRow
+from app.crud.rollup import rollups_manager, RollupDelta
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.models.review import Review 
 from app.models.dish import Dish
@@ -44,14 +45,16 @@ class ReviewCRUD:
         dish_id filter is required to get reviews for a specific dish,
         but optional if we want to see "all recent reviews".
         """
-        query = select(self.model).options(
-            selectinload(self.model.user),
-        ).order_by(self.model.datetime.desc())
+        query = (
+            select(*REVIEW_COLUMNS)
+            .join(self.model.user)
+            .order_by(self.model.datetime.desc())
+        )
 
         if dish_id:
             query = query.where(self.model.dish_id == dish_id)
 
-        return await paginate(session, query, params)
+        return await paginate(session, query, params, row=ReviewRow.from_row)
 
     async def create(
         self, 
@@ -77,6 +80,11 @@ class ReviewCRUD:
             )
             
             session.add(new_review)
+
+            rollup = RollupDelta()
+            rollup.add_review(new_review.datetime, dish_id, new_review.rating)
+            await rollups_manager.apply(session, rollup)
+
             await session.commit()
             await session.refresh(new_review)
             return new_review
@@ -103,6 +111,13 @@ class ReviewCRUD:
         if not update_data:
             return await self.get_by_id(session, review_id)
 
+        rollup = None
+        if "rating" in update_data:
+            old = await self.get_by_id(session, review_id)
+            rollup = RollupDelta()
+            rollup.add_review(old.datetime, old.dish_id, old.rating, sign=-1)
+            rollup.add_review(old.datetime, old.dish_id, update_data["rating"])
+
         stmt = (
             update(self.model)
             .where(self.model.id == review_id)
@@ -114,6 +129,9 @@ class ReviewCRUD:
         
         if result.rowcount == 0:
              raise HTTPException(status_code=404, detail="Review not found")
+
+        if rollup is not None:
+            await rollups_manager.apply(session, rollup)
              
         await session.commit()
         return await self.get_by_id(session, review_id)
@@ -122,11 +140,19 @@ class ReviewCRUD:
         """
         Delete a review.
         """
-        stmt = delete(self.model).where(self.model.id == review_id)
-        result = await session.execute(stmt)
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == review_id)
+            .returning(self.model.datetime, self.model.dish_id, self.model.rating)
+        )
+        deleted = (await session.execute(stmt)).one_or_none()
         
-        if result.rowcount == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Review not found")
+
+        rollup = RollupDelta()
+        rollup.add_review(deleted.datetime, deleted.dish_id, deleted.rating, sign=-1)
+        await rollups_manager.apply(session, rollup)
             
         await session.commit()
         return True
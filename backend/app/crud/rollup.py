@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, func, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import logging
+
+from app.models.order import Order
+from app.models.associations import OrderItem
+from app.models.dish import Dish
+from app.models.review import Review
+from app.models.statistic import DailyOrderStat, DailyDishStat
+from app.models.subscription import SubscriptionPlan
+
+from app.core.enums import OrderStatus
+
+logger = logging.getLogger(__name__)
+
+
+class RollupDelta:
+    """
+    Изменения дневных сводок, накопленные в рамках одной операции.
+    Копится в памяти, а в БД уходит не больше чем двумя upsert'ами через RollupCRUD.apply.
+
+    Выручка заказа считается по текущим ценам блюд, как и в отчетах;
+    если цена блюда поменялась между оплатой и отменой, сводку выравнивает rebuild().
+    """
+
+    def __init__(self):
+        self.orders: dict = defaultdict(lambda: [0, 0])
+        self.dishes: dict = defaultdict(lambda: [0, 0, 0, 0])
+
+    def add_order(
+        self,
+        ordered_at: datetime,
+        status: OrderStatus,
+        revenue: int,
+        items: Iterable[Tuple[int, int]],
+        sign: int = 1
+    ) -> None:
+        """items - пары (dish_id, quantity)."""
+        day = ordered_at.date()
+        order_row = self.orders[(day, status)]
+        order_row[0] += sign
+        order_row[1] += sign * revenue
+
+        if status != OrderStatus.CANCELLED:
+            for dish_id, quantity in items:
+                self.dishes[(day, dish_id)][0] += sign * quantity
+
+    def move_order(
+        self,
+        ordered_at: datetime,
+        old_status: OrderStatus,
+        new_status: OrderStatus,
+        revenue: int,
+        items: Iterable[Tuple[int, int]]
+    ) -> None:
+        items = list(items)
+        self.add_order(ordered_at, old_status, revenue, items, sign=-1)
+        self.add_order(ordered_at, new_status, revenue, items)
+
+    def add_review(self, created_at: datetime, dish_id: int, rating: Optional[int], sign: int = 1) -> None:
+        dish_row = self.dishes[(created_at.date(), dish_id)]
+        dish_row[1] += sign
+        if rating is not None:
+            dish_row[2] += sign
+            dish_row[3] += sign * rating
+
+
+class RollupCRUD:
+    def _insert(self, session: AsyncSession):
+        if session.bind.dialect.name == "postgresql":
+            return pg_insert
+        return sqlite_insert
+
+    async def apply(self, session: AsyncSession, delta: RollupDelta) -> None:
+        """Применить накопленные изменения в текущей транзакции (коммитит вызывающий)."""
+        insert = self._insert(session)
+
+        order_rows = [
+            {"day": day, "status": status, "orders_count": count, "revenue": revenue}
+            for (day, status), (count, revenue) in delta.orders.items()
+            if count or revenue
+        ]
+        if order_rows:
+            stmt = insert(DailyOrderStat).values(order_rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyOrderStat.day, DailyOrderStat.status],
+                set_={
+                    "orders_count": DailyOrderStat.orders_count + stmt.excluded.orders_count,
+                    "revenue": DailyOrderStat.revenue + stmt.excluded.revenue,
+                }
+            )
+            await session.execute(stmt)
+
+        dish_rows = [
+            {"day": day, "dish_id": dish_id, "quantity": quantity, "reviews_count": reviews,
+             "ratings_count": ratings, "rating_sum": rating_sum}
+            for (day, dish_id), (quantity, reviews, ratings, rating_sum) in delta.dishes.items()
+            if quantity or reviews or ratings or rating_sum
+        ]
+        if dish_rows:
+            stmt = insert(DailyDishStat).values(dish_rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[DailyDishStat.day, DailyDishStat.dish_id],
+                set_={
+                    "quantity": DailyDishStat.quantity + stmt.excluded.quantity,
+                    "reviews_count": DailyDishStat.reviews_count + stmt.excluded.reviews_count,
+                    "ratings_count": DailyDishStat.ratings_count + stmt.excluded.ratings_count,
+                    "rating_sum": DailyDishStat.rating_sum + stmt.excluded.rating_sum,
+                }
+            )
+            await session.execute(stmt)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Пересчитать сводки с нуля по заказам и отзывам."""
+        await session.execute(delete(DailyOrderStat))
+        await session.execute(delete(DailyDishStat))
+
+        order_totals = (
+            select(
+                func.date(Order.ordered_at).label("day"),
+                Order.status.label("status"),
+                func.coalesce(func.sum(Dish.price * OrderItem.quantity), 0).label("revenue")
+            )
+            .select_from(Order)
+            .outerjoin(OrderItem, Order.id == OrderItem.order_id)
+            .outerjoin(Dish, OrderItem.dish_id == Dish.id)
+            .group_by(Order.id)
+            .subquery()
+        )
+        await session.execute(
+            DailyOrderStat.__table__.insert().from_select(
+                ["day", "status", "orders_count", "revenue"],
+                select(
+                    order_totals.c.day,
+                    order_totals.c.status,
+                    func.count(),
+                    func.sum(order_totals.c.revenue)
+                ).group_by(order_totals.c.day, order_totals.c.status)
+            )
+        )
+
+        dish_parts = union_all(
+            select(
+                func.date(Order.ordered_at).label("day"),
+                OrderItem.dish_id.label("dish_id"),
+                OrderItem.quantity.label("quantity"),
+                literal(0).label("reviews_count"),
+                literal(0).label("ratings_count"),
+                literal(0).label("rating_sum")
+            )
+            .join(Order, OrderItem.order_id == Order.id)
+            .where(Order.status != OrderStatus.CANCELLED),
+            select(
+                func.date(Review.datetime),
+                Review.dish_id,
+                literal(0),
+                literal(1),
+                func.count(Review.rating),
+                func.coalesce(Review.rating, 0)
+            ).group_by(Review.id)
+        ).subquery()
+        await session.execute(
+            DailyDishStat.__table__.insert().from_select(
+                ["day", "dish_id", "quantity", "reviews_count", "ratings_count", "rating_sum"],
+                select(
+                    dish_parts.c.day,
+                    dish_parts.c.dish_id,
+                    func.sum(dish_parts.c.quantity),
+                    func.sum(dish_parts.c.reviews_count),
+                    func.sum(dish_parts.c.ratings_count),
+                    func.sum(dish_parts.c.rating_sum)
+                ).group_by(dish_parts.c.day, dish_parts.c.dish_id)
+            )
+        )
+        await self._add_pending_subscription_days(session)
+        await session.commit()
+        logger.info("Statistics rollups rebuilt")
+
+    async def _add_pending_subscription_days(self, session: AsyncSession) -> None:
+        """Дни абонементов, заказы на которые еще не созданы, учитываются как оплаченные (или отмененные)."""
+        stmt = (
+            select(SubscriptionPlan)
+            .options(selectinload(SubscriptionPlan.items))
+            .where(SubscriptionPlan.materialized_through < SubscriptionPlan.last_day)
+        )
+        delta = RollupDelta()
+        for plan in (await session.execute(stmt)).scalars().all():
+            status = OrderStatus.CANCELLED if plan.cancelled_at else OrderStatus.PAID
+            items = [(item.dish_id, item.quantity) for item in plan.items]
+            for day in plan.pending_days():
+                delta.add_order(datetime.combine(day, plan.created_at.time()), status, plan.day_cost, items)
+        await self.apply(session, delta)
+
+    async def rebuild_if_empty(self, session: AsyncSession) -> None:
+        """Первый запуск на базе с историей заказов: собрать сводки, если их еще нет."""
+        has_rollups = (await session.execute(select(DailyOrderStat.day).limit(1))).first()
+        has_orders = (await session.execute(select(Order.id).limit(1))).first()
+        if has_orders and not has_rollups:
+            await self.rebuild(session)
+
+
+rollups_manager = RollupCRUD()
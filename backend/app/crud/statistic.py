@@ -1,12 +1,10 @@
 from datetime import date, datetime, time
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, case, distinct
+from sqlalchemy import select, func, and_, case
 
-from app.models.order import Order
-from app.models.associations import OrderItem
 from app.models.dish import Dish
-from app.models.review import Review
 from app.models.user import User
+from app.models.statistic import DailyOrderStat, DailyDishStat
 
 from app.core.enums import OrderStatus
 
@@ -20,28 +18,37 @@ from app.schemas.statistic import (
 from app.schemas.dish import DishResponse
 
 class StatisticCRUD:
+    """
+    Отчеты читаются из дневных сводок (daily_order_stats, daily_dish_stats),
+    которые поддерживаются при записи заказов и отзывов, см. app.crud.rollup.
+    """
+
     def _apply_date_filter(self, query, model_date_field, date_from: date, date_to: date):
         dt_from = datetime.combine(date_from, time.min)
         dt_to = datetime.combine(date_to, time.max)
         return query.where(and_(model_date_field >= dt_from, model_date_field <= dt_to))
 
+    def _apply_day_filter(self, query, day_field, date_from: date, date_to: date):
+        return query.where(and_(day_field >= self._as_date(date_from), day_field <= self._as_date(date_to)))
+
+    @staticmethod
+    def _as_date(value) -> date:
+        return value.date() if isinstance(value, datetime) else value
+
     async def get_payment_statistics(
         self, session: AsyncSession, date_from: date, date_to: date
     ) -> PaymentStatisticsResponse:
         stmt_orders = (
             select(
-                func.count(distinct(Order.id)).label("count"),
-                func.sum(Dish.price * OrderItem.quantity).label("total_amount")
+                func.sum(DailyOrderStat.orders_count).label("count"),
+                func.sum(DailyOrderStat.revenue).label("total_amount")
             )
-            .select_from(Order)
-            .join(OrderItem, Order.id == OrderItem.order_id)
-            .join(Dish, OrderItem.dish_id == Dish.id)
-            .where(Order.status.in_([OrderStatus.PAID, OrderStatus.SERVED]))
+            .where(DailyOrderStat.status.in_([OrderStatus.PAID, OrderStatus.SERVED]))
         )
-        stmt_orders = self._apply_date_filter(stmt_orders, Order.ordered_at, date_from, date_to)
+        stmt_orders = self._apply_day_filter(stmt_orders, DailyOrderStat.day, date_from, date_to)
         
         result_orders = (await session.execute(stmt_orders)).one()
-        orders_count = result_orders.count or 0
+        orders_count = int(result_orders.count or 0)
         total_order_amount = result_orders.total_amount or 0
 
         stmt_subs = select(func.count(User.id)).where(User.subscription_start.isnot(None))
@@ -64,47 +71,41 @@ class StatisticCRUD:
     async def get_attendance_statistics(
         self, session: AsyncSession, date_from: date, date_to: date
     ) -> AttendanceStatisticsResponse:
-        
+        served_count = func.sum(case((DailyOrderStat.status == OrderStatus.SERVED, DailyOrderStat.orders_count), else_=0))
 
-        stmt_totals = (
+        stmt_by_date = (
             select(
-                func.count(Order.id).label("total_paid"),
-                func.sum(case((Order.status == OrderStatus.SERVED, 1), else_=0)).label("total_served")
+                DailyOrderStat.day,
+                func.sum(DailyOrderStat.orders_count).label("total"),
+                served_count.label("served")
             )
-            .where(Order.status != OrderStatus.CANCELLED)
+            .where(DailyOrderStat.status != OrderStatus.CANCELLED)
         )
-        stmt_totals = self._apply_date_filter(stmt_totals, Order.ordered_at, date_from, date_to)
-        
-        result_totals = (await session.execute(stmt_totals)).one()
-        total_paid = result_totals.total_paid or 0
-        total_served = result_totals.total_served or 0        
-        attendance_rate = 0.0
-        if total_paid > 0:
-            attendance_rate = round(total_served / total_paid, 4)
-
+        stmt_by_date = self._apply_day_filter(stmt_by_date, DailyOrderStat.day, date_from, date_to)
         stmt_by_date = (
-            select(
-                func.date(Order.ordered_at).label("day"),
-                func.count(Order.id).label("total"),
-                func.sum(case((Order.status == OrderStatus.SERVED, 1), else_=0)).label("served")
-            )
-            .where(Order.status != OrderStatus.CANCELLED)
+            stmt_by_date.group_by(DailyOrderStat.day)
+            .having(func.sum(DailyOrderStat.orders_count) > 0)
+            .order_by(DailyOrderStat.day)
         )
-        stmt_by_date = self._apply_date_filter(stmt_by_date, Order.ordered_at, date_from, date_to)
-        stmt_by_date = stmt_by_date.group_by(func.date(Order.ordered_at)).order_by("day")
         
-        result_daily = await session.execute(stmt_by_date)
-        by_date_rows = result_daily.all()
+        by_date_rows = (await session.execute(stmt_by_date)).all()
         
         by_date_list = []
+        total_paid = 0
+        total_served = 0
         for row in by_date_rows:
-            date_value = date.fromisoformat(row.day) if isinstance(row.day, str) else row.day
+            total_paid += row.total
+            total_served += row.served or 0
             by_date_list.append(AttendanceStatisticsByDay(
-                date=date_value,
+                date=row.day,
                 paid=row.total,
                 served=row.served or 0
             ))
 
+        attendance_rate = 0.0
+        if total_paid > 0:
+            attendance_rate = round(total_served / total_paid, 4)
+
         return AttendanceStatisticsResponse(
             total_served=total_served,
             total_paid=total_paid,
@@ -115,49 +116,37 @@ class StatisticCRUD:
     async def get_dish_statistics(
         self, session: AsyncSession, date_from: date, date_to: date
     ) -> DishStatisticsResponse:        
-        stmt_sales = (
+        stmt = (
             select(
                 Dish,
-                func.sum(OrderItem.quantity).label("orders_count")
-            )
-            .select_from(Dish)
-            .join(OrderItem, Dish.id == OrderItem.dish_id)
-            .join(Order, OrderItem.order_id == Order.id)
-            .where(Order.status != OrderStatus.CANCELLED)
-        )
-        stmt_sales = self._apply_date_filter(stmt_sales, Order.ordered_at, date_from, date_to)
-        stmt_sales = stmt_sales.group_by(Dish.id)
-        
-        sales_result = (await session.execute(stmt_sales)).all()
-        
-        stmt_reviews = (
-            select(
-                Review.dish_id,
-                func.count(Review.id).label("review_count"),
-                func.avg(Review.rating).label("avg_rating")
+                func.sum(DailyDishStat.quantity).label("orders_count"),
+                func.sum(DailyDishStat.reviews_count).label("reviews_count"),
+                func.sum(DailyDishStat.ratings_count).label("ratings_count"),
+                func.sum(DailyDishStat.rating_sum).label("rating_sum")
             )
-            .select_from(Review)
+            .select_from(DailyDishStat)
+            .join(Dish, DailyDishStat.dish_id == Dish.id)
         )
-        stmt_reviews = self._apply_date_filter(stmt_reviews, Review.datetime, date_from, date_to)
-        stmt_reviews = stmt_reviews.group_by(Review.dish_id)
+        stmt = self._apply_day_filter(stmt, DailyDishStat.day, date_from, date_to)
+        stmt = stmt.group_by(Dish.id).having(func.sum(DailyDishStat.quantity) > 0)
         
-        reviews_result = (await session.execute(stmt_reviews)).all()
-        reviews_map = {r.dish_id: (r.review_count, r.avg_rating) for r in reviews_result}
+        rows = (await session.execute(stmt)).all()
         
         items = []
-        for row in sales_result:
+        for row in rows:
             dish_obj = row.Dish
     
             orders_count = int(row.orders_count) if row.orders_count else 0
             
-            r_count, r_avg = reviews_map.get(dish_obj.id, (0, None))
-            avg_rating_val = round(float(r_avg), 1) if r_avg else None
+            avg_rating_val = None
+            if row.ratings_count:
+                avg_rating_val = round(row.rating_sum / row.ratings_count, 1)
 
             items.append(DishStatistic(
                 dish=DishResponse(id=dish_obj.id, name=dish_obj.name, price=dish_obj.price), 
                 orders_count=orders_count,
                 average_rating=avg_rating_val,
-                reviews_count=r_count
+                reviews_count=int(row.reviews_count or 0)
             ))
             
         return DishStatisticsResponse(dishes=items)
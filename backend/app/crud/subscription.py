@@ -0,0 +1,222 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert
+from sqlalchemy.orm import selectinload
+from fastapi import HTTPException
+import logging
+
+from app.crud.rollup import rollups_manager, RollupDelta
+
+from app.models.subscription import SubscriptionPlan, SubscriptionPlanItem
+from app.models.order import Order
+from app.models.associations import OrderItem
+from app.models.dish import Dish
+
+from app.core.enums import OrderStatus
+from app.core.kitchen_board import kitchen_board, KitchenDelta
+
+logger = logging.getLogger(__name__)
+
+# сколько заказов создается одним INSERT (ограничение SQLite на число параметров)
+MATERIALIZE_CHUNK = 500
+
+
+class SubscriptionCRUD:
+    """
+    Абонементы хранятся компактно: шаблон позиций, расписание и стоимость дня.
+    Заказ на конкретный день создается, когда этот день наступает: фоновой задачей
+    (app.core.subscription_scheduler) или лениво при чтении списка заказов.
+
+    Будущие дни попадают в дневные сводки статистики сразу при покупке (как оплаченные)
+    и переносятся в отмененные при отмене абонемента, поэтому статистика совпадает
+    с прежней схемой, где заказы создавались заранее.
+    """
+
+    def __init__(self, model):
+        self.model: SubscriptionPlan = model
+        # день, за который этот процесс уже создал заказы; новые абонементы начинаются не раньше завтра
+        self._materialized_on: Optional[date] = None
+
+    async def get_active(self, session: AsyncSession, user_id: int) -> Optional[SubscriptionPlan]:
+        stmt = (
+            select(self.model)
+            .options(selectinload(self.model.items))
+            .where(
+                self.model.user_id == user_id,
+                self.model.cancelled_at.is_(None),
+                self.model.last_day >= date.today()
+            )
+            .order_by(self.model.id.desc())
+            .limit(1)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    async def create(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        items: List[Tuple[int, int]],
+        day_cost: int,
+        meals_total: int,
+        purchased_at: datetime
+    ) -> SubscriptionPlan:
+        """Сохранить план абонемента (коммитит вызывающий). items - пары (dish_id, quantity)."""
+        first_day = purchased_at.date() + timedelta(days=1)
+        days = self.model.schedule_days(first_day, meals_total)
+
+        plan = self.model(
+            user_id=user_id,
+            created_at=purchased_at,
+            first_day=days[0],
+            last_day=days[-1],
+            meals_total=meals_total,
+            day_cost=day_cost,
+            materialized_through=days[0] - timedelta(days=1)
+        )
+        session.add(plan)
+        await session.flush()
+
+        await session.execute(
+            insert(SubscriptionPlanItem).values([
+                {"plan_id": plan.id, "dish_id": dish_id, "quantity": quantity}
+                for dish_id, quantity in items
+            ])
+        )
+
+        rollup = RollupDelta()
+        for day in days:
+            rollup.add_order(self._order_time(plan, day), OrderStatus.PAID, day_cost, items)
+        await rollups_manager.apply(session, rollup)
+        return plan
+
+    async def cancel(self, session: AsyncSession, plan: SubscriptionPlan) -> Tuple[int, int]:
+        """
+        Отменить оставшиеся дни одним условным UPDATE (коммитит вызывающий).
+        Возвращает (сумма к возврату, число отмененных дней).
+        """
+        pending = plan.pending_days()
+        refund = plan.day_cost * len(pending)
+
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.id == plan.id,
+                self.model.cancelled_at.is_(None),
+                self.model.materialized_through == plan.materialized_through
+            )
+            .values(cancelled_at=datetime.now(), refunded=refund)
+            .execution_options(synchronize_session=False)
+        )
+        if (await session.execute(stmt)).rowcount == 0:
+            raise HTTPException(status_code=409, detail="Абонемент был изменен, повторите попытку")
+
+        items = [(item.dish_id, item.quantity) for item in plan.items]
+        rollup = RollupDelta()
+        for day in pending:
+            rollup.move_order(self._order_time(plan, day), OrderStatus.PAID, OrderStatus.CANCELLED, plan.day_cost, items)
+        await rollups_manager.apply(session, rollup)
+        return refund, len(pending)
+
+    async def materialize_due(self, session: AsyncSession, today: Optional[date] = None, force: bool = False) -> int:
+        """
+        Создать заказы за все наступившие дни абонементов, пачками.
+        Безопасно при параллельном вызове из нескольких воркеров: план сначала "захватывается"
+        условным UPDATE по старому значению materialized_through. Возвращает число созданных заказов.
+        """
+        today = today or date.today()
+        if not force and self._materialized_on == today:
+            return 0
+
+        stmt = (
+            select(self.model)
+            .options(selectinload(self.model.items))
+            .where(
+                self.model.cancelled_at.is_(None),
+                self.model.materialized_through < today,
+                self.model.first_day <= today
+            )
+        )
+        plans = [(plan, plan.materialized_through) for plan in (await session.execute(stmt)).scalars().all()]
+
+        by_old_day = defaultdict(list)
+        for plan, old_day in plans:
+            by_old_day[old_day].append(plan.id)
+
+        claimed = set()
+        for old_day, plan_ids in by_old_day.items():
+            claim = (
+                update(self.model)
+                .where(self.model.id.in_(plan_ids), self.model.materialized_through == old_day)
+                .values(materialized_through=today)
+                .returning(self.model.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed.update((await session.execute(claim)).scalars().all())
+
+        orders = []
+        for plan, old_day in plans:
+            if plan.id not in claimed:
+                continue
+            for day in plan.days():
+                if old_day < day <= today:
+                    orders.append((plan, day))
+
+        for start in range(0, len(orders), MATERIALIZE_CHUNK):
+            await self._insert_orders(session, orders[start:start + MATERIALIZE_CHUNK])
+
+        # дельту для кухни собираем до коммита: запрос после него снова открыл бы пишущую транзакцию
+        kitchen = await self._kitchen_delta(session, [plan for plan, day in orders if day == date.today()])
+        await session.commit()
+        self._materialized_on = today
+        if orders:
+            logger.info(f"Materialized {len(orders)} subscription orders for {len(claimed)} plans")
+        if kitchen is not None:
+            await kitchen_board.publish(datetime.combine(date.today(), datetime.min.time()), kitchen)
+        return len(orders)
+
+    async def _kitchen_delta(self, session: AsyncSession, plans: List[SubscriptionPlan]) -> Optional[KitchenDelta]:
+        """Сегодняшние заказы абонементов - одной дельтой для доски кухни."""
+        if not plans:
+            return None
+        dish_ids = {item.dish_id for plan in plans for item in plan.items}
+        names = dict((await session.execute(select(Dish.id, Dish.name).where(Dish.id.in_(dish_ids)))).all())
+
+        kitchen = KitchenDelta()
+        for plan in plans:
+            kitchen.move(None, OrderStatus.PAID, [(item.dish_id, names.get(item.dish_id), item.quantity) for item in plan.items])
+        return kitchen
+
+    async def _insert_orders(self, session: AsyncSession, orders: List[Tuple[SubscriptionPlan, date]]) -> None:
+        order_stmt = (
+            insert(Order)
+            .values([
+                {
+                    "user_id": plan.user_id,
+                    "ordered_at": self._order_time(plan, day),
+                    "status": OrderStatus.PAID,
+                    "completed_at": None
+                }
+                for plan, day in orders
+            ])
+            .returning(Order.id)
+        )
+        # id выдаются в порядке строк VALUES
+        order_ids = sorted((await session.execute(order_stmt)).scalars().all())
+
+        await session.execute(
+            insert(OrderItem).values([
+                {"order_id": order_id, "dish_id": item.dish_id, "quantity": item.quantity}
+                for order_id, (plan, _) in zip(order_ids, orders)
+                for item in plan.items
+            ])
+        )
+
+    @staticmethod
+    def _order_time(plan: SubscriptionPlan, day: date) -> datetime:
+        """Заказ дня абонемента датируется этим днем и временем покупки, как раньше."""
+        return datetime.combine(day, plan.created_at.time())
+
+
+subscriptions_manager = SubscriptionCRUD(SubscriptionPlan)
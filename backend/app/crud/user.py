@@ -1,20 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, or_, and_, cast, String, func
+from sqlalchemy import select, update, or_, func, inspect
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, make_transient_to_detached
 from typing import Optional, List, Union
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 import logging
 
 from app.crud.paginating import paginate
+from app.crud.allergen import allergens_manager
+from app.crud.balance import balance_manager
 from app.crud.notification import notifications_manager
+from app.crud.rollup import rollups_manager, RollupDelta
+from app.crud.subscription import subscriptions_manager
 
 from app.models.user import User
 from app.models.dish import Ingredient
 from app.models.order import Order
 from app.models.associations import OrderItem
-from app.core.enums import UserRole, OrderStatus
+from app.models.subscription import SubscriptionPlan
+from app.core.enums import UserRole, OrderStatus, BalanceOperation
 
 from app.schemas.paginating import PaginationParams, PaginatedResponse
 from app.schemas.auth import RegisterRequest
@@ -26,7 +31,9 @@ from app.schemas.user import (
 )
 from app.schemas.notification import CreateNotificationRequest
 
-from app.core.security.password import hash_password
+from app.core.security.password import hash_password_async
+from app.core.cache import principal_cache, invalidate_principal
+from app.db.search import MIN_MATCH_LENGTH, users_fts_match
 
 
 logger = logging.getLogger(__name__)
@@ -59,6 +66,25 @@ class UserCRUD:
             )
         return user
 
+    async def get_principal(self, session: AsyncSession, id: int) -> User:
+        """
+        То же, что get_by_id, но через principal_cache.
+        При попадании пользователь восстанавливается из снимка колонок без запроса к БД.
+        """
+        values = principal_cache.get(id)
+        if values is None:
+            user = await self.get_by_id(session, id)
+            principal_cache.set(id, {attr.key: getattr(user, attr.key) for attr in inspect(self.model).column_attrs})
+            return user
+
+        user = self.model(**values)
+        make_transient_to_detached(user)
+        return await session.merge(user, load=False)
+
+    async def invalidate_principal(self, user_id: int) -> None:
+        """Сбросить кэшированный снимок пользователя после изменения его строки (во всех воркерах)."""
+        await invalidate_principal(user_id)
+
     async def get_all_paginated(
         self,
         session: AsyncSession,
@@ -72,38 +98,46 @@ class UserCRUD:
             query = query.where(self.model.role == role)
         
         if search:
-            search_term = search.strip()
-            if not search_term:
+            search_words = search.split()
+            if not search_words:
                 return await paginate(session, query, params)
-            
-            search_words = [word for word in search_term.split() if word]
-            
-            if search_words:
-                word_conditions = []
+
+            if len(search_words) == 1 and search_words[0].isdigit():
+                # поиск по ID - точное совпадение по первичному ключу
+                query = query.where(self.model.id == int(search_words[0]))
+            elif session.bind.dialect.name == "sqlite":
+                query = self._apply_fts_search(query, search_words)
+            else:
                 for word in search_words:
-                    word_lower = word.lower()
-                    word_upper = word.upper()
-                    word_title = word.title()
-                    
-                    conditions = [
-                        # by ID
-                        cast(self.model.id, String).like(f'%{word}%'),
-                    ]
-                    
-                    for text_field in [self.model.name, self.model.surname, func.coalesce(self.model.patronymic, '')]:
-                        conditions.extend([
-                            text_field.like(f'%{word}%'),
-                            text_field.like(f'%{word_lower}%'),
-                            text_field.like(f'%{word_upper}%'),
-                            text_field.like(f'%{word_title}%'),
-                        ])
-                    
-                    word_conditions.append(or_(*conditions))
-                # all words should be found (each at least in one field)
-                query = query.where(and_(*word_conditions))
+                    query = query.where(or_(*[field.ilike(f'%{word}%') for field in self._search_fields()]))
 
         return await paginate(session, query, params)
 
+    def _search_fields(self) -> list:
+        return [self.model.name, self.model.surname, func.coalesce(self.model.patronymic, ''), self.model.email]
+
+    def _apply_fts_search(self, query, search_words: List[str]):
+        """
+        Слова от 3 символов ищутся по триграммному индексу users_fts с ранжированием bm25,
+        более короткие - через LIKE (индекс для них неприменим).
+        """
+        long_words = [word for word in search_words if len(word) >= MIN_MATCH_LENGTH]
+        short_words = [word for word in search_words if len(word) < MIN_MATCH_LENGTH]
+
+        for word in short_words:
+            # LIKE в SQLite не учитывает регистр только для латиницы
+            variants = {word, word.lower(), word.upper(), word.title()}
+            query = query.where(or_(*[field.like(f'%{variant}%') for field in self._search_fields() for variant in variants]))
+
+        if long_words:
+            matches = users_fts_match(long_words)
+            query = (
+                query.join(matches, matches.c.user_id == self.model.id)
+                .order_by(None)
+                .order_by(matches.c.rank, self.model.id)
+            )
+        return query
+
     async def create(self, session: AsyncSession, new_user: RegisterRequest) -> User:
         try:
             stmt = select(self.model).where(self.model.email == new_user.email)
@@ -112,7 +146,7 @@ class UserCRUD:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="User already exists"
                 )
-            hashed_password = hash_password(new_user.password)
+            hashed_password = await hash_password_async(new_user.password)
             
             db_user = self.model(
                 name=new_user.name,
@@ -131,6 +165,13 @@ class UserCRUD:
 
         except HTTPException:
             raise
+        except IntegrityError:
+            # параллельная регистрация с той же почтой (уникальный ix_users_email)
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User already exists"
+            )
         except Exception as e:
             await session.rollback()
             logger.error(f"Error creating user: {e}")
@@ -148,6 +189,9 @@ class UserCRUD:
         if not update_data:
             return await self.get_by_id(session, id)
         
+        if 'password' in update_data:
+            update_data['password'] = await hash_password_async(update_data['password'])
+
         old_user = None
         if 'role' in update_data:
             old_user = await self.get_by_id(session, id)
@@ -166,6 +210,7 @@ class UserCRUD:
                 raise HTTPException(status_code=404, detail="User not found")
             
             await session.commit()
+            await self.invalidate_principal(id)
             updated_user = await self.get_by_id(session, id)
             
             if old_user and old_user.role != updated_user.role:
@@ -183,7 +228,7 @@ class UserCRUD:
                         title="Изменена роль",
                         body=f"Ваша роль была изменена на {new_role_name}"
                     )
-                    await notifications_manager.create(session, notification)
+                    notifications_manager.enqueue(notification)
                 except Exception as e:
                     logger.warning(f"Failed to send role change notification: {e}")
             
@@ -194,24 +239,35 @@ class UserCRUD:
             raise HTTPException(status_code=400, detail="Update constraint violation")
 
 
+    async def set_password_hash(self, session: AsyncSession, user_id: int, hashed_password: str) -> None:
+        """Записать уже посчитанный хэш пароля (например, при перехэшировании на логине)."""
+        stmt = (
+            update(self.model)
+            .where(self.model.id == user_id)
+            .values(password=hashed_password)
+            .execution_options(synchronize_session="fetch")
+        )
+        await session.execute(stmt)
+        await session.commit()
+        await self.invalidate_principal(user_id)
+
     async def update_balance(
         self,
         session: AsyncSession,
         user_id: int, 
         new_money: int,
+        operation: BalanceOperation = BalanceOperation.TOP_UP
     ) -> None:
         """
-        Обновляет баланс.
+        Обновляет баланс: пополнение или (если new_money < 0) списание, которое не уводит баланс в минус.
         """
         try:
-            stmt = (
-                update(self.model)
-                .where(self.model.id == user_id)
-                .values(balance=self.model.balance + new_money) 
-                .execution_options(synchronize_session="fetch")
-            )
-            await session.execute(stmt)
+            if new_money >= 0:
+                await balance_manager.credit(session, user_id, new_money, operation)
+            else:
+                await balance_manager.debit(session, user_id, -new_money, operation)
             await session.commit()
+            await self.invalidate_principal(user_id)
             
             if new_money > 0:
                 try:
@@ -220,12 +276,16 @@ class UserCRUD:
                         title="Баланс пополнен",
                         body=f"Ваш баланс пополнен на {new_money} руб."
                     )
-                    await notifications_manager.create(session, notification)
+                    notifications_manager.enqueue(notification)
                 except Exception as e:
                     logger.warning(f"Failed to send balance update notification: {e}")
             
             return 
+        except HTTPException:
+            await session.rollback()
+            raise
         except Exception as e:
+            await session.rollback()
             logger.error(f"Balance update error: {e}")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Не получилось обновить баланс!")
 
@@ -277,57 +337,34 @@ class UserCRUD:
         days = subscription_data.days
         total_cost = order_cost * days
 
-        if user.balance < total_cost:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Недостаточно средств. Нужно {total_cost}, на балансе {user.balance}"
-            )
-
         try:
-            user.balance -= total_cost
-
             now = datetime.now()
-            created_orders_count = 0
-            day_offset = 0
-            weekdays_scheduled = 0
-
-            while weekdays_scheduled < days:
-                day_offset += 1
-                order_date = now + timedelta(days=day_offset)
-                # skip Saturday (5) and Sunday (6)
-                if order_date.weekday() in (5, 6):
-                    continue
-
-                new_order = Order(
-                    user_id=user_id,
-                    ordered_at=order_date,
-                    status=OrderStatus.PAID,
-                    completed_at=None
-                )
-                session.add(new_order)
-                await session.flush()
-
-                for item in template_order.dishes:
-                    order_item = OrderItem(
-                        order_id=new_order.id,
-                        dish_id=item.dish_id,
-                        quantity=item.quantity
-                    )
-                    session.add(order_item)
-
-                weekdays_scheduled += 1
-                created_orders_count += 1
+            plan = await subscriptions_manager.create(
+                session,
+                user_id=user_id,
+                items=[(item.dish_id, item.quantity) for item in template_order.dishes],
+                day_cost=order_cost,
+                meals_total=days,
+                purchased_at=now
+            )
+            try:
+                await balance_manager.debit(session, user_id, total_cost, BalanceOperation.SUBSCRIPTION_PAYMENT, plan_id=plan.id)
+            except HTTPException as e:
+                if e.status_code == status.HTTP_400_BAD_REQUEST:
+                    raise HTTPException(status_code=400, detail=f"Недостаточно средств. Нужно {total_cost}")
+                raise
 
             user.subscription_start = now
-            user.subscription_days = day_offset
+            user.subscription_days = (plan.last_day - now.date()).days
 
             session.add(user)
             await session.commit()
+            await self.invalidate_principal(user_id)
             await session.refresh(user)
 
             return PurchaseSubscriptionResponse(
-                subscription=self._calculate_subscription_response(user),
-                created_orders=created_orders_count,
+                subscription=self._calculate_subscription_response(user, plan),
+                created_orders=plan.meals_total,
                 total_cost=total_cost
             )
 
@@ -344,13 +381,50 @@ class UserCRUD:
         session: AsyncSession,
         user_id: int,
     ) -> CancelSubscriptionResponse:
-        """Cancel active subscription. Refund cost of future orders (from tomorrow onwards) and cancel them."""
+        """Cancel active subscription. Refund the days that have no order yet (from tomorrow onwards)."""
         user = await self.get_by_id(session, user_id)
         sub = self._calculate_subscription_response(user)
 
         if not sub.is_active:
             raise HTTPException(status_code=400, detail="У вас нет активного абонемента")
 
+        # сегодняшний заказ остается за пользователем, поэтому сначала создаем заказы за наступившие дни
+        await subscriptions_manager.materialize_due(session)
+        plan = await subscriptions_manager.get_active(session, user_id)
+
+        try:
+            if plan is not None:
+                refund_total, cancelled_count = await subscriptions_manager.cancel(session, plan)
+            else:
+                refund_total, cancelled_count = await self._cancel_prepaid_orders(session, user_id)
+
+            if refund_total:
+                await balance_manager.credit(
+                    session, user_id, refund_total, BalanceOperation.SUBSCRIPTION_REFUND,
+                    plan_id=plan.id if plan is not None else None
+                )
+            user.subscription_start = None
+            user.subscription_days = 0
+
+            session.add(user)
+            await session.commit()
+            await self.invalidate_principal(user_id)
+            await session.refresh(user)
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Subscription cancel error: {e}")
+            raise HTTPException(status_code=500, detail="Не удалось отменить абонемент")
+
+        return CancelSubscriptionResponse(
+            refunded=refund_total,
+            cancelled_orders=cancelled_count,
+        )
+
+    async def _cancel_prepaid_orders(self, session: AsyncSession, user_id: int) -> tuple[int, int]:
+        """Абонементы, купленные до появления планов: будущие дни уже лежат в orders как оплаченные заказы."""
         tomorrow_start = datetime.combine(
             (datetime.now() + timedelta(days=1)).date(),
             datetime.min.time(),
@@ -364,41 +438,27 @@ class UserCRUD:
                 Order.ordered_at >= tomorrow_start,
             )
         )
-        result = await session.execute(stmt)
-        future_orders = result.scalars().all()
+        future_orders = (await session.execute(stmt)).scalars().all()
 
         refund_total = 0
-        cancelled_count = 0
-
+        rollup = RollupDelta()
         for order in future_orders:
             order_cost = sum(item.dish.price * item.quantity for item in order.dishes)
             refund_total += order_cost
             order.status = OrderStatus.CANCELLED
-            cancelled_count += 1
-
-        user.balance += refund_total
-        user.subscription_start = None
-        user.subscription_days = 0
-
-        try:
-            session.add(user)
-            await session.commit()
-            await session.refresh(user)
-        except Exception as e:
-            await session.rollback()
-            logger.error(f"Subscription cancel error: {e}")
-            raise HTTPException(status_code=500, detail="Не удалось отменить абонемент")
-
-        return CancelSubscriptionResponse(
-            refunded=refund_total,
-            cancelled_orders=cancelled_count,
-        )
+            rollup.move_order(
+                order.ordered_at, OrderStatus.PAID, OrderStatus.CANCELLED, order_cost,
+                [(item.dish_id, item.quantity) for item in order.dishes]
+            )
+        await rollups_manager.apply(session, rollup)
+        return refund_total, len(future_orders)
 
     async def get_subscription_info(self, session: AsyncSession, user_id: int) -> SubscriptionResponse:
         user = await self.get_by_id(session, user_id)
-        return self._calculate_subscription_response(user)
+        plan = await subscriptions_manager.get_active(session, user_id)
+        return self._calculate_subscription_response(user, plan)
 
-    def _calculate_subscription_response(self, user: User) -> SubscriptionResponse:
+    def _calculate_subscription_response(self, user: User, plan: Optional[SubscriptionPlan] = None) -> SubscriptionResponse:
         """Helper for subscription response"""
         is_active = False
         days_remaining = 0
@@ -413,12 +473,21 @@ class UserCRUD:
                 is_active = True
                 days_remaining = (end_date - now).days
         
+        meals_total = meals_remaining = prepaid_amount = 0
+        if plan is not None:
+            meals_total = plan.meals_total
+            meals_remaining = len(plan.pending_days())
+            prepaid_amount = meals_remaining * plan.day_cost
+
         return SubscriptionResponse(
             user_id=user.id,
             subscription_start=sub_start,
             subscription_days=sub_days,
             days_remaining=days_remaining,
-            is_active=is_active
+            is_active=is_active,
+            meals_total=meals_total,
+            meals_remaining=meals_remaining,
+            prepaid_amount=prepaid_amount
         )
 
     async def get_allergies(self, session: AsyncSession, user_id: int) -> List[Ingredient]:
@@ -454,6 +523,7 @@ class UserCRUD:
             
         user.ingredient_allergies.append(ingredient)
         await session.commit()
+        await allergens_manager.invalidate_user(user_id)
         return True
 
     async def remove_allergy(self, session: AsyncSession, user_id: int, ingredient_id: int) -> bool:
@@ -476,6 +546,7 @@ class UserCRUD:
             
         user.ingredient_allergies.remove(allergy_to_remove)
         await session.commit()
+        await allergens_manager.invalidate_user(user_id)
         return True
 
     async def switch_ban(self, session: AsyncSession, user_id: int) -> bool:
@@ -484,6 +555,7 @@ class UserCRUD:
         user.banned = not user.banned
         session.add(user) 
         await session.commit()
+        await self.invalidate_principal(user_id)
         await session.refresh(user)
         
         try:
@@ -499,7 +571,7 @@ class UserCRUD:
                     title="Аккаунт разблокирован",
                     body="Ваш аккаунт был разблокирован"
                 )
-            await notifications_manager.create(session, notification)
+            notifications_manager.enqueue(notification)
         except Exception as e:
             logger.warning(f"Failed to send ban status notification: {e}")
         
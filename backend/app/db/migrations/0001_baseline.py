@@ -0,0 +1,206 @@
+"""
+Схема на момент появления миграций.
+
+Таблицы описаны здесь явно и больше не меняются: модели дальше живут своей жизнью,
+а каждое изменение схемы - отдельная миграция. Индексы под частые запросы создает 0003.
+
+Новая база: все таблицы ниже. База, созданная через create_all до миграций:
+недостающие таблицы (абонементы, сводки статистики, журнал баланса) и колонки отчетов.
+"""
+from sqlalchemy import (
+    Boolean, Column, Connection, Date, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, func
+)
+
+from app.db.migrations import add_column
+
+metadata = MetaData()
+
+blacklisted_tokens = Table(
+    "blacklisted_tokens", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("jti", String, nullable=False),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Index("ix_blacklisted_tokens_expires_at", "expires_at"),
+    Index("ix_blacklisted_tokens_jti", "jti", unique=True),
+)
+
+daily_order_stats = Table(
+    "daily_order_stats", metadata,
+    Column("day", Date, primary_key=True),
+    Column("status", Enum("PAID", "READY", "SERVED", "CANCELLED", name="orderstatus"), primary_key=True),
+    Column("orders_count", Integer, nullable=False),
+    Column("revenue", Integer, nullable=False),
+)
+
+dishes = Table(
+    "dishes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("image_url", String),
+)
+
+ingredients = Table(
+    "ingredients", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("price", Integer, nullable=False),
+    Column("measure", Enum("WEIGHT", "VOLUME", name="measures"), nullable=False),
+)
+
+menu = Table(
+    "menu", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+)
+
+reports = Table(
+    "reports", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("report_type", Enum("PAYMENT", "ATTEND", "DISH", "ALL", name="reports", native_enum=False), nullable=False),
+    Column("generated_at", DateTime, nullable=False),
+    Column("download_url", String, nullable=False),
+    Column("date_from", DateTime),
+    Column("date_to", DateTime),
+    Column("status", Enum("PENDING", "READY", "FAILED", name="reportstatus", native_enum=False), nullable=False, server_default="READY"),
+    Column("error", String),
+)
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("surname", String, nullable=False),
+    Column("patronymic", String),
+    Column("email", String, nullable=False),
+    Column("password", String, nullable=False),
+    Column("registered_at", DateTime(timezone=True), nullable=False),
+    Column("role", Enum("ADMIN", "STUDENT", "COOK", name="userrole"), nullable=False),
+    Column("banned", Boolean, nullable=False),
+    Column("balance", Integer, nullable=False),
+    Column("subscription_start", DateTime(timezone=True)),
+    Column("subscription_days", Integer, nullable=False),
+)
+
+applications = Table(
+    "applications", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("datetime", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("status", Enum("PAID", "READY", "SERVED", "CANCELLED", name="orderstatus"), nullable=False),
+    Column("rejection_reason", String),
+)
+
+daily_dish_stats = Table(
+    "daily_dish_stats", metadata,
+    Column("day", Date, primary_key=True),
+    Column("dish_id", Integer, ForeignKey("dishes.id", ondelete="CASCADE"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+    Column("reviews_count", Integer, nullable=False),
+    Column("ratings_count", Integer, nullable=False),
+    Column("rating_sum", Integer, nullable=False),
+)
+
+dish_ingredients = Table(
+    "dish_ingredients", metadata,
+    Column("ingredient_id", Integer, ForeignKey("ingredients.id"), primary_key=True),
+    Column("dish_id", Integer, ForeignKey("dishes.id"), primary_key=True),
+    Column("amount_thousandth_measure", Integer, nullable=False),
+)
+
+menu_items = Table(
+    "menu_items", metadata,
+    Column("menu_id", Integer, ForeignKey("menu.id"), primary_key=True),
+    Column("dish_id", Integer, ForeignKey("dishes.id"), primary_key=True),
+)
+
+notifications = Table(
+    "notifications", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("title", String, nullable=False),
+    Column("body", String, nullable=False),
+    Column("read", Boolean, nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+)
+
+orders = Table(
+    "orders", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("ordered_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("completed_at", DateTime(timezone=True)),
+    Column("status", Enum("PAID", "READY", "SERVED", "CANCELLED", name="orderstatus"), nullable=False),
+)
+
+reviews = Table(
+    "reviews", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("dish_id", Integer, ForeignKey("dishes.id"), nullable=False),
+    Column("rating", Integer),
+    Column("datetime", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("content", String, nullable=False),
+)
+
+subscription_plans = Table(
+    "subscription_plans", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("first_day", Date, nullable=False),
+    Column("last_day", Date, nullable=False),
+    Column("meals_total", Integer, nullable=False),
+    Column("day_cost", Integer, nullable=False),
+    Column("materialized_through", Date, nullable=False),
+    Column("cancelled_at", DateTime(timezone=True)),
+    Column("refunded", Integer, nullable=False),
+    Index("ix_subscription_plans_due", "cancelled_at", "materialized_through"),
+    Index("ix_subscription_plans_user_id", "user_id"),
+)
+
+user_allergies = Table(
+    "user_allergies", metadata,
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("ingredient_id", Integer, ForeignKey("ingredients.id")),
+)
+
+application_items = Table(
+    "application_items", metadata,
+    Column("application_id", Integer, ForeignKey("applications.id"), primary_key=True),
+    Column("ingredient_id", Integer, ForeignKey("ingredients.id"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+)
+
+balance_transactions = Table(
+    "balance_transactions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now()),
+    Column("kind", Enum("OPENING", "TOP_UP", "ADJUSTMENT", "ORDER_PAYMENT", "ORDER_REFUND", "SUBSCRIPTION_PAYMENT", "SUBSCRIPTION_REFUND", name="balanceoperation"), nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("balance_after", Integer, nullable=False),
+    Column("order_id", Integer, ForeignKey("orders.id", ondelete="SET NULL")),
+    Column("plan_id", Integer, ForeignKey("subscription_plans.id", ondelete="SET NULL")),
+    Index("ix_balance_transactions_user_id_id", "user_id", "id"),
+)
+
+order_items = Table(
+    "order_items", metadata,
+    Column("order_id", Integer, ForeignKey("orders.id"), primary_key=True),
+    Column("dish_id", Integer, ForeignKey("dishes.id"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+)
+
+subscription_plan_items = Table(
+    "subscription_plan_items", metadata,
+    Column("plan_id", Integer, ForeignKey("subscription_plans.id", ondelete="CASCADE"), primary_key=True),
+    Column("dish_id", Integer, ForeignKey("dishes.id"), primary_key=True),
+    Column("quantity", Integer, nullable=False),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    metadata.create_all(connection)
+    add_column(connection, reports.c.status)
+    add_column(connection, reports.c.error)
@@ -0,0 +1,8 @@
+"""Полнотекстовый индекс пользователей (FTS5, только SQLite) и триггеры синхронизации."""
+from sqlalchemy import Connection
+
+from app.db.search import create_users_fts
+
+
+def upgrade(connection: Connection) -> None:
+    create_users_fts(connection)
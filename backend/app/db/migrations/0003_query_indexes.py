@@ -0,0 +1,64 @@
+"""
+Составные индексы под частые запросы (проверка планов: python -m app.scripts.migrate --explain).
+
+    orders(user_id, ordered_at)                 история заказов пользователя
+    orders(status, ordered_at)                  невыданные заказы для плана закупки
+    notifications(user_id, read, created_at)    непрочитанные и лента уведомлений
+    reviews(dish_id, datetime)                  отзывы о блюде
+    users(email) UNIQUE                         вход и регистрация
+"""
+from sqlalchemy import Boolean, Column, Connection, DateTime, Index, Integer, MetaData, String, Table, func, select
+
+from app.db.migrations import MigrationError, create_index
+
+# только колонки, на которые ссылаются индексы и проверка дубликатов; таблицы создает 0001
+metadata = MetaData()
+
+orders = Table(
+    "orders", metadata,
+    Column("user_id", Integer),
+    Column("status", String),
+    Column("ordered_at", DateTime(timezone=True)),
+)
+
+notifications = Table(
+    "notifications", metadata,
+    Column("user_id", Integer),
+    Column("read", Boolean),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+reviews = Table(
+    "reviews", metadata,
+    Column("dish_id", Integer),
+    Column("datetime", DateTime(timezone=True)),
+)
+
+users = Table(
+    "users", metadata,
+    Column("email", String),
+)
+
+INDEXES = [
+    Index("ix_orders_user_id_ordered_at", orders.c.user_id, orders.c.ordered_at),
+    Index("ix_orders_status_ordered_at", orders.c.status, orders.c.ordered_at),
+    Index("ix_notifications_user_id_read_created_at", notifications.c.user_id, notifications.c.read, notifications.c.created_at),
+    Index("ix_reviews_dish_id_datetime", reviews.c.dish_id, reviews.c.datetime),
+    Index("ix_users_email", users.c.email, unique=True),
+]
+
+
+def upgrade(connection: Connection) -> None:
+    # регистрация проверяла почту без ограничения в БД, гонка могла оставить дубликаты -
+    # сливать чужие аккаунты автоматически нельзя, поэтому миграция останавливается
+    duplicates = connection.execute(
+        select(users.c.email, func.count())
+        .group_by(users.c.email)
+        .having(func.count() > 1)
+    ).all()
+    if duplicates:
+        listed = ", ".join(f"{email} ({count})" for email, count in duplicates)
+        raise MigrationError(f"Duplicate user emails, resolve them before creating the unique index: {listed}")
+
+    for index in INDEXES:
+        create_index(connection, index)
@@ -0,0 +1,18 @@
+"""Версия каталога в БД: общая для всех воркеров, меняется в той же транзакции, что и каталог."""
+import secrets
+
+from sqlalchemy import Column, Connection, Integer, MetaData, String, Table, insert, select
+
+metadata = MetaData()
+
+catalog_version = Table(
+    "catalog_version", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", String, nullable=False),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    catalog_version.create(connection, checkfirst=True)
+    if connection.execute(select(catalog_version.c.id)).first() is None:
+        connection.execute(insert(catalog_version).values(id=1, version=secrets.token_hex(6)))
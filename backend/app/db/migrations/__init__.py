@@ -0,0 +1,118 @@
+"""
+Версионированные миграции схемы.
+
+Миграция - модуль NNNN_name.py этого пакета с функцией upgrade(connection) (синхронный Connection).
+Примененные версии записываются в schema_migrations. Миграции применяются при деплое:
+
+    python -m app.scripts.migrate
+
+а приложение при старте только проверяет, что схема актуальна (или само применяет миграции,
+если AUTO_MIGRATE=true - для разработки).
+
+Миграции описывают таблицы и индексы явно и не зависят от моделей: правка модели не должна
+менять уже примененную историю (0001_baseline - схема на момент появления миграций).
+Любое изменение моделей, меняющее схему, требует новой миграции. Миграции должны быть
+идемпотентны: проверять наличие колонок, создавать индексы с checkfirst.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Set
+
+from sqlalchemy import Column, Connection, Index, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        applied_at VARCHAR NOT NULL
+    )
+"""
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def discover() -> List[Migration]:
+    """Миграции пакета по возрастанию версии."""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module.upgrade))
+
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+def applied_versions(connection: Connection) -> Set[int]:
+    if not inspect(connection).has_table("schema_migrations"):
+        return set()
+    return {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_migrations")}
+
+
+def pending(connection: Connection) -> List[Migration]:
+    applied = applied_versions(connection)
+    return [migration for migration in discover() if migration.version not in applied]
+
+
+def upgrade(connection: Connection) -> List[Migration]:
+    """Применить все непримененные миграции. Возвращает примененные."""
+    connection.exec_driver_sql(MIGRATIONS_TABLE_DDL)
+    applied = []
+    for migration in pending(connection):
+        logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+        migration.upgrade(connection)
+        connection.execute(
+            text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+            {"version": migration.version, "name": migration.name, "applied_at": datetime.now().isoformat(" ")},
+        )
+        applied.append(migration)
+    return applied
+
+
+def ensure_current(connection: Connection) -> None:
+    """Остановить запуск, если схема отстает от кода."""
+    missing = pending(connection)
+    if missing:
+        names = ", ".join(f"{migration.version:04d}_{migration.name}" for migration in missing)
+        raise MigrationError(
+            f"Database schema is out of date (pending: {names}). "
+            "Run 'python -m app.scripts.migrate' or set AUTO_MIGRATE=true"
+        )
+
+
+# --- операции для миграций ---
+
+def add_column(connection: Connection, column: Column) -> bool:
+    """ALTER TABLE ... ADD COLUMN по описанию колонки, если ее еще нет."""
+    table = column.table.name
+    if column.name in {c["name"] for c in inspect(connection).get_columns(table)}:
+        return False
+    ddl = CreateColumn(column).compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+    return True
+
+
+def create_index(connection: Connection, index: Index) -> None:
+    """CREATE INDEX, если индекса еще нет."""
+    index.create(connection, checkfirst=True)
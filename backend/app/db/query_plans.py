@@ -0,0 +1,99 @@
+"""
+Проверка, что частые запросы используют индексы из 0003_query_indexes (только SQLite).
+
+Формы запросов повторяют запросы CRUD-методов; план берется через EXPLAIN QUERY PLAN
+(значения параметров на план не влияют, поэтому передаются NULL).
+"""
+import logging
+from datetime import datetime
+from typing import List, NamedTuple
+
+from sqlalchemy import Connection, Select, func, select
+
+from app.core.enums import OrderStatus
+from app.models import Order, OrderItem, Review, User
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class QueryShape(NamedTuple):
+    query: str            # откуда запрос
+    index: str            # индекс, который должен использоваться
+    statement: Select
+    sorted_by_index: bool  # ORDER BY должен идти по индексу, без временного B-дерева
+
+
+class PlanCheck(NamedTuple):
+    shape: QueryShape
+    plan: List[str]
+    ok: bool
+
+
+QUERY_SHAPES = [
+    QueryShape(
+        "OrderCRUD.get_all(user_id=...)",
+        "ix_orders_user_id_ordered_at",
+        select(Order).where(Order.user_id == 1).order_by(Order.ordered_at.desc()),
+        True,
+    ),
+    QueryShape(
+        "ProcurementPlanner.plan: оплаченные заказы до горизонта",
+        "ix_orders_status_ordered_at",
+        select(func.date(Order.ordered_at), OrderItem.dish_id, func.sum(OrderItem.quantity))
+        .join(Order, OrderItem.order_id == Order.id)
+        .where(Order.status == OrderStatus.PAID, Order.ordered_at < datetime.now())
+        .group_by(func.date(Order.ordered_at), OrderItem.dish_id),
+        False,
+    ),
+    QueryShape(
+        "NotificationCRUD.get_unread_count",
+        "ix_notifications_user_id_read_created_at",
+        select(func.count()).select_from(Notification).where(Notification.user_id == 1, Notification.read == False),
+        False,
+    ),
+    QueryShape(
+        "NotificationCRUD.get_user_notifications(unread_only=True)",
+        "ix_notifications_user_id_read_created_at",
+        select(Notification)
+        .where(Notification.user_id == 1, Notification.read == False)
+        .order_by(Notification.created_at.desc()),
+        True,
+    ),
+    QueryShape(
+        "ReviewCRUD.get_all(dish_id=...)",
+        "ix_reviews_dish_id_datetime",
+        select(Review).where(Review.dish_id == 1).order_by(Review.datetime.desc()),
+        True,
+    ),
+    QueryShape(
+        "UserCRUD.get_by_email",
+        "ix_users_email",
+        select(User).where(User.email == "user@example.com"),
+        False,
+    ),
+]
+
+
+def explain(connection: Connection, statement: Select) -> List[str]:
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(None for _ in compiled.positiontup or ())
+    return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+
+
+def check_query_plans(connection: Connection) -> List[PlanCheck]:
+    """Планы запросов QUERY_SHAPES. На других СУБД проверка пропускается (пустой список)."""
+    if connection.dialect.name != "sqlite":
+        logger.warning(f"Query plan checks are implemented for SQLite only, skipped for {connection.dialect.name}")
+        return []
+
+    checks = []
+    for shape in QUERY_SHAPES:
+        plan = explain(connection, shape.statement)
+        uses_index = any(
+            f"USING INDEX {shape.index} " in step or f"USING COVERING INDEX {shape.index} " in step
+            for step in plan
+        )
+        sorts = any("TEMP B-TREE" in step and "ORDER BY" in step for step in plan)
+        checks.append(PlanCheck(shape, plan, uses_index and not (shape.sorted_by_index and sorts)))
+    return checks
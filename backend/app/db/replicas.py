@@ -0,0 +1,150 @@
+"""
+Чтение с реплик для списков и статистики.
+
+Реплики из settings.database_replica_urls выбираются по кругу. Реплика, к которой не удалось
+подключиться, пропускается replica_retry_seconds; если живых реплик нет, чтение идет с основной
+базы (SessionLocalRead). Пользователь, который сам что-то записал, следующие
+replica_read_your_writes_seconds читает с основной базы, чтобы увидеть свою запись, даже если
+реплика отстает. Запись отмечается по коммиту сессии основной базы, в которой get_current_user
+запомнил пользователя (session.info["user_id"]), и рассылается всем воркерам через fan-out
+уведомлений: следующий запрос пользователя может попасть в другой воркер.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.websockets_manager import notification_manager
+from app.db.session import SessionLocalRead, WriterSession, replica_engines
+
+logger = logging.getLogger(__name__)
+
+WRITES_TOPIC = "replica_writes"
+
+
+class ReplicaRouter:
+
+    def __init__(self, engines: List[AsyncEngine], read_your_writes_seconds: float, retry_seconds: float):
+        self.engines = engines
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._sessionmakers = [
+            async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica)
+            for replica in engines
+        ]
+        self._turn = itertools.count()
+        self._down_until: dict = {}                        # номер реплики -> time.monotonic()
+        self._recent_writers: "OrderedDict[int, float]" = OrderedDict()  # user_id -> до какого момента читать с основной
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+        self._announcements: set = set()
+
+    def announce_write(self, user_id: int) -> None:
+        """Отметить запись здесь и разослать отметку остальным воркерам (из синхронного after_commit)."""
+        self.note_write(user_id)
+        if not self.engines:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._publish_write(user_id))
+        self._announcements.add(task)
+        task.add_done_callback(self._announcements.discard)
+
+    async def _publish_write(self, user_id: int) -> None:
+        try:
+            await notification_manager.publish_event(WRITES_TOPIC, {"user_id": user_id})
+        except Exception as e:
+            logger.warning(f"Failed to publish write mark for user {user_id}: {e}")
+
+    def adopt_write(self, message: dict) -> None:
+        self.note_write(message["user_id"])
+
+    def note_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._recent_writers[user_id] = now + self.read_your_writes_seconds
+        self._recent_writers.move_to_end(user_id)
+        # срок у всех записей одинаковый, поэтому в начале словаря - самые старые
+        while self._recent_writers:
+            oldest, deadline = next(iter(self._recent_writers.items()))
+            if deadline >= now:
+                break
+            del self._recent_writers[oldest]
+
+    def wrote_recently(self, user_id: Optional[int]) -> bool:
+        deadline = self._recent_writers.get(user_id) if user_id is not None else None
+        return deadline is not None and deadline >= time.monotonic()
+
+    async def open_session(self, user_id: Optional[int] = None) -> AsyncSession:
+        """Сессия на реплике (уже с соединением) или на основной базе."""
+        if self.engines and not self.wrote_recently(user_id):
+            start = next(self._turn)
+            now = time.monotonic()
+            for offset in range(len(self.engines)):
+                index = (start + offset) % len(self.engines)
+                if self._down_until.get(index, 0) > now:
+                    continue
+                session = self._sessionmakers[index]()
+                try:
+                    await session.connection()
+                except (DBAPIError, OSError) as e:
+                    await session.close()
+                    self._down_until[index] = now + self.retry_seconds
+                    logger.warning(f"Replica {index} is unavailable for {self.retry_seconds}s: {e}")
+                    continue
+                self.replica_reads += 1
+                return session
+            self.fallbacks += 1
+
+        self.primary_reads += 1
+        return SessionLocalRead()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": len(self.engines),
+            "available": sum(1 for index in range(len(self.engines)) if self._down_until.get(index, 0) <= now),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "recent_writers": sum(1 for deadline in self._recent_writers.values() if deadline >= now),
+        }
+
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    read_your_writes_seconds=settings.replica_read_your_writes_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+)
+notification_manager.on_event(WRITES_TOPIC, replica_router.adopt_write)
+
+
+@event.listens_for(WriterSession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(WriterSession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(WriterSession, "after_commit")
+def _note_committed_write(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        replica_router.announce_write(session.info["user_id"])
+
+
+@event.listens_for(WriterSession, "after_rollback")
+def _forget_rolled_back_write(session):
+    session.info.pop("wrote", None)
@@ -0,0 +1,81 @@
+"""
+Полнотекстовый индекс пользователей для поиска в админке (только SQLite).
+
+users_fts - внешняя (content='users') FTS5-таблица с триграммным токенайзером:
+ищет подстроки от 3 символов без учета регистра (в т.ч. кириллицы), ранжирует bm25.
+Синхронизируется триггерами, которые срабатывают только на изменение полей поиска.
+"""
+from typing import List
+
+from sqlalchemy import Connection, column, table, text
+
+USERS_FTS_COLUMNS = ("name", "surname", "patronymic", "email")
+
+# веса bm25 в порядке USERS_FTS_COLUMNS: совпадение в фамилии важнее, чем в почте
+USERS_FTS_RANK = "bm25(5.0, 10.0, 2.0, 1.0)"
+
+USERS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, surname, patronymic, email,
+        content='users', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, surname, patronymic, email)
+        VALUES (new.id, new.name, new.surname, new.patronymic, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, surname, patronymic, email)
+        VALUES ('delete', old.id, old.name, old.surname, old.patronymic, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, surname, patronymic, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, surname, patronymic, email)
+        VALUES ('delete', old.id, old.name, old.surname, old.patronymic, old.email);
+        INSERT INTO users_fts(rowid, name, surname, patronymic, email)
+        VALUES (new.id, new.name, new.surname, new.patronymic, new.email);
+    END
+    """,
+]
+
+# минимальная длина слова, которое можно искать по триграммному индексу
+MIN_MATCH_LENGTH = 3
+
+users_fts = table("users_fts", column("rowid"), column("rank"))
+
+
+def create_users_fts(connection: Connection) -> None:
+    """Создать индекс и триггеры, если их нет, и заполнить индекс по уже существующим пользователям."""
+    if connection.dialect.name != "sqlite":
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+    ).first()
+
+    for statement in USERS_FTS_DDL:
+        connection.exec_driver_sql(statement)
+
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql(f"INSERT INTO users_fts(users_fts, rank) VALUES ('rank', '{USERS_FTS_RANK}')")
+
+
+def match_expression(words: List[str]) -> str:
+    """FTS5-запрос: каждое слово - отдельная фраза, все слова обязательны."""
+    return " AND ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def users_fts_match(words: List[str]):
+    """Подзапрос (user_id, rank) по словам длиной от MIN_MATCH_LENGTH."""
+    return (
+        users_fts.select()
+        .with_only_columns(users_fts.c.rowid.label("user_id"), users_fts.c.rank.label("rank"))
+        .where(text("users_fts MATCH :users_query").bindparams(users_query=match_expression(words)))
+        .subquery("users_match")
+    )
@@ -1,9 +1,111 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
 from app.models import SqlAlchemyBase
 
-engine = create_async_engine(settings.database_url, pool_pre_ping=True)
 
-SessionLocalAsync = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+def _sqlite_pragmas(read_only: bool) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        "PRAGMA synchronous = NORMAL",       # в WAL теряется максимум последняя транзакция при сбое ОС, но не целостность
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")  # сохраняется в файле БД
+    return pragmas
+
+
+def configure_sqlite(engine: AsyncEngine, read_only: bool) -> None:
+    """
+    Профиль production для файловой SQLite.
+    WAL: читатели не блокируются писателем и наоборот. Пишущее соединение открывает транзакции
+    как BEGIN IMMEDIATE - блокировка на запись берется сразу и ждет busy_timeout, а не падает
+    с "database is locked" при попытке повысить блокировку чтения посреди транзакции.
+    """
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+        if not read_only:
+            # транзакции открывает SQLAlchemy (on_begin), а не драйвер
+            dbapi_connection.isolation_level = None
+
+    if not read_only:
+        @event.listens_for(engine.sync_engine, "begin")
+        def on_begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+if settings.sqlite_profile == "production" and _is_sqlite_file(settings.database_url):
+    # SQLite пишет одно соединение за раз: запись идет через единственное соединение,
+    # GET-запросы читают через отдельный пул read-only соединений
+    engine = create_async_engine(settings.database_url, pool_pre_ping=True, pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(
+        settings.database_url, pool_pre_ping=True, pool_size=settings.sqlite_read_pool_size, max_overflow=0
+    )
+    configure_sqlite(engine, read_only=False)
+    configure_sqlite(read_engine, read_only=True)
+else:
+    engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+    read_engine = engine
+
+
+
+def _replica_url(url: str) -> str:
+    """Файл-реплика SQLite открывается только на чтение: отсутствующий файл - ошибка, а не новая пустая база."""
+    parsed = make_url(url)
+    if not _is_sqlite_file(url) or parsed.query.get("uri"):
+        return url
+    return parsed.set(
+        database=f"file:{os.path.abspath(parsed.database)}",
+        query={**parsed.query, "mode": "ro", "uri": "true"},
+    ).render_as_string(hide_password=False)
+
+
+def _create_replica_engine(url: str) -> AsyncEngine:
+    replica = create_async_engine(_replica_url(url), pool_pre_ping=True)
+    if _is_sqlite_file(url):
+        configure_sqlite(replica, read_only=True)
+    return replica
+
+
+replica_engines = [_create_replica_engine(url) for url in settings.database_replica_urls]
+
+
+if settings.metrics_enabled:
+    for instrumented in {engine, read_engine, *replica_engines}:
+        instrument_engine(instrumented.sync_engine)
+
+
+class WriterSession(Session):
+    """Сессии основной (пишущей) базы - на их коммиты подписан учет записей для чтения с реплик."""
+
+
+SessionLocalAsync = async_sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, sync_session_class=WriterSession
+)
+
+if read_engine is engine:
+    SessionLocalRead = SessionLocalAsync
+else:
+    SessionLocalRead = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
@@ -5,15 +5,52 @@ from fastapi.staticfiles import StaticFiles
 from app.api.v1.api import include_routers
 import uvicorn
 import os
-from app.db.session import engine
-from app.models import SqlAlchemyBase 
+from app.db.session import engine, read_engine, replica_engines, SessionLocalAsync, SessionLocalRead
+from app.db import migrations
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
 from app.crud.user import users_manager
+from app.crud.rollup import rollups_manager
+from app.crud.balance import balance_manager
+from app.core.notification_writer import notification_writer
+from app.core.websockets_manager import notification_manager
+from app.core.kitchen_board import kitchen_board
+from app.core.report_jobs import report_jobs
+from app.core.subscription_scheduler import subscription_scheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(SqlAlchemyBase.metadata.create_all)
+    try:
+        async with engine.begin() as conn:
+            if settings.auto_migrate:
+                await conn.run_sync(migrations.upgrade)
+            else:
+                await conn.run_sync(migrations.ensure_current)
+    except migrations.MigrationError:
+        # иначе поток соединения aiosqlite не даст процессу завершиться
+        await engine.dispose()
+        raise
+    async with SessionLocalAsync() as session:
+        await rollups_manager.rebuild_if_empty(session)
+        await balance_manager.record_opening_balances(session)
+    await notification_manager.start()
+    # после старта fan-out, чтобы не пропустить дельты заказов, созданных во время загрузки
+    async with SessionLocalRead() as session:
+        await kitchen_board.load(session)
+    kitchen_board.start()
+    notification_writer.start()
+    subscription_scheduler.start()
     yield
+    await subscription_scheduler.stop()
+    await kitchen_board.stop()
+    await report_jobs.stop()
+    await notification_writer.stop()
+    await notification_manager.stop()
+    await kitchen_board.screens.stop()
+    for replica in replica_engines:
+        await replica.dispose()
+    await read_engine.dispose()
+    await engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -24,6 +61,9 @@ os.makedirs("static/dishes", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -6,7 +6,12 @@ from app.models.dish import Dish, Ingredient
 from app.models.order import Order
 from app.models.application import Application
 from app.models.review import Review
+from app.models.notification import Notification
 from app.models.associations import ApplicationItem, user_allergies, OrderItem, MenuItem, DishIngredient
+from app.models.statistic import DailyOrderStat, DailyDishStat
+from app.models.subscription import SubscriptionPlan, SubscriptionPlanItem
+from app.models.balance import BalanceTransaction
+from app.models.catalog import CatalogVersion
 
 __all__ = [
     "SqlAlchemyBase",
@@ -18,9 +23,16 @@ __all__ = [
     "Application",
     "ApplicationItem",
     "Review",
+    "Notification",
     "user_allergies",
     "OrderItem",
     "MenuItem",
     "DishIngredient",
-    "Menu"
+    "Menu",
+    "DailyOrderStat",
+    "DailyDishStat",
+    "SubscriptionPlan",
+    "SubscriptionPlanItem",
+    "BalanceTransaction",
+    "CatalogVersion"
 ]
\ No newline at end of file
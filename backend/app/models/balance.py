@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.enums import BalanceOperation
+from app.models.base import SqlAlchemyBase
+
+
+class BalanceTransaction(SqlAlchemyBase):
+    """
+    Журнал движения средств, только добавление строк.
+    users.balance - кэш текущего остатка, balance_after - остаток сразу после операции.
+    """
+    __tablename__ = "balance_transactions"
+    __table_args__ = (
+        Index("ix_balance_transactions_user_id_id", "user_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), server_default=func.now())
+
+    kind: Mapped[BalanceOperation] = mapped_column(Enum(BalanceOperation), nullable=False)
+    amount: Mapped[int] = mapped_column(Integer(), nullable=False)  # > 0 - зачисление, < 0 - списание
+    balance_after: Mapped[int] = mapped_column(Integer(), nullable=False)
+
+    order_id: Mapped[int | None] = mapped_column(ForeignKey("orders.id", ondelete="SET NULL"))
+    plan_id: Mapped[int | None] = mapped_column(ForeignKey("subscription_plans.id", ondelete="SET NULL"))
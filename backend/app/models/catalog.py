@@ -0,0 +1,12 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import SqlAlchemyBase
+
+
+class CatalogVersion(SqlAlchemyBase):
+    """Единственная строка с текущей версией каталога (ETag ответов блюд и меню), см. app.core.catalog_cache."""
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer(), primary_key=True)
+    version: Mapped[str] = mapped_column(String(), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List
-from sqlalchemy import  DateTime, Enum, ForeignKey, func
+from sqlalchemy import  DateTime, Enum, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.enums import OrderStatus
@@ -9,6 +9,10 @@ from app.models.base import SqlAlchemyBase
 
 class Notification(SqlAlchemyBase):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # счетчик непрочитанных и лента пользователя (user_id = ? AND read = ? ORDER BY created_at)
+        Index("ix_notifications_user_id_read_created_at", "user_id", "read", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), server_default=func.now())
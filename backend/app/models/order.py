@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List
-from sqlalchemy import  DateTime, Enum, ForeignKey, func
+from sqlalchemy import  DateTime, Enum, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.enums import OrderStatus
@@ -9,6 +9,12 @@ from app.models.base import SqlAlchemyBase
 
 class Order(SqlAlchemyBase):
     __tablename__ = "orders"
+    __table_args__ = (
+        # невыданные заказы (status = PAID) по датам - для плана закупки
+        Index("ix_orders_status_ordered_at", "status", "ordered_at"),
+        # история заказов пользователя, новые сверху
+        Index("ix_orders_user_id_ordered_at", "user_id", "ordered_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -4,7 +4,7 @@ from sqlalchemy import Enum as SAEnum, String, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import SqlAlchemyBase
-from app.core.enums import Reports
+from app.core.enums import Reports, ReportStatus
 
 class Report(SqlAlchemyBase):
     __tablename__ = "reports"
@@ -16,4 +16,7 @@ class Report(SqlAlchemyBase):
     download_url: Mapped[str] = mapped_column(String, nullable=False)
     
     date_from: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    date_to: Mapped[datetime] = mapped_column(DateTime, nullable=True)
\ No newline at end of file
+    date_to: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    status: Mapped[ReportStatus] = mapped_column(SAEnum(ReportStatus, native_enum=False), default=ReportStatus.READY, server_default=ReportStatus.READY.name, nullable=False)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
\ No newline at end of file
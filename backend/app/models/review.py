@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import SqlAlchemyBase
@@ -7,6 +7,10 @@ from app.models.base import SqlAlchemyBase
 
 class Review(SqlAlchemyBase):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # отзывы о блюде, новые сверху
+        Index("ix_reviews_dish_id_datetime", "dish_id", "datetime"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -0,0 +1,30 @@
+from datetime import date
+from sqlalchemy import Date, Enum, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.enums import OrderStatus
+from app.models.base import SqlAlchemyBase
+
+
+class DailyOrderStat(SqlAlchemyBase):
+    """Сводка заказов за день по статусам. Поддерживается инкрементально в app.crud.rollup."""
+    __tablename__ = "daily_order_stats"
+
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), primary_key=True)
+
+    orders_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    revenue: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+
+
+class DailyDishStat(SqlAlchemyBase):
+    """Сводка по блюду за день: порции в неотмененных заказах и отзывы."""
+    __tablename__ = "daily_dish_stats"
+
+    day: Mapped[date] = mapped_column(Date(), primary_key=True)
+    dish_id: Mapped[int] = mapped_column(ForeignKey("dishes.id", ondelete="CASCADE"), primary_key=True)
+
+    quantity: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    reviews_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    ratings_count: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+    rating_sum: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
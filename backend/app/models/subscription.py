@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+from typing import List
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base import SqlAlchemyBase
+
+
+class SubscriptionPlan(SqlAlchemyBase):
+    """
+    Абонемент: шаблон заказа, расписание и предоплата.
+    Заказы на каждый день создаются не при покупке, а по мере наступления дня (см. app.crud.subscription).
+    """
+    __tablename__ = "subscription_plans"
+    __table_args__ = (
+        Index("ix_subscription_plans_due", "cancelled_at", "materialized_through"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now(), server_default=func.now())
+
+    # расписание: meals_total будних дней начиная с first_day
+    first_day: Mapped[date] = mapped_column(Date(), nullable=False)
+    last_day: Mapped[date] = mapped_column(Date(), nullable=False)
+    meals_total: Mapped[int] = mapped_column(Integer(), nullable=False)
+
+    # стоимость одного дня на момент покупки - из нее считается возврат
+    day_cost: Mapped[int] = mapped_column(Integer(), nullable=False)
+
+    # все дни расписания до этой даты включительно уже превращены в заказы
+    materialized_through: Mapped[date] = mapped_column(Date(), nullable=False)
+    cancelled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    refunded: Mapped[int] = mapped_column(Integer(), default=0, nullable=False)
+
+    items: Mapped[List["SubscriptionPlanItem"]] = relationship(back_populates="plan", cascade="all, delete-orphan")
+
+    @staticmethod
+    def schedule_days(first_day: date, meals_total: int) -> List[date]:
+        """meals_total будних дней начиная с first_day (суббота и воскресенье пропускаются)."""
+        days = []
+        day = first_day
+        while len(days) < meals_total:
+            if day.weekday() < 5:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def days(self) -> List[date]:
+        return self.schedule_days(self.first_day, self.meals_total)
+
+    def pending_days(self) -> List[date]:
+        """Дни расписания, заказы на которые еще не созданы."""
+        return [day for day in self.days() if day > self.materialized_through]
+
+
+class SubscriptionPlanItem(SqlAlchemyBase):
+    __tablename__ = "subscription_plan_items"
+
+    plan_id: Mapped[int] = mapped_column(ForeignKey("subscription_plans.id", ondelete="CASCADE"), primary_key=True)
+    dish_id: Mapped[int] = mapped_column(ForeignKey("dishes.id"), primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer(), default=1, nullable=False)
+
+    plan: Mapped["SubscriptionPlan"] = relationship(back_populates="items")
@@ -14,7 +14,7 @@ class User(SqlAlchemyBase):
     name: Mapped[str] = mapped_column(String(), nullable=False)
     surname: Mapped[str] = mapped_column(String(), nullable=False)
     patronymic: Mapped[str | None] = mapped_column(String())
-    email: Mapped[str] = mapped_column(String(), nullable=False)
+    email: Mapped[str] = mapped_column(String(), nullable=False, unique=True, index=True)
     password: Mapped[str] = mapped_column(String(), nullable=False)
     registered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now, nullable=False)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.STUDENT, nullable=False)
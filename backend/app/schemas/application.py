@@ -1,5 +1,5 @@
 from typing import List
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.core.enums import OrderStatus
@@ -46,4 +46,20 @@ class CreateApplicationRequest(BaseModel):
 
 
 class ApplicationRejectRequest(BaseModel):
-    reason: str | None = None
\ No newline at end of file
+    reason: str | None = None
+
+
+class IngredientDemandResponse(BaseModel):
+    ingredient: IngredientResponse
+    amount_thousandth_measure: int = Field(description="Потребность за период в тысячных долях единицы (г/мл)")
+    per_day_thousandth_measure: List[int] = Field(description="Потребность по дням периода, начиная с date_from")
+    quantity: int = Field(description="К закупке в целых единицах (кг/л), с округлением вверх")
+    cost: int
+
+
+class ProcurementPlanResponse(BaseModel):
+    date_from: date
+    date_to: date
+    portions: int = Field(description="Сколько порций блюд учтено в плане")
+    total_cost: int
+    ingredients: List[IngredientDemandResponse]
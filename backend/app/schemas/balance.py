@@ -0,0 +1,17 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+from app.core.enums import BalanceOperation
+
+
+class BalanceTransactionResponse(BaseModel):
+    id: int
+    created_at: datetime
+    kind: BalanceOperation
+    amount: int
+    balance_after: int
+    order_id: Optional[int] = None
+    plan_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
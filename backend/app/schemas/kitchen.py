@@ -0,0 +1,16 @@
+from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel, Field
+
+
+class KitchenDish(BaseModel):
+    dish_id: int
+    name: Optional[str] = None
+    paid: int = Field(description="Порций в оплаченных заказах, ждут приготовления")
+    ready: int = Field(description="Порций в готовых заказах, ждут выдачи")
+
+
+class KitchenBoardResponse(BaseModel):
+    day: date
+    version: int = Field(description="Номер изменения доски в этом воркере; дельты по /ws/kitchen идут со следующими номерами")
+    dishes: List[KitchenDish]
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import  datetime
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -42,4 +42,20 @@ class OrderDishLink(BaseModel):
 
 class CreateOrderRequest(BaseModel):
     dishes: List[OrderDishLink]
-    user_id: Optional[int] = None
\ No newline at end of file
+    user_id: Optional[int] = None
+    allow_allergens: bool = Field(False, description="Заказать, даже если в блюдах есть ингредиенты из списка аллергий")
+
+
+class OrderIdsRequest(BaseModel):
+    order_ids: List[int] = Field(min_length=1, max_length=500, description="ID заказов (повторы игнорируются)")
+
+
+class OrderTransitionResult(BaseModel):
+    order_id: int
+    outcome: Literal["updated", "not_found", "forbidden", "conflict"]
+    status: Optional[OrderStatus] = Field(None, description="Статус после операции; для conflict - текущий статус заказа")
+
+
+class OrderTransitionBatchResponse(BaseModel):
+    updated: int
+    results: List[OrderTransitionResult]
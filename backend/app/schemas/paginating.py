@@ -6,12 +6,14 @@ T = TypeVar("T")
 class PaginationParams(BaseModel):
     page: Optional[int] = Field(1, ge=1, description="Номер страницы")
     limit: Optional[int] = Field(10, ge=1, le=100, description="Количество элементов на странице")
+    cursor: Optional[str] = Field(None, description="Постраничная выборка по курсору: пустое значение - первая страница, далее next_cursor из ответа. Поля total и pages в этом режиме не считаются")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
@@ -2,7 +2,7 @@ from typing import List, Optional
 from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict
 
-from app.core.enums import Reports
+from app.core.enums import Reports, ReportStatus
 
 class GenerateReportRequest(BaseModel):
     report_type: Reports
@@ -15,6 +15,8 @@ class ReportResponse(BaseModel):
     report_type: str
     generated_at: datetime
     download_url: str
+    status: ReportStatus = ReportStatus.READY
+    error: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -45,4 +45,39 @@ class DishStatistic(BaseModel):
 class DishStatisticsResponse(BaseModel):
     dishes: List[DishStatistic]
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class CacheStatisticsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    maxsize: int
+    ttl_seconds: float
+
+
+class CatalogCacheStatisticsResponse(CacheStatisticsResponse):
+    version: str
+    not_modified: int
+
+
+class WebsocketStatisticsResponse(BaseModel):
+    connections: int
+    users: int
+    queued_messages: int
+    max_queue_depth: int
+    queue_limit: int
+    slow_consumer_policy: str
+    messages_sent: int
+    messages_dropped: int
+    slow_disconnects: int
+    send_errors: int
+
+
+class ReplicaStatisticsResponse(BaseModel):
+    replicas: int
+    available: int
+    replica_reads: int
+    primary_reads: int
+    fallbacks: int
+    recent_writers: int
@@ -14,13 +14,16 @@ class SubscriptionResponse(BaseModel):
     subscription_days: int
     days_remaining: int
     is_active: bool
+    meals_total: int = 0
+    meals_remaining: int = Field(default=0, description="Оплаченные дни, заказы на которые еще не созданы")
+    prepaid_amount: int = Field(default=0, description="Сумма, которая вернется при отмене абонемента")
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class PurchaseSubscriptionResponse(BaseModel):
     subscription: SubscriptionResponse
-    created_orders: int
+    created_orders: int = Field(description="Число оплаченных дней; заказы на них создаются по мере наступления дня")
     total_cost: int
 
 
@@ -0,0 +1,53 @@
+"""
+Миграции схемы БД (запускается при деплое, до старта приложения).
+
+    python -m app.scripts.migrate              применить непримененные миграции
+    python -m app.scripts.migrate --status     показать примененные и ожидающие
+    python -m app.scripts.migrate --explain    проверить планы частых запросов (EXPLAIN QUERY PLAN)
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.db.session import engine
+from app.db import migrations
+from app.db.query_plans import check_query_plans
+
+
+async def main(args) -> int:
+    try:
+        async with engine.begin() as conn:
+            if args.status:
+                applied = await conn.run_sync(migrations.applied_versions)
+                for migration in migrations.discover():
+                    mark = "applied" if migration.version in applied else "pending"
+                    print(f"{migration.version:04d}_{migration.name}: {mark}")
+                code = 0
+            elif args.explain:
+                code = 0
+                checks = await conn.run_sync(check_query_plans)
+                if not checks:
+                    print(f"Query plan checks skipped: not supported for {conn.dialect.name}")
+                for check in checks:
+                    print(f"[{'ok' if check.ok else 'FAIL'}] {check.shape.query} -> {check.shape.index}")
+                    for step in check.plan:
+                        print(f"       {step}")
+                    if not check.ok:
+                        code = 1
+            else:
+                applied = await conn.run_sync(migrations.upgrade)
+                print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+                code = 0
+    finally:
+        await engine.dispose()
+    return code
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true")
+    group.add_argument("--explain", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,24 @@
+"""
+Пересчет дневных сводок статистики по заказам и отзывам.
+
+    python -m app.scripts.rebuild_statistics
+"""
+import asyncio
+
+from app.db.session import engine, SessionLocalAsync
+from app.db import migrations
+from app.crud.rollup import rollups_manager
+
+
+async def main():
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(migrations.ensure_current)
+        async with SessionLocalAsync() as session:
+            await rollups_manager.rebuild(session)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,558 @@
+"""
+Синтетическая школа для нагрузочных тестов и бенчмарков (база должна быть пустой и мигрированной).
+
+    python -m app.scripts.migrate
+    python -m app.scripts.seed [--students 2000] [--cooks 6] [--admins 2] [--days 365] [--seed 42] [--end 2026-05-29]
+
+Генерируются пользователи (ученики, повара, администраторы; пароль --password), ингредиенты,
+блюда с составом (DishIngredient), меню завтраков и обедов по дням недели, аллергии и история
+за --days дней до --end: заказы по будним учебным дням (завтраки на переменах 8-9 часов, обеды
+вокруг трех обеденных перемен), абонементы и их заказы, журнал баланса (пополнения, оплаты, возвраты),
+уведомления о готовности заказов, отзывы и еженедельные заявки на закупку. В конце пересчитываются
+сводки статистики.
+
+Все случайные величины берутся из random.Random(--seed), даты отсчитываются от --end (по умолчанию
+сегодня): с одинаковыми --seed и --end получается одна и та же база (кроме соли хэша пароля).
+Строки пишутся пачками по --chunk через executemany. ~14 тысяч учеников дают около 10 млн позиций
+заказов за год.
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Connection, Table, bindparam, func, insert, select, update
+
+from app.core.enums import BalanceOperation, Measures, OrderStatus, UserRole
+from app.core.security.password import hash_password
+from app.crud.rollup import rollups_manager
+from app.db import migrations
+from app.db.session import engine, SessionLocalAsync
+from app.models.application import Application
+from app.models.associations import ApplicationItem, DishIngredient, MenuItem, OrderItem, user_allergies
+from app.models.balance import BalanceTransaction
+from app.models.dish import Dish, Ingredient
+from app.models.menu import Menu
+from app.models.notification import Notification
+from app.models.order import Order
+from app.models.review import Review
+from app.models.subscription import SubscriptionPlan, SubscriptionPlanItem
+from app.models.user import User
+
+
+# название, единица, цена за кг/л, аллерген
+INGREDIENTS = [
+    ("Мука пшеничная", Measures.WEIGHT, 60, False),
+    ("Рис", Measures.WEIGHT, 110, False),
+    ("Гречка", Measures.WEIGHT, 120, False),
+    ("Макароны", Measures.WEIGHT, 90, False),
+    ("Овсяные хлопья", Measures.WEIGHT, 80, False),
+    ("Манная крупа", Measures.WEIGHT, 70, False),
+    ("Пшено", Measures.WEIGHT, 65, False),
+    ("Хлеб", Measures.WEIGHT, 70, False),
+    ("Молоко", Measures.VOLUME, 85, True),
+    ("Кефир", Measures.VOLUME, 95, True),
+    ("Масло сливочное", Measures.WEIGHT, 850, True),
+    ("Сметана", Measures.WEIGHT, 260, True),
+    ("Творог", Measures.WEIGHT, 380, True),
+    ("Сыр", Measures.WEIGHT, 750, True),
+    ("Яйца", Measures.WEIGHT, 170, True),
+    ("Говядина", Measures.WEIGHT, 650, False),
+    ("Свинина", Measures.WEIGHT, 420, False),
+    ("Куриное филе", Measures.WEIGHT, 380, False),
+    ("Фарш говяжий", Measures.WEIGHT, 520, False),
+    ("Минтай", Measures.WEIGHT, 300, True),
+    ("Печень говяжья", Measures.WEIGHT, 330, False),
+    ("Картофель", Measures.WEIGHT, 35, False),
+    ("Морковь", Measures.WEIGHT, 40, False),
+    ("Лук репчатый", Measures.WEIGHT, 35, False),
+    ("Капуста белокочанная", Measures.WEIGHT, 30, False),
+    ("Свекла", Measures.WEIGHT, 40, False),
+    ("Огурцы", Measures.WEIGHT, 160, False),
+    ("Помидоры", Measures.WEIGHT, 220, False),
+    ("Перец болгарский", Measures.WEIGHT, 280, False),
+    ("Горох", Measures.WEIGHT, 70, False),
+    ("Зелень", Measures.WEIGHT, 600, False),
+    ("Яблоки", Measures.WEIGHT, 120, False),
+    ("Бананы", Measures.WEIGHT, 140, False),
+    ("Изюм", Measures.WEIGHT, 380, False),
+    ("Сухофрукты", Measures.WEIGHT, 300, False),
+    ("Лимон", Measures.WEIGHT, 200, False),
+    ("Ягоды замороженные", Measures.WEIGHT, 450, False),
+    ("Орехи грецкие", Measures.WEIGHT, 900, True),
+    ("Мед", Measures.WEIGHT, 700, True),
+    ("Сахар", Measures.WEIGHT, 80, False),
+    ("Соль", Measures.WEIGHT, 20, False),
+    ("Масло подсолнечное", Measures.VOLUME, 150, False),
+    ("Томатная паста", Measures.WEIGHT, 250, False),
+    ("Чай черный", Measures.WEIGHT, 900, False),
+    ("Какао", Measures.WEIGHT, 800, False),
+    ("Дрожжи", Measures.WEIGHT, 400, False),
+]
+
+# общая основа блюд категории: (ингредиент, граммы на порцию)
+CATEGORY_BASE = {
+    "porridge": [("Молоко", 150), ("Сахар", 8), ("Масло сливочное", 5), ("Соль", 1)],
+    "breakfast": [("Соль", 1)],
+    "bakery": [("Мука пшеничная", 60), ("Сахар", 10), ("Яйца", 10)],
+    "soup": [("Картофель", 80), ("Морковь", 15), ("Лук репчатый", 15), ("Соль", 2)],
+    "main": [("Лук репчатый", 10), ("Масло подсолнечное", 8), ("Соль", 2)],
+    "garnish": [("Соль", 1), ("Масло сливочное", 5)],
+    "salad": [("Масло подсолнечное", 10), ("Соль", 1)],
+    "drink": [],
+    "dessert": [("Сахар", 15)],
+}
+
+# блюда категории: название и свой состав поверх основы
+DISHES = {
+    "porridge": [
+        ("Каша овсяная", [("Овсяные хлопья", 40)]),
+        ("Каша манная", [("Манная крупа", 35)]),
+        ("Каша рисовая молочная", [("Рис", 40)]),
+        ("Каша пшенная с тыквой", [("Пшено", 40), ("Морковь", 20)]),
+        ("Каша гречневая молочная", [("Гречка", 45)]),
+    ],
+    "breakfast": [
+        ("Омлет натуральный", [("Яйца", 110), ("Молоко", 40), ("Масло сливочное", 5)]),
+        ("Сырники со сметаной", [("Творог", 120), ("Яйца", 20), ("Мука пшеничная", 20), ("Сметана", 30), ("Сахар", 10)]),
+        ("Запеканка творожная", [("Творог", 130), ("Манная крупа", 15), ("Яйца", 20), ("Изюм", 10), ("Сахар", 12)]),
+        ("Бутерброд с сыром", [("Хлеб", 40), ("Сыр", 20), ("Масло сливочное", 10)]),
+    ],
+    "bakery": [
+        ("Булочка с изюмом", [("Изюм", 15), ("Дрожжи", 3), ("Молоко", 30)]),
+        ("Пирожок с капустой", [("Капуста белокочанная", 50), ("Дрожжи", 3)]),
+        ("Пирожок с яблоком", [("Яблоки", 50), ("Дрожжи", 3)]),
+        ("Блины со сметаной", [("Молоко", 80), ("Сметана", 20)]),
+    ],
+    "soup": [
+        ("Борщ", [("Свекла", 40), ("Капуста белокочанная", 40), ("Говядина", 30), ("Томатная паста", 10), ("Сметана", 10)]),
+        ("Щи из свежей капусты", [("Капуста белокочанная", 60), ("Говядина", 25), ("Сметана", 10)]),
+        ("Суп гороховый", [("Горох", 40), ("Свинина", 25)]),
+        ("Суп куриный с лапшой", [("Куриное филе", 35), ("Макароны", 20), ("Зелень", 3)]),
+        ("Рассольник", [("Огурцы", 30), ("Рис", 10), ("Говядина", 25), ("Сметана", 10)]),
+        ("Уха", [("Минтай", 50), ("Зелень", 3)]),
+        ("Суп овощной", [("Капуста белокочанная", 30), ("Перец болгарский", 15), ("Зелень", 3)]),
+    ],
+    "main": [
+        ("Котлета говяжья", [("Фарш говяжий", 75), ("Хлеб", 15), ("Яйца", 5)]),
+        ("Тефтели в томатном соусе", [("Фарш говяжий", 70), ("Рис", 10), ("Томатная паста", 10)]),
+        ("Курица запеченная", [("Куриное филе", 100), ("Сметана", 10)]),
+        ("Гуляш", [("Говядина", 80), ("Томатная паста", 10), ("Мука пшеничная", 5)]),
+        ("Рыба запеченная", [("Минтай", 100), ("Морковь", 20)]),
+        ("Печень по-строгановски", [("Печень говяжья", 80), ("Сметана", 20)]),
+        ("Плов с курицей", [("Куриное филе", 70), ("Рис", 60), ("Морковь", 30)]),
+        ("Тефтели куриные", [("Куриное филе", 80), ("Рис", 10), ("Яйца", 5)]),
+    ],
+    "garnish": [
+        ("Пюре картофельное", [("Картофель", 180), ("Молоко", 30)]),
+        ("Гречка отварная", [("Гречка", 60)]),
+        ("Рис отварной", [("Рис", 55)]),
+        ("Макароны отварные", [("Макароны", 55)]),
+        ("Капуста тушеная", [("Капуста белокочанная", 150), ("Морковь", 20), ("Томатная паста", 5)]),
+    ],
+    "salad": [
+        ("Винегрет", [("Свекла", 40), ("Картофель", 30), ("Морковь", 20), ("Огурцы", 15)]),
+        ("Салат из свежей капусты", [("Капуста белокочанная", 70), ("Морковь", 15)]),
+        ("Салат из огурцов и помидоров", [("Огурцы", 45), ("Помидоры", 45)]),
+        ("Салат свекольный", [("Свекла", 80), ("Изюм", 5)]),
+    ],
+    "drink": [
+        ("Чай с сахаром", [("Чай черный", 2), ("Сахар", 10)]),
+        ("Чай с лимоном", [("Чай черный", 2), ("Сахар", 10), ("Лимон", 8)]),
+        ("Какао с молоком", [("Какао", 5), ("Молоко", 150), ("Сахар", 10)]),
+        ("Компот из сухофруктов", [("Сухофрукты", 20), ("Сахар", 10)]),
+        ("Кисель ягодный", [("Ягоды замороженные", 25), ("Сахар", 12)]),
+        ("Кефир", [("Кефир", 200)]),
+    ],
+    "dessert": [
+        ("Яблоко", [("Яблоки", 150)]),
+        ("Банан", [("Бананы", 150)]),
+        ("Творог с медом", [("Творог", 100), ("Мед", 15)]),
+        ("Кекс с орехами", [("Мука пшеничная", 35), ("Орехи грецкие", 10), ("Яйца", 15), ("Масло сливочное", 15)]),
+    ],
+}
+
+BREAKFAST_CATEGORIES = ("porridge", "breakfast", "bakery", "drink", "dessert")
+LUNCH_CATEGORIES = ("soup", "main", "garnish", "salad", "drink", "dessert", "bakery")
+# из чего ученик собирает обед: категория и вероятность взять блюдо из нее
+LUNCH_PICKS = (("soup", 0.6), ("main", 0.9), ("garnish", 0.8), ("salad", 0.35), ("drink", 0.75), ("dessert", 0.2), ("bakery", 0.15))
+BREAKFAST_PICKS = (("porridge", 0.55), ("breakfast", 0.45), ("bakery", 0.35), ("drink", 0.8), ("dessert", 0.15))
+
+WEEKDAYS = ("понедельник", "вторник", "среда", "четверг", "пятница")
+WEEKDAY_FACTOR = (1.0, 1.0, 0.98, 0.96, 0.85)
+BREAKFAST_BREAKS = (dtime(8, 40), dtime(9, 30))
+LUNCH_BREAKS = (dtime(11, 40), dtime(12, 35), dtime(13, 30))
+
+NAMES = ("Александр", "Мария", "Иван", "Анна", "Дмитрий", "Софья", "Максим", "Виктория", "Артем", "Полина",
+         "Михаил", "Елизавета", "Кирилл", "Дарья", "Егор", "Алиса", "Никита", "Ксения", "Матвей", "Варвара")
+SURNAMES = ("Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов", "Новиков",
+            "Федоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семенов", "Егоров", "Павлов", "Козлов")
+REVIEWS = {
+    1: ("Невкусно", "Холодное и пересоленное", "Есть невозможно"),
+    2: ("Так себе", "Порция маленькая", "Было вкуснее раньше"),
+    3: ("Нормально", "Съедобно", "Обычно"),
+    4: ("Вкусно", "Хорошо, но можно горячее", "Понравилось"),
+    5: ("Очень вкусно!", "Лучшее в меню", "Беру каждый раз"),
+}
+REJECTION_REASONS = ("Превышен бюджет недели", "Есть остатки на складе", "Неверное количество", "Поставщик недоступен")
+
+
+def school_day(day: date) -> bool:
+    """Будний день вне летних и новогодних каникул."""
+    if day.weekday() >= 5:
+        return False
+    if day.month in (6, 7, 8):
+        return False
+    if (day.month == 12 and day.day >= 30) or (day.month == 1 and day.day <= 8):
+        return False
+    return True
+
+
+class BulkWriter:
+    """Копит строки по таблицам и пишет их пачками через executemany в порядке зависимостей."""
+
+    def __init__(self, connection: Connection, tables: List[Table], chunk: int):
+        self.connection = connection
+        self.rows: Dict[Table, list] = {table: [] for table in tables}
+        self.counts: Dict[str, int] = {table.name: 0 for table in tables}
+        self.chunk = chunk
+
+    def add(self, table: Table, row: dict) -> None:
+        rows = self.rows[table]
+        rows.append(row)
+        if len(rows) >= self.chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        for table, rows in self.rows.items():
+            if rows:
+                self.connection.execute(insert(table), rows)
+                self.counts[table.name] += len(rows)
+                rows.clear()
+        self.connection.commit()
+
+
+class Student:
+    __slots__ = ("id", "breakfast", "lunch", "lunch_break", "subscriber", "balance", "plan", "reviewer")
+
+    def __init__(self, user_id: int, rng: random.Random, subscription_share: float):
+        self.id = user_id
+        self.breakfast = rng.betavariate(2, 5)           # доля дней с завтраком
+        self.lunch = rng.betavariate(6, 2)               # доля дней с обедом
+        self.lunch_break = rng.randrange(len(LUNCH_BREAKS))
+        self.subscriber = rng.random() < subscription_share
+        self.balance = 0
+        self.plan: Optional[Tuple[int, set, List[Tuple[int, int]], int, dtime]] = None  # id, дни, позиции, цена дня, время
+        self.reviewer = rng.random() < 0.3
+
+
+class SchoolGenerator:
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.end = args.end
+        self.start = self.end - timedelta(days=args.days - 1)
+        self.dishes: Dict[str, List[Tuple[int, int, float]]] = {}   # категория -> (id, цена, популярность)
+        self.dish_price: Dict[int, int] = {}
+        self.dish_quality: Dict[int, float] = {}
+        self.menus: Dict[Tuple[int, str], Dict[str, List[Tuple[int, float]]]] = {}  # (день недели, прием) -> категория -> блюда
+        self.order_id = 0
+        self.plan_id = 0
+
+    def run(self, connection: Connection) -> Dict[str, int]:
+        if connection.execute(select(func.count()).select_from(User)).scalar():
+            raise RuntimeError("Database is not empty: seed a freshly migrated database")
+
+        writer = BulkWriter(connection, [
+            User.__table__, Ingredient.__table__, Dish.__table__, DishIngredient.__table__, Menu.__table__,
+            MenuItem.__table__, user_allergies, SubscriptionPlan.__table__, SubscriptionPlanItem.__table__,
+            Order.__table__, OrderItem.__table__, BalanceTransaction.__table__, Notification.__table__,
+            Review.__table__, Application.__table__, ApplicationItem.__table__,
+        ], self.args.chunk)
+
+        ingredient_ids = self.catalog(writer)
+        students, cooks = self.users(writer, ingredient_ids)
+        self.history(writer, students)
+        self.applications(writer, cooks, ingredient_ids)
+        writer.flush()
+
+        # users.balance - кэш остатка по журналу, известен только после всей истории
+        balances = [{"user_id": student.id, "balance": student.balance} for student in students if student.balance]
+        if balances:
+            table = User.__table__
+            connection.execute(
+                update(table).where(table.c.id == bindparam("user_id")).values(balance=bindparam("balance")),
+                balances
+            )
+        connection.commit()
+        return writer.counts
+
+    def catalog(self, writer: BulkWriter) -> Dict[str, Tuple[int, int]]:
+        ingredient_ids = {}
+        for index, (name, measure, price, _) in enumerate(INGREDIENTS, start=1):
+            ingredient_ids[name] = (index, price)
+            writer.add(Ingredient.__table__, {"id": index, "name": name, "price": price, "measure": measure})
+
+        # --dishes больше шаблонов: повторяем шаблоны как варианты блюд ("Борщ №2")
+        templates = [(category, name, parts) for category, dishes in DISHES.items() for name, parts in dishes]
+        dish_id = 0
+        for repeat in range(math.ceil(self.args.dishes / len(templates))):
+            for category, name, parts in templates:
+                if dish_id >= self.args.dishes:
+                    break
+                dish_id += 1
+                amounts: Dict[str, int] = {}
+                for ingredient, grams in CATEGORY_BASE[category] + parts:
+                    amounts[ingredient] = amounts.get(ingredient, 0) + max(1, round(grams * self.rng.uniform(0.8, 1.2)))
+                cost = sum(ingredient_ids[ingredient][1] * grams / 1000 for ingredient, grams in amounts.items())
+                price = max(15, math.ceil(cost * self.rng.uniform(1.6, 2.2) / 5) * 5)
+
+                writer.add(Dish.__table__, {"id": dish_id, "name": name if repeat == 0 else f"{name} №{repeat + 1}", "price": price, "image_url": None})
+                for ingredient, grams in amounts.items():
+                    writer.add(DishIngredient.__table__, {"dish_id": dish_id, "ingredient_id": ingredient_ids[ingredient][0], "amount_thousandth_measure": grams})
+                self.dishes.setdefault(category, []).append((dish_id, price, self.rng.lognormvariate(0, 0.6)))
+                self.dish_price[dish_id] = price
+                self.dish_quality[dish_id] = self.rng.uniform(2.8, 4.8)
+
+        # меню на каждый будний день: завтрак и обед, в каждой категории часть блюд
+        menu_id = 0
+        for weekday, weekday_name in enumerate(WEEKDAYS):
+            for meal, categories in (("Завтрак", BREAKFAST_CATEGORIES), ("Обед", LUNCH_CATEGORIES)):
+                menu_id += 1
+                writer.add(Menu.__table__, {"id": menu_id, "name": f"{meal}, {weekday_name}"})
+                by_category = {}
+                for category in categories:
+                    available = self.dishes.get(category, [])
+                    if not available:
+                        continue
+                    chosen = self.rng.sample(available, min(len(available), self.rng.randint(2, 4)))
+                    by_category[category] = [(dish_id, popularity) for dish_id, _, popularity in chosen]
+                    for dish_id, _, _ in chosen:
+                        writer.add(MenuItem.__table__, {"menu_id": menu_id, "dish_id": dish_id})
+                self.menus[(weekday, meal)] = by_category
+        return ingredient_ids
+
+    def users(self, writer: BulkWriter, ingredient_ids: Dict[str, Tuple[int, int]]) -> Tuple[List[Student], List[int]]:
+        password = hash_password(self.args.password)
+        allergens = [ingredient_ids[name][0] for name, _, _, allergen in INGREDIENTS if allergen]
+        user_id = 0
+
+        def add_user(email: str, role: UserRole) -> int:
+            nonlocal user_id
+            user_id += 1
+            writer.add(User.__table__, {
+                "id": user_id,
+                "name": self.rng.choice(NAMES),
+                "surname": self.rng.choice(SURNAMES),
+                "patronymic": None,
+                "email": email,
+                "password": password,
+                "registered_at": datetime.combine(self.start - timedelta(days=self.rng.randint(1, 60)), dtime(self.rng.randint(8, 20), self.rng.randint(0, 59))),
+                "role": role,
+                "banned": False,
+                "balance": 0,
+                "subscription_start": None,
+                "subscription_days": 0,
+            })
+            return user_id
+
+        for i in range(1, self.args.admins + 1):
+            add_user(f"admin{i}@school.ru", UserRole.ADMIN)
+        cooks = [add_user(f"cook{i}@school.ru", UserRole.COOK) for i in range(1, self.args.cooks + 1)]
+        students = []
+        for i in range(1, self.args.students + 1):
+            student = Student(add_user(f"student{i}@school.ru", UserRole.STUDENT), self.rng, self.args.subscription_share)
+            students.append(student)
+            if self.rng.random() < 0.08:
+                for ingredient_id in self.rng.sample(allergens, self.rng.randint(1, 2)):
+                    writer.add(user_allergies, {"user_id": student.id, "ingredient_id": ingredient_id})
+        return students, cooks
+
+    def history(self, writer: BulkWriter, students: List[Student]) -> None:
+        days = [self.start + timedelta(days=offset) for offset in range(self.args.days)]
+        school_days = [day for day in days if school_day(day)]
+        next_school_days = {day: school_days[index + 1:] for index, day in enumerate(school_days)}
+        end_of_history = datetime.combine(self.end, dtime(23, 59))
+
+        for day in school_days:
+            factor = WEEKDAY_FACTOR[day.weekday()]
+            breakfast_menu = self.menus[(day.weekday(), "Завтрак")]
+            lunch_menu = self.menus[(day.weekday(), "Обед")]
+            for student in students:
+                if student.plan is not None and day > max(student.plan[1]):
+                    student.plan = None
+
+                if self.rng.random() < student.breakfast * factor:
+                    start = BREAKFAST_BREAKS[self.rng.randrange(len(BREAKFAST_BREAKS))]
+                    at = datetime.combine(day, start) + timedelta(minutes=self.rng.uniform(-20, 15))
+                    self.order(writer, student, at, self.pick(breakfast_menu, BREAKFAST_PICKS), paid=True, end_of_history=end_of_history)
+
+                if student.plan is not None and day in student.plan[1]:
+                    plan_id, _, items, _, bought_at = student.plan
+                    self.order(writer, student, datetime.combine(day, bought_at), items, paid=False, end_of_history=end_of_history)
+                elif self.rng.random() < student.lunch * factor:
+                    start = LUNCH_BREAKS[student.lunch_break]
+                    at = datetime.combine(day, start) + timedelta(minutes=self.rng.gauss(4, 6))
+                    self.order(writer, student, at, self.pick(lunch_menu, LUNCH_PICKS), paid=True, end_of_history=end_of_history)
+
+                # абонемент покупают вечером на следующие учебные дни (без каникул внутри)
+                if student.subscriber and student.plan is None and day < self.end and self.rng.random() < 0.15:
+                    meals = self.rng.choice((5, 10, 20))
+                    upcoming = next_school_days[day][:meals]
+                    first_day = day + timedelta(days=1)
+                    if len(upcoming) == meals and upcoming == SubscriptionPlan.schedule_days(first_day, meals):
+                        self.subscription(writer, student, day, upcoming, self.pick(lunch_menu, LUNCH_PICKS))
+
+    def pick(self, menu: Dict[str, List[Tuple[int, float]]], picks) -> List[Tuple[int, int]]:
+        items = []
+        for category, probability in picks:
+            dishes = menu.get(category)
+            if dishes and self.rng.random() < probability:
+                dish_id = self.rng.choices(dishes, weights=[popularity for _, popularity in dishes])[0][0]
+                items.append((dish_id, 2 if category == "bakery" and self.rng.random() < 0.2 else 1))
+        if not items:
+            dishes = next(iter(menu.values()))
+            items.append((dishes[0][0], 1))
+        return items
+
+    def pay(self, writer: BulkWriter, student: Student, at: datetime, amount: int, kind: BalanceOperation, order_id=None, plan_id=None) -> None:
+        if student.balance < amount:
+            top_up = math.ceil((amount - student.balance) / 500) * 500 + self.rng.choice((0, 500, 1000, 1500))
+            student.balance += top_up
+            writer.add(BalanceTransaction.__table__, {
+                "user_id": student.id, "created_at": at - timedelta(minutes=self.rng.randint(1, 30)),
+                "kind": BalanceOperation.TOP_UP, "amount": top_up, "balance_after": student.balance,
+                "order_id": None, "plan_id": None,
+            })
+        student.balance -= amount
+        writer.add(BalanceTransaction.__table__, {
+            "user_id": student.id, "created_at": at, "kind": kind, "amount": -amount,
+            "balance_after": student.balance, "order_id": order_id, "plan_id": plan_id,
+        })
+
+    def order(self, writer: BulkWriter, student: Student, at: datetime, items: List[Tuple[int, int]], paid: bool, end_of_history: datetime) -> None:
+        self.order_id += 1
+        order_id = self.order_id
+        total = sum(self.dish_price[dish_id] * quantity for dish_id, quantity in items)
+
+        if at.date() < self.end:
+            status = OrderStatus.CANCELLED if self.rng.random() < 0.03 else OrderStatus.SERVED
+        else:
+            status = self.rng.choices((OrderStatus.PAID, OrderStatus.READY, OrderStatus.SERVED), weights=(5, 3, 2))[0]
+        ready_at = at + timedelta(minutes=self.rng.uniform(3, 15))
+        completed_at = ready_at + timedelta(minutes=self.rng.uniform(1, 20)) if status == OrderStatus.SERVED else None
+
+        writer.add(Order.__table__, {"id": order_id, "user_id": student.id, "ordered_at": at, "completed_at": completed_at, "status": status})
+        for dish_id, quantity in items:
+            writer.add(OrderItem.__table__, {"order_id": order_id, "dish_id": dish_id, "quantity": quantity})
+
+        if paid:
+            self.pay(writer, student, at, total, BalanceOperation.ORDER_PAYMENT, order_id=order_id)
+            if status == OrderStatus.CANCELLED:
+                student.balance += total
+                writer.add(BalanceTransaction.__table__, {
+                    "user_id": student.id, "created_at": at + timedelta(minutes=self.rng.randint(1, 10)),
+                    "kind": BalanceOperation.ORDER_REFUND, "amount": total, "balance_after": student.balance,
+                    "order_id": order_id, "plan_id": None,
+                })
+
+        if status in (OrderStatus.READY, OrderStatus.SERVED):
+            writer.add(Notification.__table__, {
+                "user_id": student.id, "created_at": ready_at, "title": "Заказ готов!",
+                "body": f"Ваш заказ #{order_id} готов к выдаче. Приятного аппетита!",
+                "read": ready_at < end_of_history - timedelta(days=3) or self.rng.random() < 0.5,
+            })
+
+        if status == OrderStatus.SERVED and student.reviewer and self.rng.random() < self.args.review_rate:
+            dish_id = self.rng.choice(items)[0]
+            reviewed_at = completed_at + timedelta(hours=self.rng.uniform(0.1, 30))
+            if reviewed_at < end_of_history:
+                rating = min(5, max(1, round(self.rng.gauss(self.dish_quality[dish_id], 0.9))))
+                writer.add(Review.__table__, {
+                    "user_id": student.id, "dish_id": dish_id, "rating": rating,
+                    "datetime": reviewed_at, "content": self.rng.choice(REVIEWS[rating]),
+                })
+
+    def subscription(self, writer: BulkWriter, student: Student, day: date, days: List[date], items: List[Tuple[int, int]]) -> None:
+        self.plan_id += 1
+        bought_at = datetime.combine(day, dtime(self.rng.randint(17, 21), self.rng.randint(0, 59)))
+        day_cost = sum(self.dish_price[dish_id] * quantity for dish_id, quantity in items)
+        writer.add(SubscriptionPlan.__table__, {
+            "id": self.plan_id, "user_id": student.id, "created_at": bought_at,
+            "first_day": days[0], "last_day": days[-1], "meals_total": len(days), "day_cost": day_cost,
+            # дни после --end создаст планировщик абонементов при запуске приложения
+            "materialized_through": min(days[-1], self.end), "cancelled_at": None, "refunded": 0,
+        })
+        for dish_id, quantity in items:
+            writer.add(SubscriptionPlanItem.__table__, {"plan_id": self.plan_id, "dish_id": dish_id, "quantity": quantity})
+        self.pay(writer, student, bought_at, day_cost * len(days), BalanceOperation.SUBSCRIPTION_PAYMENT, plan_id=self.plan_id)
+        student.plan = (self.plan_id, set(days), items, day_cost, bought_at.time())
+
+    def applications(self, writer: BulkWriter, cooks: List[int], ingredient_ids: Dict[str, Tuple[int, int]]) -> None:
+        """Заявка на закупку раз в неделю (понедельник утром)."""
+        if not cooks:
+            return
+        ids = [ingredient_id for ingredient_id, _ in ingredient_ids.values()]
+        day = self.start + timedelta(days=(7 - self.start.weekday()) % 7)
+        application_id = 0
+        while day <= self.end:
+            application_id += 1
+            if day > self.end - timedelta(days=7):
+                status, reason = OrderStatus.PAID, None
+            elif self.rng.random() < 0.12:
+                status, reason = OrderStatus.CANCELLED, self.rng.choice(REJECTION_REASONS)
+            else:
+                status, reason = OrderStatus.SERVED, None
+            writer.add(Application.__table__, {
+                "id": application_id, "user_id": self.rng.choice(cooks),
+                "datetime": datetime.combine(day, dtime(10, self.rng.randint(0, 59))),
+                "status": status, "rejection_reason": reason,
+            })
+            for ingredient_id in self.rng.sample(ids, self.rng.randint(5, 12)):
+                writer.add(ApplicationItem.__table__, {"application_id": application_id, "ingredient_id": ingredient_id, "quantity": self.rng.randint(5, 60)})
+            day += timedelta(days=7)
+
+
+async def main(args) -> int:
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(migrations.ensure_current)
+
+        started = time.perf_counter()
+        async with engine.connect() as conn:
+            counts = await conn.run_sync(SchoolGenerator(args).run)
+        for table, count in counts.items():
+            if count:
+                print(f"{table:<24} {count:>10}")
+        print(f"Inserted {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+        async with SessionLocalAsync() as session:
+            await rollups_manager.rebuild(session)
+        print(f"Statistics rollups rebuilt, total {time.perf_counter() - started:.1f}s")
+        return 0
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--cooks", type=int, default=6)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--dishes", type=int, default=sum(len(dishes) for dishes in DISHES.values()))
+    parser.add_argument("--days", type=int, default=365, help="length of the order history")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="last day of the history (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--subscription-share", type=float, default=0.1, help="share of students who buy subscriptions")
+    parser.add_argument("--review-rate", type=float, default=0.05, help="chance that a reviewer reviews a served order")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--chunk", type=int, default=50000, help="rows per executemany")
+    sys.exit(asyncio.run(main(parser.parse_args())))
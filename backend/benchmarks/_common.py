@@ -0,0 +1,54 @@
+"""
+Общее для бенчмарков: временная SQLite-база с окружением приложения, ASGI-клиент и перцентили.
+
+temp_database() вызывается до импорта app: настройки и движок создаются при импорте один раз.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def temp_database(prefix: str, **env: str) -> str:
+    """
+    Файл базы во временном каталоге и окружение для app: DATABASE_URL, переменные из env
+    и умолчания бенчмарков (быстрый bcrypt, fan-out в памяти, миграции при старте).
+    Возвращает путь к файлу базы.
+    """
+    db_path = os.path.join(tempfile.mkdtemp(prefix=prefix), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.update(env)
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("WS_FANOUT_BACKEND", "memory")
+    os.environ.setdefault("AUTO_MIGRATE", "true")
+    return db_path
+
+
+def run_module(*args: str) -> None:
+    """python -m <args> в каталоге backend с текущим окружением (миграции, заполнение базы)."""
+    subprocess.run([sys.executable, "-m", *args], cwd=BACKEND_DIR, env=os.environ.copy(), check=True, capture_output=True)
+
+
+@asynccontextmanager
+async def asgi_client(base_url: str = "http://bench", **kwargs) -> AsyncIterator:
+    """Запущенное приложение (lifespan) и httpx-клиент к нему через ASGI-транспорт, без сети."""
+    import httpx
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url, **kwargs) as client:
+            yield client
@@ -0,0 +1,456 @@
+"""
+Нагрузочный сценарий "обеденная перемена" для сравнения коммитов между собой.
+
+    python -m benchmarks.lunch_rush [--transport asgi|http] [--students 300] [--cooks 4] [--clients 32]
+                                    [--listeners 100] [--seconds 20] [--json results.json] [--baseline old.json]
+
+На временной базе (миграции + заполнение через sqlite3) разыгрывается перемена:
+все ученики и повара логинятся, часть учеников слушает /ws/notifications, ученики смотрят меню
+и создают заказы, повара забирают оплаченные заказы и отмечают их готовыми (mark-ready),
+ученики подтверждают получение (confirm-receipt). После --seconds новые заказы не создаются,
+а очередь дорабатывается (не дольше --drain-seconds).
+
+--transport asgi гоняет app.main:app в этом процессе через ASGI-транспорт httpx (без сети),
+--transport http запускает uvicorn на localhost (--workers процессов). Для WebSocket по http
+нужен пакет websockets (есть в fastapi[standard]); без него слушатели пропускаются.
+
+Итог - пропускная способность, p50/p95/p99 по каждому эндпоинту, доля ошибок и число
+"database is locked". С --json результат пишется в файл вместе с хэшем коммита,
+с --baseline печатается сравнение с прошлым прогоном.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks._common import BACKEND_DIR, asgi_client, percentile, run_module, temp_database
+
+PASSWORD = "secret1"
+LOCK_MARKER = "database is locked"
+ORDER_ID_RE = re.compile(r"#(\d+)")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty else "")
+
+
+def seed(db_path: str, students: int, cooks: int, dishes: int) -> None:
+    from app.core.security.password import hash_password
+
+    rng = random.Random(42)
+    password = hash_password(PASSWORD)
+    users = [(i, f"student{i}@rush.ru", "STUDENT") for i in range(1, students + 1)]
+    users += [(students + i, f"cook{i}@rush.ru", "COOK") for i in range(1, cooks + 1)]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, name, surname, email, password, registered_at, role, banned, balance, subscription_days) "
+            "VALUES (?, 'Обед', 'Тестов', ?, ?, '2025-01-01 00:00:00', ?, 0, 1000000000, 0)",
+            [(user_id, email, password, role) for user_id, email, role in users]
+        )
+        conn.executemany(
+            "INSERT INTO dishes (id, name, price) VALUES (?, ?, ?)",
+            [(i, f"Блюдо {i}", rng.randint(50, 400)) for i in range(1, dishes + 1)]
+        )
+        conn.executemany("INSERT INTO menu (id, name) VALUES (?, ?)", [(1, "Завтрак"), (2, "Обед")])
+        conn.executemany(
+            "INSERT INTO menu_items (menu_id, dish_id) VALUES (?, ?)",
+            [(1 if dish_id <= dishes // 3 else 2, dish_id) for dish_id in range(1, dishes + 1)]
+        )
+
+
+class AsgiWebSocket:
+    """Минимальный WebSocket-клиент поверх ASGI-приложения в этом же процессе."""
+
+    def __init__(self, app, path: str, query: str):
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query.encode(),
+            "headers": [(b"host", b"rush")], "client": ("127.0.0.1", 0), "server": ("rush", 80), "subprotocols": [],
+        }
+        self._incoming.put_nowait({"type": "websocket.connect"})
+        self._task = asyncio.create_task(app(scope, self._incoming.get, self._outgoing.put))
+
+    async def accept(self) -> None:
+        message = await self._outgoing.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected: {message}")
+
+    async def recv(self) -> str:
+        message = await self._outgoing.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError("WebSocket closed by server")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def close(self) -> None:
+        await self._incoming.put({"type": "websocket.disconnect", "code": 1000})
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class LockLogHandler(logging.Handler):
+    """Считает записи логов приложения про блокировку SQLite (обработанные ошибки)."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record):
+        text = record.getMessage() + (record.exc_text or "")
+        if LOCK_MARKER in text:
+            self.count += 1
+
+
+class Rush:
+
+    def __init__(self, args, client, websocket_factory):
+        self.args = args
+        self.client = client
+        self.websocket_factory = websocket_factory
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.lock_responses = 0
+        self.tokens: Dict[int, dict] = {}
+        self.ready: asyncio.Queue = asyncio.Queue()
+        self.ready_at: Dict[int, float] = {}
+        self.delivery: List[float] = []
+        self.ws_connected = 0
+        self.ws_messages = 0
+        self.ordering = True
+        self.done = False
+        self.pending_orders = 0
+
+    async def call(self, name: str, method: str, url: str, ok=(200, 201, 304), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception as e:
+            # в режиме asgi необработанное исключение приложения приходит сюда, а не ответом 500
+            self.errors[name]["exception"] += 1
+            self.lock_responses += LOCK_MARKER in str(e)
+            return None
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        if response.status_code not in ok:
+            self.errors[name][str(response.status_code)] += 1
+            self.lock_responses += LOCK_MARKER in response.text
+            return None
+        return response
+
+    async def login_all(self, user_ids: List[int]) -> None:
+        semaphore = asyncio.Semaphore(self.args.clients)
+
+        async def login(user_id: int) -> None:
+            email = f"student{user_id}@rush.ru" if user_id <= self.args.students else f"cook{user_id - self.args.students}@rush.ru"
+            async with semaphore:
+                response = await self.call("POST /auth/login", "POST", "/auth/login", json={"email": email, "password": PASSWORD})
+            if response is not None:
+                self.tokens[user_id] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        await asyncio.gather(*[login(user_id) for user_id in user_ids])
+
+    async def listener(self, user_id: int) -> None:
+        token = self.tokens[user_id]["Authorization"].split()[1]
+        started = time.perf_counter()
+        try:
+            websocket = await self.websocket_factory(f"token={token}")
+        except Exception:
+            self.errors["WS /ws/notifications"]["connect"] += 1
+            return
+        self.latencies["WS /ws/notifications"].append((time.perf_counter() - started) * 1000)
+        self.ws_connected += 1
+        try:
+            while not self.done:
+                try:
+                    text = await asyncio.wait_for(websocket.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                self.ws_messages += 1
+                match = ORDER_ID_RE.search(text)
+                if match and int(match.group(1)) in self.ready_at:
+                    self.delivery.append((time.perf_counter() - self.ready_at.pop(int(match.group(1)))) * 1000)
+        except Exception:
+            self.errors["WS /ws/notifications"]["dropped"] += 1
+        finally:
+            await websocket.close()
+
+    async def student(self, seed_value: int, students: List[int]) -> None:
+        rng = random.Random(seed_value)
+        etags: Dict[str, str] = {}
+
+        async def browse(name: str, url: str):
+            headers = {"If-None-Match": etags[url]} if url in etags else {}
+            response = await self.call(name, "GET", url, headers=headers)
+            if response is not None and response.headers.get("ETag"):
+                etags[url] = response.headers["ETag"]
+            return response
+
+        while not self.done:
+            # сначала забрать готовый заказ, если он есть
+            try:
+                order_id, user_id = self.ready.get_nowait()
+            except asyncio.QueueEmpty:
+                if not self.ordering:
+                    await asyncio.sleep(0.01)
+                    continue
+            else:
+                await self.call("POST /orders/{order_id}/confirm-receipt", "POST", f"/orders/{order_id}/confirm-receipt", headers=self.tokens[user_id])
+                self.pending_orders -= 1
+                continue
+
+            user_id = rng.choice(students)
+            await browse("GET /menu/", "/menu/")
+            menu_id = rng.choice((1, 2))
+            await browse("GET /menu/{menu_id}", f"/menu/{menu_id}")
+            if rng.random() < 0.3:
+                dish_id = rng.randint(1, self.args.dishes)
+                await browse("GET /dishes/{dish_id}", f"/dishes/{dish_id}")
+
+            dishes = rng.sample(range(1, self.args.dishes + 1), rng.randint(1, 3))
+            body = {"dishes": [{"dish_id": dish_id, "quantity": 1} for dish_id in dishes]}
+            response = await self.call("POST /orders/", "POST", "/orders/", json=body, headers=self.tokens[user_id])
+            if response is not None:
+                self.pending_orders += 1
+            if self.args.think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * self.args.think_ms) / 1000)
+
+    async def cook(self, index: int, user_id: int) -> None:
+        # каждый повар ведет свою "раздачу": заказы с id % cooks == index, чтобы не драться за одни и те же
+        headers = self.tokens[user_id]
+        while not self.done:
+            response = await self.call("GET /orders/", "GET", "/orders/?status=paid&limit=50&cursor=", headers=headers)
+            orders = [order for order in (response.json()["items"] if response is not None else []) if order["id"] % self.args.cooks == index]
+            if not orders:
+                await asyncio.sleep(self.args.cook_poll_ms / 1000)
+                continue
+            for order in orders:
+                if order["user_id"] not in self.tokens:
+                    continue
+                started = time.perf_counter()
+                response = await self.call("POST /orders/{order_id}/mark-ready", "POST", f"/orders/{order['id']}/mark-ready", headers=headers)
+                if response is not None:
+                    self.ready_at[order["id"]] = started
+                    await self.ready.put((order["id"], order["user_id"]))
+
+    async def run(self) -> dict:
+        students = list(range(1, self.args.students + 1))
+        cooks = list(range(self.args.students + 1, self.args.students + self.args.cooks + 1))
+
+        started = time.perf_counter()
+        await self.login_all(students + cooks)
+        login_seconds = time.perf_counter() - started
+        students = [user_id for user_id in students if user_id in self.tokens]
+        cooks = [user_id for user_id in cooks if user_id in self.tokens]
+
+        listeners = []
+        if self.websocket_factory is not None:
+            listeners = [asyncio.create_task(self.listener(user_id)) for user_id in students[:self.args.listeners]]
+            await asyncio.sleep(0.2)
+
+        started = time.perf_counter()
+        workers = [asyncio.create_task(self.student(i, students)) for i in range(self.args.clients)]
+        workers += [asyncio.create_task(self.cook(i, user_id)) for i, user_id in enumerate(cooks)]
+        await asyncio.sleep(self.args.seconds)
+        self.ordering = False
+        drain_deadline = time.perf_counter() + self.args.drain_seconds
+        while self.pending_orders > 0 and time.perf_counter() < drain_deadline:
+            await asyncio.sleep(0.05)
+        self.done = True
+        await asyncio.gather(*workers, *listeners)
+        rush_seconds = time.perf_counter() - started
+
+        return self.result(login_seconds, rush_seconds)
+
+    def result(self, login_seconds: float, rush_seconds: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(name, [])
+            errors = dict(self.errors.get(name, {}))
+            total = len(values) + errors.get("exception", 0) + errors.get("connect", 0)
+            seconds = login_seconds if name == "POST /auth/login" else rush_seconds
+            endpoints[name] = {
+                "requests": total,
+                "errors": errors,
+                "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+                "throughput_rps": round(total / seconds, 1) if seconds else 0.0,
+                "p50_ms": round(percentile(values, 50), 2) if values else None,
+                "p95_ms": round(percentile(values, 95), 2) if values else None,
+                "p99_ms": round(percentile(values, 99), 2) if values else None,
+            }
+        http = {name: stats for name, stats in endpoints.items() if not name.startswith("WS ")}
+        requests = sum(stats["requests"] for stats in http.values())
+        errors = sum(sum(count for kind, count in stats["errors"].items() if kind not in ("connect", "dropped")) for stats in http.values())
+        return {
+            "login_seconds": round(login_seconds, 2),
+            "rush_seconds": round(rush_seconds, 2),
+            "requests": requests,
+            "throughput_rps": round((requests - http.get("POST /auth/login", {}).get("requests", 0)) / rush_seconds, 1),
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "lock_timeouts": self.lock_responses,
+            "orders_left": self.pending_orders,
+            "endpoints": endpoints,
+            "websocket": {
+                "listeners": self.args.listeners if self.websocket_factory is not None else 0,
+                "connected": self.ws_connected,
+                "messages": self.ws_messages,
+                "delivery_p50_ms": round(percentile(self.delivery, 50), 2) if self.delivery else None,
+                "delivery_p95_ms": round(percentile(self.delivery, 95), 2) if self.delivery else None,
+                "delivery_p99_ms": round(percentile(self.delivery, 99), 2) if self.delivery else None,
+            },
+        }
+
+
+async def run_asgi(args) -> dict:
+    from app.main import app
+
+    lock_log = LockLogHandler()
+    logging.getLogger().addHandler(lock_log)
+
+    async def websocket_factory(query: str):
+        websocket = AsgiWebSocket(app, "/ws/notifications", query)
+        await websocket.accept()
+        return websocket
+
+    async with asgi_client(base_url="http://rush", timeout=60) as client:
+        result = await Rush(args, client, websocket_factory if args.listeners else None).run()
+    result["lock_timeouts"] += lock_log.count
+    return result
+
+
+async def run_http(args, env: dict, workdir: str) -> dict:
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    if args.workers > 1:
+        # сообщения для сокетов должны доходить до всех воркеров
+        env = {**env, "WS_FANOUT_BACKEND": "sqlite", "WS_FANOUT_SQLITE_PATH": os.path.join(workdir, "ws_fanout.db")}
+    server_log_path = os.path.join(workdir, "server.log")
+    server_log = open(server_log_path, "w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=server_log, stderr=subprocess.STDOUT
+    )
+
+    websocket_factory = None
+    if args.listeners:
+        try:
+            import websockets
+        except ImportError:
+            print("websockets is not installed, skipping notification listeners", file=sys.stderr)
+        else:
+            async def websocket_factory(query: str):
+                return await websockets.connect(f"ws://127.0.0.1:{port}/ws/notifications?{query}")
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                     limits=httpx.Limits(max_connections=args.clients + args.cooks + 8)) as client:
+            deadline = time.perf_counter() + 30
+            while True:
+                try:
+                    if (await client.get("/menu/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.perf_counter() > deadline:
+                    raise RuntimeError(f"Server did not start, see {server_log_path}")
+                await asyncio.sleep(0.2)
+            result = await Rush(args, client, websocket_factory).run()
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        server_log.close()
+
+    with open(server_log_path) as log:
+        # одна строка на событие: "(sqlite3.OperationalError) database is locked" из лога ошибки или трейсбека
+        result["lock_timeouts"] += sum(1 for line in log if f"OperationalError) {LOCK_MARKER}" in line)
+    return result
+
+
+def report(result: dict, baseline: Optional[dict]) -> None:
+    print(f"commit {result['commit'] or '?'}  transport={result['config']['transport']}  profile={result['config']['profile']}")
+    print(f"login: {result['login_seconds']} s   rush: {result['rush_seconds']} s   {result['throughput_rps']} requests/s")
+    print(f"errors: {result['error_rate'] * 100:.2f}%   lock timeouts: {result['lock_timeouts']}   orders not served: {result['orders_left']}")
+    for name, stats in result["endpoints"].items():
+        line = f"  {name:<42} n={stats['requests']:<6} {stats['throughput_rps']:>7} rps"
+        if stats["p50_ms"] is not None:
+            line += f"   p50 {stats['p50_ms']:8.2f}   p95 {stats['p95_ms']:8.2f}   p99 {stats['p99_ms']:8.2f} ms"
+        if stats["errors"]:
+            line += "   errors " + ", ".join(f"{kind}: {count}" for kind, count in sorted(stats["errors"].items()))
+        if baseline and name in baseline["endpoints"] and stats["p95_ms"] and baseline["endpoints"][name]["p95_ms"]:
+            old = baseline["endpoints"][name]
+            line += f"   (p95 {(stats['p95_ms'] / old['p95_ms'] - 1) * 100:+.0f}%, rps {(stats['throughput_rps'] / old['throughput_rps'] - 1) * 100:+.0f}%)"
+        print(line)
+    ws = result["websocket"]
+    if ws["listeners"]:
+        print(f"  websocket: {ws['connected']}/{ws['listeners']} connected, {ws['messages']} messages, "
+              f"mark-ready -> delivery p50 {ws['delivery_p50_ms']} ms, p95 {ws['delivery_p95_ms']} ms, p99 {ws['delivery_p99_ms']} ms")
+    if baseline:
+        print(f"baseline {baseline.get('commit') or '?'}: {baseline['throughput_rps']} requests/s, "
+              f"errors {baseline['error_rate'] * 100:.2f}%, lock timeouts {baseline['lock_timeouts']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --transport http")
+    parser.add_argument("--profile", choices=("default", "production"), default="production", help="SQLITE_PROFILE")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--cooks", type=int, default=4)
+    parser.add_argument("--dishes", type=int, default=30)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent student sessions")
+    parser.add_argument("--listeners", type=int, default=100, help="students listening on /ws/notifications")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--drain-seconds", type=float, default=10)
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a student's orders")
+    parser.add_argument("--cook-poll-ms", type=float, default=200)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    parser.add_argument("--baseline", help="results of an earlier run (--json) to compare against")
+    args = parser.parse_args()
+
+    db_path = temp_database("bench_lunch_rush_", SQLITE_PROFILE=args.profile, AUTO_MIGRATE="false", WS_FANOUT_BACKEND="memory")
+    workdir = os.path.dirname(db_path)
+    env = dict(os.environ)
+    run_module("app.scripts.migrate")
+    seed(db_path, args.students, args.cooks, args.dishes)
+
+    if args.transport == "asgi":
+        result = asyncio.run(run_asgi(args))
+    else:
+        result = asyncio.run(run_http(args, env, workdir))
+    result = {"commit": git_commit(), "config": vars(args), **result}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(result, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
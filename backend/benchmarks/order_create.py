@@ -0,0 +1,93 @@
+"""
+Задержка POST /orders/ на временной SQLite-базе.
+
+    python -m benchmarks.order_create [--requests 500] [--cooks 5] [--dishes 3]
+
+Запросы идут последовательно через ASGI-транспорт httpx (без сети),
+так что цифры показывают стоимость обработчика и БД, а не uvicorn.
+"""
+import argparse
+import asyncio
+import sqlite3
+import statistics
+import time
+
+import httpx
+
+from benchmarks._common import asgi_client, percentile, temp_database
+
+DB_PATH = temp_database("bench_orders_")
+PASSWORD = "secret1"
+
+
+async def register(client: httpx.AsyncClient, email: str) -> None:
+    response = await client.post("/auth/register", json={"name": "Бенч", "surname": "Тестов", "email": email, "password": PASSWORD})
+    response.raise_for_status()
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def prepare(client: httpx.AsyncClient, cooks: int, dishes: int) -> tuple[dict, list]:
+    await register(client, "admin@bench.ru")
+    await register(client, "student@bench.ru")
+    for i in range(cooks):
+        await register(client, f"cook{i}@bench.ru")
+
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("UPDATE users SET role = 'ADMIN' WHERE email = 'admin@bench.ru'")
+        conn.execute("UPDATE users SET role = 'COOK' WHERE email LIKE 'cook%'")
+        conn.execute("UPDATE users SET balance = 1000000000 WHERE email = 'student@bench.ru'")
+
+    admin = await login(client, "admin@bench.ru")
+    student = await login(client, "student@bench.ru")
+
+    dish_ids = []
+    for i in range(dishes):
+        response = await client.post(
+            "/dishes/",
+            data={"dish_data": f'{{"name": "Блюдо {i}", "price": {100 + i}, "ingredients": []}}'},
+            headers=admin
+        )
+        response.raise_for_status()
+        dish_ids.append(response.json()["id"])
+    return student, dish_ids
+
+
+async def run(requests: int, cooks: int, dishes: int, warmup: int) -> None:
+    async with asgi_client() as client:
+        student, dish_ids = await prepare(client, cooks, dishes)
+        body = {"dishes": [{"dish_id": dish_id, "quantity": 1} for dish_id in dish_ids]}
+
+        timings = []
+        for i in range(warmup + requests):
+            started = time.perf_counter()
+            response = await client.post("/orders/", json=body, headers=student)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 201:
+                raise RuntimeError(f"Unexpected response {response.status_code}: {response.text}")
+            if i >= warmup:
+                timings.append(elapsed)
+
+    print(f"POST /orders/: {requests} requests, {dishes} dishes per order, {cooks} cooks")
+    print(f"  mean {statistics.mean(timings):7.2f} ms")
+    print(f"  p50  {percentile(timings, 50):7.2f} ms")
+    print(f"  p90  {percentile(timings, 90):7.2f} ms")
+    print(f"  p99  {percentile(timings, 99):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--cooks", type=int, default=5)
+    parser.add_argument("--dishes", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.cooks, args.dishes, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
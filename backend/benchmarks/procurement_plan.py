@@ -0,0 +1,123 @@
+"""
+Время GET /applications/plan на временной SQLite-базе с синтетическим спросом.
+
+    python -m benchmarks.procurement_plan [--orders 5000] [--plans 500] [--dishes 200] [--ingredients 300]
+
+Данные пишутся напрямую в SQLite, запросы идут через ASGI-транспорт httpx (без сети).
+Отдельно печатается время самого умножения матриц на тех же размерах.
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from benchmarks._common import asgi_client, percentile, temp_database
+
+DB_PATH = temp_database("bench_plan_")
+PASSWORD = "secret1"
+
+
+def seed(orders: int, plans: int, dishes: int, ingredients: int, per_dish: int) -> None:
+    rng = random.Random(42)
+    today = date.today()
+    now = datetime.now()
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO ingredients (id, name, price, measure) VALUES (?, ?, ?, 'WEIGHT')",
+            [(i, f"Ингредиент {i}", rng.randint(50, 2000)) for i in range(1, ingredients + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO dishes (id, name, price) VALUES (?, ?, ?)",
+            [(i, f"Блюдо {i}", rng.randint(50, 400)) for i in range(1, dishes + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO dish_ingredients (dish_id, ingredient_id, amount_thousandth_measure) VALUES (?, ?, ?)",
+            [
+                (dish_id, ingredient_id, rng.randint(5, 400))
+                for dish_id in range(1, dishes + 1)
+                for ingredient_id in rng.sample(range(1, ingredients + 1), per_dish)
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO orders (id, user_id, ordered_at, status) VALUES (?, 1, ?, 'PAID')",
+            [(i, (now + timedelta(days=rng.randint(-1, 6))).isoformat(" ")) for i in range(1, orders + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO order_items (order_id, dish_id, quantity) VALUES (?, ?, ?)",
+            [
+                (order_id, dish_id, rng.randint(1, 2))
+                for order_id in range(1, orders + 1)
+                for dish_id in rng.sample(range(1, dishes + 1), 3)
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO subscription_plans (id, user_id, created_at, first_day, last_day, meals_total, day_cost, materialized_through, refunded) "
+            "VALUES (?, 1, ?, ?, ?, 10, 300, ?, 0)",
+            [
+                (i, now.isoformat(" "), today.isoformat(), (today + timedelta(days=13)).isoformat(), (today - timedelta(days=1)).isoformat())
+                for i in range(1, plans + 1)
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO subscription_plan_items (plan_id, dish_id, quantity) VALUES (?, ?, 1)",
+            [(plan_id, dish_id) for plan_id in range(1, plans + 1) for dish_id in rng.sample(range(1, dishes + 1), 2)]
+        )
+
+
+async def run(args) -> None:
+    async with asgi_client() as client:
+        response = await client.post("/auth/register", json={"name": "Бенч", "surname": "Тестов", "email": "admin@bench.ru", "password": PASSWORD})
+        response.raise_for_status()
+        with sqlite3.connect(DB_PATH) as conn:
+            conn.execute("UPDATE users SET role = 'ADMIN'")
+        seed(args.orders, args.plans, args.dishes, args.ingredients, args.per_dish)
+
+        response = await client.post("/auth/login", json={"email": "admin@bench.ru", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        timings = []
+        for i in range(args.warmup + args.requests):
+            started = time.perf_counter()
+            response = await client.get(f"/applications/plan?days={args.days}", headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise RuntimeError(f"Unexpected response {response.status_code}: {response.text}")
+            if i >= args.warmup:
+                timings.append(elapsed)
+        plan = response.json()
+
+    demand = np.random.default_rng(0).integers(0, 50, size=(args.days, args.dishes))
+    recipes = np.random.default_rng(1).integers(0, 400, size=(args.dishes, args.ingredients))
+    started = time.perf_counter()
+    for _ in range(100):
+        (demand @ recipes).sum(axis=0)
+    matmul_ms = (time.perf_counter() - started) * 10
+
+    print(f"GET /applications/plan?days={args.days}: {args.orders} orders, {args.plans} subscriptions, "
+          f"{args.dishes} dishes x {args.ingredients} ingredients -> {plan['portions']} portions, {len(plan['ingredients'])} ingredients")
+    print(f"  mean {statistics.mean(timings):7.2f} ms")
+    print(f"  p50  {percentile(timings, 50):7.2f} ms")
+    print(f"  p99  {percentile(timings, 99):7.2f} ms")
+    print(f"  matrix product alone {matmul_ms:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--plans", type=int, default=500)
+    parser.add_argument("--dishes", type=int, default=200)
+    parser.add_argument("--ingredients", type=int, default=300)
+    parser.add_argument("--per-dish", type=int, default=8)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Сериализация ответов списков: обычный путь FastAPI против json_response (FAST_JSON_RESPONSES).
+
+    python -m benchmarks.serialization [--students 300] [--days 60] [--limit 100] [--requests 200]
+
+На временной базе, заполненной app.scripts.seed, каждый эндпоинт-список запрашивается
+--requests раз в обоих режимах через ASGI-транспорт httpx (без сети). Режимы чередуются
+пачками, чтобы прогрев и кэши БД не давали преимущества одному из них. Перед замерами
+проверяется, что тела ответов в обоих режимах совпадают.
+
+Печатаются p50/p95 латентности, процессорное время на запрос и ускорение по каждому эндпоинту,
+а также время одной сериализации страницы без HTTP и БД: serialize_response FastAPI + JSONResponse
+против dump_json по той же странице, которую вернул CRUD-слой.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks._common import asgi_client, percentile, run_module, temp_database
+
+PASSWORD = "password123"
+ROUNDS = 10
+SERIALIZE_REPEATS = 20
+
+temp_database("bench_serialization_", AUTO_MIGRATE="false")
+
+
+def prepare(args) -> None:
+    run_module("app.scripts.migrate")
+    run_module("app.scripts.seed", "--students", str(args.students), "--days", str(args.days), "--password", PASSWORD)
+
+
+async def measure(client, path: str, headers: dict, requests: int) -> tuple:
+    latencies = []
+    cpu_started = time.process_time()
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return latencies, (time.process_time() - cpu_started) / requests
+
+
+async def serialization_cost(route, page, response_type) -> tuple:
+    """Лучшее из ROUNDS время сериализации одной страницы обычным путем FastAPI и через dump_json."""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    from app.core.serialization import dump_json
+
+    default, fast = [], []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for _ in range(SERIALIZE_REPEATS):
+            JSONResponse(await serialize_response(field=route.response_field, response_content=page))
+        default.append((time.perf_counter() - started) / SERIALIZE_REPEATS)
+
+        started = time.perf_counter()
+        for _ in range(SERIALIZE_REPEATS):
+            dump_json(page, response_type)
+        fast.append((time.perf_counter() - started) / SERIALIZE_REPEATS)
+    return min(default), min(fast)
+
+
+async def run(args) -> None:
+    from app.core import serialization
+    from app.core.config import settings
+    from app.main import app
+
+    # запоминаем последнюю страницу, которую эндпоинт отдал в json_response
+    captured = {}
+    json_response = serialization.json_response
+
+    def capturing_json_response(data, response_type, *args, **kwargs):
+        captured["page"], captured["type"] = data, response_type
+        return json_response(data, response_type, *args, **kwargs)
+
+    for module in {route.endpoint.__module__ for route in app.routes if hasattr(route, "endpoint")}:
+        if getattr(sys.modules[module], "json_response", None) is json_response:
+            sys.modules[module].json_response = capturing_json_response
+
+    limit = args.limit
+    # (маршрут, запрос)
+    endpoints = [
+        ("/orders/", f"/orders/?limit={limit}"),
+        ("/orders/", f"/orders/?limit={limit}&cursor="),
+        ("/reviews/", f"/reviews/?limit={limit}"),
+        ("/users/", f"/users/?limit={limit}"),
+        ("/users/{user_id}/transactions", f"/users/{{student}}/transactions?limit={limit}"),
+        ("/applications/", f"/applications/?limit={limit}"),
+        ("/ingredients/", f"/ingredients/?limit={limit}"),
+    ]
+    routes = {route.path: route for route in app.routes if "GET" in getattr(route, "methods", ())}
+
+    async with asgi_client() as client:
+        response = await client.post("/auth/login", json={"email": "admin1@school.ru", "password": PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        students = (await client.get("/users/?role=student&limit=1", headers=headers)).json()["items"]
+        student_id = students[0]["id"] if students else 1
+
+        print(f"{'request':<34} {'items':>5} {'KiB':>7} {'default p50':>12} {'fast p50':>9} {'p95':>15} {'cpu/req':>15} {'speedup':>8} {'serialize':>17} {'speedup':>8}")
+        for template, path in endpoints:
+            path = path.replace("{student}", str(student_id))
+            name = path.replace(f"limit={limit}", "").rstrip("?&").replace("?&", "?")
+            bodies = {}
+            for fast in (False, True):
+                settings.fast_json_responses = fast
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+                bodies[fast] = response.json()
+            if bodies[False] != bodies[True]:
+                raise SystemExit(f"{name}: response bodies differ between modes")
+            default_serialize, fast_serialize = await serialization_cost(routes[template], captured["page"], captured["type"])
+
+            latencies = {False: [], True: []}
+            cpu = {False: [], True: []}
+            batch = max(1, args.requests // ROUNDS)
+            for _ in range(ROUNDS):
+                for fast in (False, True):
+                    settings.fast_json_responses = fast
+                    values, cpu_per_request = await measure(client, path, headers, batch)
+                    latencies[fast] += values
+                    cpu[fast].append(cpu_per_request)
+
+            default_p50, fast_p50 = percentile(latencies[False], 50), percentile(latencies[True], 50)
+            default_cpu, fast_cpu = statistics.mean(cpu[False]), statistics.mean(cpu[True])
+            print(
+                f"{name:<34} {len(bodies[True]['items']):>5} {len(response.content) / 1024:>7.1f} "
+                f"{default_p50 * 1000:>10.2f}ms {fast_p50 * 1000:>7.2f}ms "
+                f"{percentile(latencies[False], 95) * 1000:>6.2f}/{percentile(latencies[True], 95) * 1000:<6.2f}ms "
+                f"{default_cpu * 1000:>6.2f}/{fast_cpu * 1000:<6.2f}ms {default_p50 / fast_p50:>7.2f}x "
+                f"{default_serialize * 1000:>7.2f}/{fast_serialize * 1000:<6.2f}ms {default_serialize / fast_serialize:>7.2f}x"
+            )
+        settings.fast_json_responses = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--limit", type=int, default=100, help="page size (at most 100)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and mode")
+    args = parser.parse_args()
+
+    prepare(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Смешанная нагрузка "обеденный час" на профилях SQLite default и production (SQLITE_PROFILE).
+
+    python -m benchmarks.sqlite_profiles [--clients 32] [--seconds 10] [--write-share 0.2]
+
+Каждый профиль запускается в отдельном процессе на своей временной базе (движок создается
+при импорте app). Клиенты параллельно читают отзывы, историю баланса и счетчик уведомлений
+и создают заказы; запросы идут через ASGI-транспорт httpx (без сети).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks._common import asgi_client, percentile, temp_database
+
+PROFILES = ("default", "production")
+READS = ("reviews", "transactions", "unread")
+
+
+def seed(db_path: str, users: int, dishes: int, reviews: int) -> None:
+    rng = random.Random(42)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, name, surname, email, password, registered_at, role, banned, balance, subscription_days) "
+            "VALUES (?, 'Бенч', 'Тестов', ?, '-', '2025-01-01 00:00:00', 'STUDENT', 0, 1000000000, 0)",
+            [(i, f"student{i}@bench.ru") for i in range(1, users + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO dishes (id, name, price) VALUES (?, ?, ?)",
+            [(i, f"Блюдо {i}", rng.randint(50, 400)) for i in range(1, dishes + 1)]
+        )
+        conn.executemany(
+            "INSERT INTO reviews (user_id, dish_id, rating, datetime, content) VALUES (?, ?, ?, ?, 'Вкусно')",
+            [
+                (rng.randint(1, users), rng.randint(1, dishes), rng.randint(1, 5), f"2025-01-{rng.randint(1, 28):02d} 12:00:00")
+                for _ in range(reviews)
+            ]
+        )
+
+
+async def run_profile(args) -> dict:
+    db_path = temp_database(f"bench_sqlite_{args.profile}_", SQLITE_PROFILE=args.profile)
+
+    from app.core.security.jwt import create_access_token
+
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+
+    async with asgi_client(timeout=60) as client:
+        seed(db_path, args.users, args.dishes, args.reviews)
+        headers = [
+            {"Authorization": f"Bearer {create_access_token(user_id, 'STUDENT')}"}
+            for user_id in range(1, args.users + 1)
+        ]
+        deadline = time.perf_counter() + args.seconds
+
+        async def worker(seed_value: int) -> None:
+            rng = random.Random(seed_value)
+            while time.perf_counter() < deadline:
+                auth = rng.choice(headers)
+                if rng.random() < args.write_share:
+                    kind = "order"
+                    dishes = rng.sample(range(1, args.dishes + 1), 2)
+                    request = client.post("/orders/", json={"dishes": [{"dish_id": d, "quantity": 1} for d in dishes]}, headers=auth)
+                else:
+                    kind = rng.choice(READS)
+                    if kind == "reviews":
+                        request = client.get(f"/reviews/?dish_id={rng.randint(1, args.dishes)}&limit=20")
+                    elif kind == "transactions":
+                        request = client.get("/users/me/transactions?limit=20", headers=auth)
+                    else:
+                        request = client.get("/notifications/unread-count", headers=auth)
+
+                started = time.perf_counter()
+                response = await request
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code >= 300:
+                    failures[f"{kind} {response.status_code}"] += 1
+                else:
+                    latencies[kind].append(elapsed)
+
+        await asyncio.gather(*[worker(i) for i in range(args.clients)])
+
+    return {
+        "profile": args.profile,
+        "seconds": args.seconds,
+        "latencies": {kind: values for kind, values in latencies.items()},
+        "failures": dict(failures),
+    }
+
+
+def report(result: dict) -> None:
+    total = sum(len(values) for values in result["latencies"].values())
+    print(f"{result['profile']}: {total / result['seconds']:.0f} successful requests/s")
+    for kind in ("order",) + READS:
+        values = result["latencies"].get(kind)
+        if values:
+            print(f"  {kind:<13} n={len(values):<6} p50 {percentile(values, 50):8.2f} ms   p99 {percentile(values, 99):8.2f} ms")
+    for failure, count in sorted(result["failures"].items()):
+        print(f"  failed {failure}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-share", type=float, default=0.2)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--dishes", type=int, default=50)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(asyncio.run(run_profile(args))))
+        return
+
+    for profile in PROFILES:
+        command = [sys.executable, "-m", "benchmarks.sqlite_profiles", "--profile", profile] + sys.argv[1:]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        report(json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ export {
   getAllergies,
   addAllergy,
   removeAllergy,
+  getMyTransactions,
 } from "./users";
 export {
   getIngredients,
@@ -11,8 +11,13 @@ export async function getMenus(): Promise<Menu[]> {
   return response.data;
 }
 
-export async function getMenu(id: number): Promise<MenuDetail> {
-  const response = await apiClient.get<MenuDetail>(`/menu/${id}`);
+export async function getMenu(
+  id: number,
+  safeForMe = false,
+): Promise<MenuDetail> {
+  const response = await apiClient.get<MenuDetail>(`/menu/${id}`, {
+    params: safeForMe ? { safe_for_me: true } : undefined,
+  });
   return response.data;
 }
 
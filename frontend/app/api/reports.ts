@@ -30,14 +30,29 @@ export async function getNutritionReport(
   return response.data;
 }
 
+export async function getReport(id: number): Promise<ReportResponse> {
+  const response = await apiClient.get<ReportResponse>(`/reports/${id}`);
+  return response.data;
+}
+
 export async function generateReport(
   request: GenerateReportRequest,
+  pollIntervalMs = 1000,
 ): Promise<ReportResponse> {
+  // отчет формируется в фоне: ждем, пока статус станет ready или failed
   const response = await apiClient.post<ReportResponse>(
     "/reports/generate-pdf",
     request,
   );
-  return response.data;
+  let report = response.data;
+  while (report.status === "pending") {
+    await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+    report = await getReport(report.id);
+  }
+  if (report.status === "failed") {
+    throw new Error(report.error || "Не удалось сформировать отчет");
+  }
+  return report;
 }
 
 export async function downloadReport(downloadUrl: string): Promise<Blob> {
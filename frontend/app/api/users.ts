@@ -1,5 +1,6 @@
 import type {
   AdminUpdateUserRequest,
+  BalanceTransaction,
   PaginatedResponse,
   User,
   UpdateUserRequest,
@@ -80,3 +81,13 @@ export async function updateUserBalance(
   });
   return response.data;
 }
+
+export async function getMyTransactions(
+  params: { limit?: number; cursor?: string } = {},
+): Promise<PaginatedResponse<BalanceTransaction>> {
+  const response = await apiClient.get<PaginatedResponse<BalanceTransaction>>(
+    "/users/me/transactions",
+    { params: { limit: params.limit ?? 20, cursor: params.cursor ?? "" } },
+  );
+  return response.data;
+}
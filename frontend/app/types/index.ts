@@ -121,6 +121,7 @@ export interface OrderDishLink {
 export interface CreateOrderRequest {
   dishes: OrderDishLink[];
   user_id?: number;
+  allow_allergens?: boolean;
 }
 
 export interface Review {
@@ -270,11 +271,34 @@ export interface GenerateReportRequest {
   date_to?: string;
 }
 
+export type ReportStatus = "pending" | "ready" | "failed";
+
+export type BalanceOperation =
+  | "opening"
+  | "top_up"
+  | "adjustment"
+  | "order_payment"
+  | "order_refund"
+  | "subscription_payment"
+  | "subscription_refund";
+
+export interface BalanceTransaction {
+  id: number;
+  created_at: string;
+  kind: BalanceOperation;
+  amount: number;
+  balance_after: number;
+  order_id: number | null;
+  plan_id: number | null;
+}
+
 export interface ReportResponse {
   id: number;
   report_type: string;
   generated_at: string;
   download_url: string;
+  status: ReportStatus;
+  error?: string | null;
 }
 
 export interface Notification {
@@ -305,6 +329,7 @@ export interface PaginatedResponse<T> {
   page: number;
   limit: number;
   pages: number;
+  next_cursor?: string | null;
 }
 
 export interface LoginRequest {